@@ -0,0 +1,155 @@
+"""
+Agregações da tabela de triagem
+GROUP BY, histogramas e quartis calculados no banco; só a tabela-resumo volta
+para o app, então o custo do dashboard não cresce com o número de pacientes
+"""
+
+import pandas as pd
+
+from consultas_triagem import PRIORIDADES, TABELA_TRIAGEM, _montar_filtros, executar_consulta
+
+# Colunas que podem ser agrupadas ou resumidas
+COLUNAS_CATEGORICAS = ("urgencia_manual", "urgencia_automatica", "status", "genero", "nivel_consciencia")
+COLUNAS_NUMERICAS = ("Idade", "PA_Sistolica", "PA_Diastolica", "FC", "FR", "Temp", "SpO2", "intensidade_dor")
+
+# Indicadores de risco do dashboard (condições SQL sobre uma linha)
+INDICADORES_RISCO = {
+    "choque": "PA_Sistolica < 90 AND FC > 100",
+    "sepse": "Temp > 38 AND FC > 90 AND FR > 20",
+    "insuf_respiratoria": "FR < 10 OR FR > 25",
+}
+
+
+def _validar(coluna, permitidas):
+    if coluna not in permitidas:
+        raise ValueError(f"Coluna não agregável: {coluna}")
+    return coluna
+
+
+def _onde(condicoes):
+    return " WHERE " + " AND ".join(f"({c})" for c in condicoes) if condicoes else ""
+
+
+def montar_histograma(coluna, largura, **filtros):
+    """
+    Contagem por faixa de largura fixa: (faixa = início da faixa, pacientes)
+
+    Os sinais vitais são positivos, então truncar a divisão (CAST AS INT, que
+    SQLite e Databricks fazem igual) equivale ao floor. O CAST AS DOUBLE
+    evita que o Databricks devolva DECIMAL.
+    """
+    coluna = _validar(coluna, COLUNAS_NUMERICAS)
+    largura = float(largura)
+    if largura <= 0:
+        raise ValueError("A largura da faixa deve ser positiva")
+    condicoes, params = _montar_filtros(**filtros)
+    condicoes.append(f"{coluna} IS NOT NULL")
+    query = (
+        f"SELECT CAST(CAST({coluna} / {largura!r} AS INT) * {largura!r} AS DOUBLE) AS faixa,"
+        f" COUNT(*) AS pacientes"
+        f" FROM {TABELA_TRIAGEM}{_onde(condicoes)} GROUP BY 1 ORDER BY 1"
+    )
+    return query, params
+
+
+def montar_distribuicao(coluna, agrupar_por="urgencia_manual", **filtros):
+    """
+    Mínimo, quartis (posto mais próximo), máximo e contagem de `coluna` por grupo
+
+    Usa só funções de janela, disponíveis tanto no Databricks quanto no SQLite.
+    """
+    coluna = _validar(coluna, COLUNAS_NUMERICAS)
+    agrupar_por = _validar(agrupar_por, COLUNAS_CATEGORICAS)
+    condicoes, params = _montar_filtros(**filtros)
+    condicoes.append(f"{coluna} IS NOT NULL")
+    quartis = ", ".join(
+        f"MIN(CASE WHEN posicao >= {p} * total THEN valor END) AS {nome}"
+        for nome, p in (("q1", 0.25), ("mediana", 0.5), ("q3", 0.75))
+    )
+    query = (
+        f"SELECT grupo AS {agrupar_por}, COUNT(*) AS pacientes, MIN(valor) AS minimo, {quartis},"
+        f" MAX(valor) AS maximo FROM ("
+        f"SELECT {agrupar_por} AS grupo, {coluna} AS valor,"
+        f" ROW_NUMBER() OVER (PARTITION BY {agrupar_por} ORDER BY {coluna}) AS posicao,"
+        f" COUNT(*) OVER (PARTITION BY {agrupar_por}) AS total"
+        f" FROM {TABELA_TRIAGEM}{_onde(condicoes)}"
+        f") AS valores GROUP BY grupo"
+    )
+    return query, params
+
+
+def montar_estatisticas(**filtros):
+    """
+    Uma linha com total, pacientes por classificação (classe_0..classe_4, na
+    ordem de PRIORIDADES) e os INDICADORES_RISCO, numa única passada na tabela
+    """
+    condicoes, params = _montar_filtros(**filtros)
+    somas = ""
+    for i, prioridade in enumerate(PRIORIDADES):
+        params[f"classe_{i}"] = prioridade
+        somas += f", COALESCE(SUM(CASE WHEN urgencia_manual = %(classe_{i})s THEN 1 ELSE 0 END), 0) AS classe_{i}"
+    somas += "".join(
+        f", COALESCE(SUM(CASE WHEN {condicao} THEN 1 ELSE 0 END), 0) AS {nome}"
+        for nome, condicao in INDICADORES_RISCO.items()
+    )
+    query = f"SELECT COUNT(*) AS total{somas} FROM {TABELA_TRIAGEM}{_onde(condicoes)}"
+    return query, params
+
+
+class EstatisticasFila:
+    """
+    Resumo da fila num instante, lido por todos os widgets do dashboard
+
+    por_prioridade: Series classificação -> pacientes (só as presentes, da
+    maior contagem para a menor, como value_counts); risco: dict
+    choque/sepse/insuf_respiratoria.
+    """
+
+    def __init__(self, total, por_prioridade, risco):
+        self.total = int(total)
+        self.por_prioridade = por_prioridade
+        self.risco = risco
+
+    def __getitem__(self, prioridade):
+        return int(self.por_prioridade.get(prioridade, 0))
+
+    @property
+    def criticos(self):
+        return self["PRIORIDADE MÁXIMA"]
+
+    @property
+    def altos(self):
+        return self["ALTA PRIORIDADE"]
+
+    def percentual(self, pacientes):
+        """pacientes em % do total da fila (0 com a fila vazia)."""
+        return pacientes / self.total * 100 if self.total > 0 else 0.0
+
+
+# ----------------------------------------------------------------------
+# Execução (funções de cursor, para RepositorioTriagem.agregar)
+# ----------------------------------------------------------------------
+
+def histograma(cursor, coluna, largura, **filtros):
+    """DataFrame (faixa, pacientes) em ordem de faixa."""
+    query, params = montar_histograma(coluna, largura, **filtros)
+    return executar_consulta(cursor, query, params)
+
+
+def distribuicao(cursor, coluna, agrupar_por="urgencia_manual", **filtros):
+    """DataFrame com uma linha por grupo (pacientes, minimo, q1, mediana, q3, maximo)."""
+    query, params = montar_distribuicao(coluna, agrupar_por, **filtros)
+    return executar_consulta(cursor, query, params)
+
+
+def estatisticas(cursor, **filtros):
+    """EstatisticasFila com uma consulta só (ver montar_estatisticas)."""
+    query, params = montar_estatisticas(**filtros)
+    cursor.execute(query, params or None)
+    nomes = [desc[0] for desc in cursor.description]
+    linha = {nome: int(valor or 0) for nome, valor in zip(nomes, cursor.fetchone())}
+    contagens = pd.Series(
+        [linha[f"classe_{i}"] for i in range(len(PRIORIDADES))], index=list(PRIORIDADES), name="pacientes", dtype="int64"
+    )
+    por_prioridade = contagens[contagens > 0].sort_values(ascending=False, kind="stable")
+    return EstatisticasFila(linha["total"], por_prioridade, {nome: linha[nome] for nome in INDICADORES_RISCO})
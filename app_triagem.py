@@ -1,5 +1,4 @@
 ﻿import os
-import html
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -7,9 +6,9 @@ import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
 import uuid
-import time
 from auth import AuthSystem
 from databricks import sql
+from conexao_databricks import PoolConexoes
 
 # Importar módulo de ML
 try:
@@ -25,6 +24,22 @@ from scores_clinicos import calcular_todos_scores
 # Importar módulo de validação clínica
 from validacao_clinica import validar_predicao_ml, formatar_alerta_override
 
+# Importar camada de consultas e repositório da tabela de triagem
+from consultas_triagem import AGORA, COLUNAS_FILA, COLUNAS_HISTORICO, TODAS_COLUNAS
+from repositorio_triagem import (
+    RepositorioDatabricks, RepositorioSQLite, RepositorioSincronizado, RepositorioComDiario
+)
+from diario_escritas import DiarioEscritas
+from escritor_triagem import EscritorTriagem
+from indice_fila import IndiceFila
+from cache_figuras import CacheFiguras, assinatura_df
+import agregacoes_triagem as agregacoes
+from tema import montar_folha, publicar_folha
+from templates_html import (
+    BOAS_VINDAS_ACESSO, BOAS_VINDAS_CABECALHO, BOAS_VINDAS_PROTOCOLO, BOAS_VINDAS_RODAPE,
+    cabecalho_perfil, faixa_kpis,
+)
+
 # Configuração da página
 st.set_page_config(
     page_title="Avicena Care - Sistema de Triagem",
@@ -36,60 +51,78 @@ st.set_page_config(
 # Inicialização do sistema de autenticação
 auth_system = AuthSystem()
 
-@st.cache_resource
 def init_databricks_connection():
-    """Initializes a connection to the Databricks SQL Warehouse."""
+    """Opens a new connection to the Databricks SQL Warehouse."""
     return sql.connect(
         server_hostname=st.secrets["databricks"]["server_hostname"],
         http_path=st.secrets["databricks"]["http_path"],
         access_token=st.secrets["databricks"]["access_token"],
     )
 
-def setup_database(cursor):
-    """Creates the schema and table in Databricks and ensures all columns exist."""
-    # TODO: Update with your schema name if different from 'avicena_care'
-    cursor.execute("CREATE SCHEMA IF NOT EXISTS avicena_care") 
-    cursor.execute("""
-        -- TODO: Update with your table name if different from 'triagem'
-        CREATE TABLE IF NOT EXISTS avicena_care.triagem ( 
-            id STRING,
-            Nome STRING,
-            Idade INT,
-            PA STRING,
-            FC INT,
-            FR INT,
-            Temp DOUBLE,
-            SpO2 INT,
-            nivel_consciencia STRING,
-            genero STRING,
-            intensidade_dor INT,
-            Comorbidade STRING,
-            Alergia STRING,
-            Queixa_Principal STRING,
-            urgencia_automatica STRING,
-            urgencia_manual STRING,
-            status STRING,
-            data_cadastro TIMESTAMP,
-            data_atendimento TIMESTAMP,
-            medicacoes STRING
-        )
-    """)
-    
-    # Garantir que a coluna 'medicacoes' exista (para compatibilidade com versões antigas)
+@st.cache_resource
+def init_databricks_pool():
+    """Pool of Databricks connections shared by all sessions of the process."""
+    return PoolConexoes(
+        init_databricks_connection,
+        tamanho=int(st.secrets["databricks"].get("pool_size", 4)),
+    )
+
+def _config_armazenamento():
+    """Seção [storage] do secrets.toml (vazia se não houver secrets)."""
     try:
-        cursor.execute("ALTER TABLE avicena_care.triagem ADD COLUMN medicacoes STRING")
-        print("✅ Coluna 'medicacoes' adicionada à tabela 'triagem'.")
-    except Exception as e:
-        # Se a coluna já existir, o Databricks lançará um erro. Podemos ignorá-lo.
-        if "COLUMN_ALREADY_EXISTS" in str(e):
-            pass # A coluna já existe, o que é o esperado.
+        return dict(st.secrets.get("storage", {}))
+    except FileNotFoundError:
+        return {}
+
+@st.cache_resource
+def init_repositorio():
+    """
+    Repositório da tabela de triagem, escolhido por AVICENA_STORAGE ou
+    [storage] backend no secrets.toml:
+      - 'databricks' (padrão): direto no warehouse
+      - 'sqlite': só o arquivo local (offline / testes de carga)
+      - 'sincronizado': SQLite local com escrita replicada no Databricks
+    Com storage.diario = true (desligado por padrão), as escritas no
+    Databricks passam por um diário local: o cadastro é confirmado assim que
+    chega ao disco e as leituras já o enxergam enquanto ele espera o
+    warehouse. O número de escritas pendentes aparece na faixa de KPIs.
+    """
+    config = _config_armazenamento()
+    backend = os.environ.get("AVICENA_STORAGE") or config.get("backend", "databricks")
+    caminho = config.get("sqlite_path", "avicena_triagem.db")
+
+    if backend == "sqlite":
+        return RepositorioSQLite(caminho)
+
+    databricks = RepositorioDatabricks(init_databricks_pool())
+    diario = init_diario()
+    if backend == "sincronizado":
+        return RepositorioSincronizado(RepositorioSQLite(caminho), databricks, diario)
+    if config.get("diario", False):
+        return RepositorioComDiario(databricks, diario, ao_aplicar=invalidar_cache_triagem)
+    return databricks
 
-def load_initial_data(cursor):
+@st.cache_resource
+def init_diario():
+    """Diário local de escritas: um por processo, para um só replicador ler cada arquivo."""
+    return DiarioEscritas(_config_armazenamento().get("diario_path", "avicena_diario.db"))
+
+@st.cache_resource
+def init_escritor():
+    """
+    Destino das alterações da fila (reclassificação, alta, retorno)
+    Com o Databricks direto, um EscritorTriagem as grava no diário e as leva
+    ao warehouse em segundo plano; os demais repositórios já respondem na
+    hora (SQLite local ou diário próprio) e recebem a alteração direto.
+    """
+    repositorio = init_repositorio()
+    if isinstance(repositorio, RepositorioDatabricks):
+        return EscritorTriagem(repositorio, init_diario(), ao_aplicar=invalidar_cache_triagem)
+    return repositorio
+
+def load_initial_data(repositorio):
     """Loads initial sample data if the table is empty."""
-    # TODO: Update with your table name if you want to load initial data
-    # setup_database(cursor) # This can be commented out if your table already exists
-    cursor.execute("SELECT COUNT(*) FROM avicena_care.triagem")
-    if cursor.fetchone()[0] == 0:
+    if repositorio.contar() == 0:
         # Schema: Nome, Idade, PA, FC, FR, Temp, SpO2, nivel_consciencia, genero, intensidade_dor, Comorbidade, Alergia, Queixa_Principal, urgencia_automatica, urgencia_manual, status
         # Added 'medicacoes' as the 12th item in the tuple
         pacientes_exemplo = [
@@ -100,52 +133,211 @@ def load_initial_data(cursor):
         ]
         
         # Using a dictionary for insertion makes the code robust against schema changes.
-        for p in pacientes_exemplo:
-            data_dict = {
-                "id": str(uuid.uuid4()), "Nome": p[0], "Idade": p[1], "PA": p[2], "FC": p[3], "FR": p[4], "Temp": p[5], 
+        # Ids fixos: se o processo reiniciar antes de o lote chegar ao banco
+        # (diário), a nova carga repete os mesmos pacientes e é ignorada por id
+        registros = [
+            {
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"avicena-care/exemplo/{p[0]}")), "Nome": p[0], "Idade": p[1], "PA": p[2], "FC": p[3], "FR": p[4], "Temp": p[5], 
                 "SpO2": p[6], "nivel_consciencia": p[7], "genero": p[8], "intensidade_dor": p[9], "Comorbidade": p[10], 
                 "Alergia": p[11], "medicacoes": p[12], "Queixa_Principal": p[13], "urgencia_automatica": p[14],
                 "urgencia_manual": p[15], "status": p[16], "data_cadastro": datetime.now()
             }
-            cursor.execute("""
-                INSERT INTO avicena_care.triagem (
-                    -- TODO: Update table name and columns to match your schema
-                    id, Nome, Idade, PA, FC, FR, Temp, SpO2, nivel_consciencia, genero, intensidade_dor, 
-                    Comorbidade, Alergia, Queixa_Principal, urgencia_automatica, urgencia_manual, status, data_cadastro, medicacoes
-                )
-                VALUES (
-                    %(id)s, %(Nome)s, %(Idade)s, %(PA)s, %(FC)s, %(FR)s, %(Temp)s, %(SpO2)s, %(nivel_consciencia)s, 
-                    %(genero)s, %(intensidade_dor)s, %(Comorbidade)s, %(Alergia)s, %(Queixa_Principal)s, 
-                    %(urgencia_automatica)s, %(urgencia_manual)s, %(status)s, %(data_cadastro)s, %(medicacoes)s
-                )
-            """, data_dict)
-
-def get_data(status_filter: str = 'AGUARDANDO'):
-    """Busca dados de pacientes do banco"""
-    # Garante que o banco de dados e os dados iniciais existam antes de buscar
-    if status_filter == 'TODOS':
-        # TODO: Update with your table name
-        query = "SELECT * FROM avicena_care.triagem ORDER BY data_cadastro DESC"
-    elif status_filter == 'ATENDIDO':
-        # TODO: Update with your table name
-        query = "SELECT * FROM avicena_care.triagem WHERE status='ATENDIDO' ORDER BY data_atendimento DESC"
-    else:
-        # TODO: Update with your table name
-        query = f"SELECT * FROM avicena_care.triagem WHERE status='{status_filter}' ORDER BY data_cadastro DESC" 
-    
-    with db_conn.cursor() as cursor:
-        cursor.execute(query)
-        
-        # PERMANENT FIX: Use the standard DB-API 2.0 method to fetch data.
-        # This is more robust and avoids the specific 'fetchall_pandas()' method
-        # which is sensitive to connection state corruption.
-        columns = [desc[0] for desc in cursor.description]
-        data = cursor.fetchall()
-        return pd.DataFrame(data, columns=columns)
-
-def get_atendidos():
+            for p in pacientes_exemplo
+        ]
+        # Um único INSERT de várias linhas em vez de um por paciente
+        repositorio.inserir_lote(registros)
+        invalidar_cache_triagem()
+
+@st.cache_resource(show_spinner=False)
+def preparar_banco():
+    """Migra a tabela e carrega os dados iniciais uma vez por processo, e não a cada rerun do script."""
+    repositorio = init_repositorio()
+    # Cria/migra a tabela (colunas novas + backfill). Idempotente; sem permissão
+    # de DDL no warehouse, segue com a tabela como está.
+    try:
+        repositorio.preparar()
+    except Exception as e:
+        print(f"⚠️ Não foi possível preparar a tabela de triagem: {e}")
+    load_initial_data(repositorio)
+
+# Tempo de vida das leituras em cache. O cache é compartilhado entre sessões
+# e descartado explicitamente (invalidar_cache_triagem) a cada escrita do app;
+# o TTL só cobre alterações feitas fora deste processo.
+CACHE_TTL_SEGUNDOS = 15
+
+# Linhas por página no histórico de atendimentos
+TAMANHO_PAGINA_HISTORICO = 50
+
+# Pacientes da fila desenhados com widgets completos por página; o restante
+# aparece numa tabela compacta, para o custo do rerun não crescer com a fila
+TAMANHO_PAGINA_FILA = 15
+# Linhas da tabela compacta (os pacientes logo depois da página visível)
+LINHAS_TABELA_FILA = 200
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_data(status_filter: str = 'AGUARDANDO', colunas=None, **filtros):
+    """
+    Busca dados de pacientes do banco.
+    Status, filtros (período, prioridades, nome) e projeção de colunas vão
+    para o SQL; por padrão cada status traz só as colunas da sua tela.
+    """
+    if colunas is None:
+        colunas = {'AGUARDANDO': COLUNAS_FILA, 'ATENDIDO': COLUNAS_HISTORICO}.get(status_filter, TODAS_COLUNAS)
+    return repositorio.listar(
+        colunas=colunas,
+        status=None if status_filter == 'TODOS' else status_filter,
+        ordem='data_atendimento' if status_filter == 'ATENDIDO' else 'data_cadastro',
+        **filtros
+    )
+
+@st.cache_resource(show_spinner=False)
+def indice_fila():
+    """Ordem de atendimento da fila, compartilhada pelo processo e mantida a cada escrita."""
+    return IndiceFila()
+
+# Figuras da análise clínica (a quantidade de dados distintos em tela é pequena)
+CAPACIDADE_CACHE_FIGURAS = 64
+
+@st.cache_resource(show_spinner=False)
+def cache_figuras():
+    """Figuras Plotly já montadas e serializadas, compartilhadas entre sessões que veem os mesmos dados."""
+    return CacheFiguras(capacidade=CAPACIDADE_CACHE_FIGURAS)
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_fila():
+    """Pacientes aguardando (no Databricks, só as linhas alteradas desde a última leitura)."""
+    df = repositorio.fila()
+    # Só roda quando a leitura muda (fora do cache): reposiciona as linhas alteradas
+    indice_fila().sincronizar(df)
+    return df
+
+def get_atendidos(**filtros):
     """Busca pacientes já atendidos. Wrapper around get_data for backward compatibility."""
-    return get_data(status_filter='ATENDIDO')
+    return get_data(status_filter='ATENDIDO', **filtros)
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_pagina_atendidos(apos=None, **filtros):
+    """Página do histórico de atendidos (paginação por keyset, ver buscar_pagina)."""
+    return repositorio.pagina(
+        TAMANHO_PAGINA_HISTORICO, apos=apos, status='ATENDIDO',
+        ordem='data_atendimento', colunas=COLUNAS_HISTORICO, **filtros
+    )
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def contar_atendidos():
+    """Total de pacientes atendidos."""
+    return repositorio.contar(status='ATENDIDO', ordem='data_atendimento')
+
+# Resumos da fila calculados no banco: só a tabela agregada chega ao app
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_estatisticas_fila():
+    """
+    Total, pacientes por classificação e indicadores de risco da fila, numa
+    consulta só; KPIs, gráficos de prioridade e alertas leem deste mesmo resumo
+    """
+    return repositorio.agregar(agregacoes.estatisticas, status='AGUARDANDO')
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_histograma_fila(coluna, largura):
+    """Pacientes aguardando por faixa de `coluna` (DataFrame faixa, pacientes)."""
+    return repositorio.agregar(agregacoes.histograma, coluna, largura, status='AGUARDANDO')
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, show_spinner=False)
+def get_distribuicao_fila(coluna):
+    """Quartis de `coluna` por classificação, para box plots."""
+    return repositorio.agregar(agregacoes.distribuicao, coluna, 'urgencia_manual', status='AGUARDANDO')
+
+# Alterações feitas nesta sessão que estão no diário local (escritor ou
+# storage.diario) e ainda não chegaram ao banco. Descartadas quando a entrada
+# do diário é aplicada (ou descartada) ou quando a leitura já reflete a alteração.
+def registrar_alteracao_otimista(paciente_id, seq, **valores):
+    """Guarda a alteração na sessão para a fila já aparecer atualizada no próximo rerun."""
+    pendentes = st.session_state.setdefault('alteracoes_pendentes', {})
+    if seq is None:
+        # Escrita já visível nas leituras: nenhuma alteração anterior a sobrepor
+        pendentes.pop(str(paciente_id), None)
+        return
+    anterior = pendentes.get(str(paciente_id), {}).get('valores', {})
+    pendentes[str(paciente_id)] = {'valores': {**anterior, **valores}, 'seq': seq}
+
+def aplicar_alteracoes_otimistas(df):
+    """Aplica sobre a fila lida do banco as alterações da sessão ainda não refletidas nela."""
+    pendentes = st.session_state.get('alteracoes_pendentes')
+    if not pendentes or df.empty:
+        return df
+
+    ids = df['id'].astype(str)
+    df = df.copy()
+    for paciente_id, alteracao in list(pendentes.items()):
+        linhas = ids == paciente_id
+        valores = alteracao['valores']
+        refletida = (
+            not linhas.any() if valores.get('status') == 'ATENDIDO'
+            else all((df.loc[linhas, c] == v).all() for c, v in valores.items() if c in df.columns)
+        )
+        if refletida or not escritor.pendente(alteracao['seq']):
+            del pendentes[paciente_id]
+            continue
+        if valores.get('status') == 'ATENDIDO':
+            df = df[~linhas]
+            ids = ids[~linhas]
+        else:
+            for coluna, valor in valores.items():
+                if coluna in df.columns:
+                    df.loc[linhas, coluna] = valor
+    return df
+
+def gravar_alteracao(paciente_id, valores, chave_aviso, ao_gravar=None):
+    """
+    Entrega a alteração de um paciente ao escritor (init_escritor) antes do próximo rerun
+
+    Reclassificação, alta e retorno à fila passam todos por aqui. No
+    Databricks a alteração só vai para o diário local na thread do clique;
+    o warehouse é atualizado em segundo plano e, até lá, a sessão a vê por
+    aplicar_alteracoes_otimistas. Devolve True se a escrita foi aceita; se
+    falhar, nada muda na sessão e o erro vai para st.session_state[chave_aviso].
+    `ao_gravar` (ex.: mexer no índice da fila, que guarda alterações locais
+    até a leitura do banco confirmá-las) roda depois de aceita.
+    """
+    try:
+        seq = escritor.atualizar(paciente_id, valores)
+    except Exception as e:
+        st.session_state[chave_aviso] = f"❌ Não foi possível salvar a alteração: {e}"
+        return False
+    invalidar_cache_triagem()
+    registrar_alteracao_otimista(paciente_id, seq, **valores)
+    if ao_gravar is not None:
+        ao_gravar()
+    return True
+
+def _reclassificar(paciente_id):
+    """Callback do botão ✓: grava a reclassificação e reposiciona o paciente na fila."""
+    nova_urgencia = st.session_state[f"urgencia_{paciente_id}"]
+    if gravar_alteracao(paciente_id, {'urgencia_manual': nova_urgencia}, 'aviso_fila',
+                        ao_gravar=lambda: indice_fila().reclassificar(paciente_id, nova_urgencia)):
+        # Exibido pelo fragmento da fila: callbacks de fragmento não devem desenhar elementos
+        st.session_state['aviso_fila'] = "✓ Urgência atualizada"
+
+def _marcar_atendido(paciente_id, nome):
+    """Callback do botão de alta: grava a mudança de status e tira o paciente da fila."""
+    if gravar_alteracao(paciente_id, {'status': 'ATENDIDO', 'data_atendimento': AGORA}, 'aviso_fila',
+                        ao_gravar=lambda: indice_fila().remover(paciente_id)):
+        st.session_state['aviso_fila'] = f"✅ {nome} marcado como atendido!"
+
+def _retornar_fila(paciente_id, nome):
+    """Callback do histórico: devolve o paciente à fila pelo mesmo caminho da alta."""
+    if gravar_alteracao(paciente_id, {'status': 'AGUARDANDO', 'data_atendimento': None}, 'aviso_historico'):
+        st.session_state['aviso_historico'] = f"✅ {nome} retornou à fila!"
+
+def invalidar_cache_triagem():
+    """Descarta as leituras em cache. Chamar após toda escrita na tabela de triagem."""
+    get_data.clear()
+    get_fila.clear()
+    get_pagina_atendidos.clear()
+    contar_atendidos.clear()
+    get_estatisticas_fila.clear()
+    get_histograma_fila.clear()
+    get_distribuicao_fila.clear()
 
 def calcular_urgencia(
     temperatura,
@@ -283,47 +475,201 @@ def calcular_urgencia(
             alertas,
         )
 
+# ==================== URGÊNCIA EM LOTE (VETORIZADA) ====================
+# Mesmas faixas de calcular_urgencia, na ordem do retorno escalar:
+# (nivel, cor, emoji, descricao). O código do nível é o índice nesta tupla.
+NIVEIS_URGENCIA = (
+    ("PRIORIDADE MÁXIMA", "#dc2626", "🔴", "Atendimento imediato"),
+    ("ALTA PRIORIDADE", "#ea580c", "🟠", "Muito urgente"),
+    ("MÉDIA PRIORIDADE", "#eab308", "🟡", "Urgente"),
+    ("BAIXA PRIORIDADE", "#16a34a", "🟢", "Pouco urgente"),
+    ("MÍNIMA (ELETIVA)", "#2563eb", "🔵", "Sem sinais agudos"),
+)
+
+# Cada alerta ocupa um bit (bit i = ALERTAS_URGENCIA[i]). A ordem segue a
+# ordem em que calcular_urgencia monta a lista, então decodificar a máscara
+# reproduz exatamente a lista 'alertas' da versão escalar.
+ALERTAS_URGENCIA = (
+    "FR crítica",
+    "FR levemente alterada",
+    "FR moderada",
+    "SpO₂ crítica",
+    "SpO₂ moderada",
+    "SpO₂ levemente alterada",
+    "PA sistólica crítica",
+    "PA sistólica moderada",
+    "PA sistólica levemente alterada",
+    "FC crítica",
+    "FC levemente alterada",
+    "FC moderada",
+    "Hipotermia grave",
+    "Temperatura levemente baixa",
+    "Temperatura levemente elevada",
+    "Febre alta",
+    "Alteração de consciência",
+)
+_BIT_ALERTA = {alerta: 1 << i for i, alerta in enumerate(ALERTAS_URGENCIA)}
+
+
+def _pontuar_faixas(condicoes, pontos, alertas):
+    """Aplica faixas mutuamente exclusivas (primeira condição verdadeira vence)."""
+    bits = [_BIT_ALERTA[a] if a else 0 for a in alertas]
+    return np.select(condicoes, pontos, 0), np.select(condicoes, bits, 0)
+
+
+def calcular_urgencia_lote(
+    temperatura,
+    pa_sistolica,
+    pa_diastolica,
+    freq_respiratoria,
+    freq_cardiaca,
+    idade,
+    spo2=None,
+    nivel_consciencia="Alerta",
+):
+    """
+    Versão vetorizada de calcular_urgencia para muitos pacientes de uma vez.
+    Aceita arrays NumPy, Series ou escalares (com broadcast). SpO₂ ausente
+    (None/NaN) é tratado como na versão escalar: não pontua.
+    Retorna: DataFrame com 'nivel' (categórico), 'pontuacao' e 'alertas'
+    (máscara de bits sobre ALERTAS_URGENCIA; ver decodificar_alertas).
+    """
+    # None em float vira NaN, então SpO₂ ausente pode vir escalar ou por linha
+    temp, pas, fr, fc, sat = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float))
+          for v in (temperatura, pa_sistolica, freq_respiratoria, freq_cardiaca,
+                    np.nan if spo2 is None else spo2))
+    )
+    consciencia = pd.Series(np.broadcast_to(np.asarray(nivel_consciencia, dtype=object), temp.shape))
+    alerta = consciencia.fillna("Alerta").astype(str).str.lower().eq("alerta").to_numpy()
+
+    partes = [
+        # FR
+        _pontuar_faixas(
+            [(fr <= 8) | (fr >= 25), (fr >= 9) & (fr <= 11), (fr >= 21) & (fr <= 24)],
+            [3, 1, 2],
+            ["FR crítica", "FR levemente alterada", "FR moderada"],
+        ),
+        # SpO2 (NaN falha em todas as comparações)
+        _pontuar_faixas(
+            [sat <= 91, (sat >= 92) & (sat <= 93), (sat >= 94) & (sat <= 95)],
+            [3, 2, 1],
+            ["SpO₂ crítica", "SpO₂ moderada", "SpO₂ levemente alterada"],
+        ),
+        # PA sistólica
+        _pontuar_faixas(
+            [(pas <= 90) | (pas >= 220), (pas >= 91) & (pas <= 100), (pas >= 101) & (pas <= 110)],
+            [3, 2, 1],
+            ["PA sistólica crítica", "PA sistólica moderada", "PA sistólica levemente alterada"],
+        ),
+        # FC
+        _pontuar_faixas(
+            [(fc <= 40) | (fc >= 131), (fc >= 41) & (fc <= 50), (fc >= 51) & (fc <= 90),
+             (fc >= 91) & (fc <= 110), (fc >= 111) & (fc <= 130)],
+            [3, 1, 0, 1, 2],
+            ["FC crítica", "FC levemente alterada", None, "FC levemente alterada", "FC moderada"],
+        ),
+        # Temperatura
+        _pontuar_faixas(
+            [temp <= 35.0, (temp >= 35.1) & (temp <= 36.0), (temp >= 36.1) & (temp <= 37.0),
+             (temp >= 37.1) & (temp <= 39.0), temp >= 39.1],
+            [3, 1, 0, 1, 2],
+            ["Hipotermia grave", "Temperatura levemente baixa", None,
+             "Temperatura levemente elevada", "Febre alta"],
+        ),
+        # Nível de consciência
+        _pontuar_faixas([~alerta], [3], ["Alteração de consciência"]),
+    ]
+    pontos = sum(p for p, _ in partes)
+    mascara = np.bitwise_or.reduce([b for _, b in partes])
+
+    # Regra de exceção: parâmetro crítico extremo
+    excecao = (
+        (fr <= 8) | (fr >= 25) | (sat <= 85) | (pas < 80)
+        | (fc < 40) | (fc > 150) | ~alerta
+    )
+    codigo = np.select(
+        [excecao | (pontos >= 7), pontos >= 5, pontos >= 3, pontos >= 1],
+        [0, 1, 2, 3],
+        4,
+    )
+
+    indice = getattr(temperatura, "index", None)
+    return pd.DataFrame(
+        {
+            "nivel": pd.Categorical.from_codes(codigo, [n[0] for n in NIVEIS_URGENCIA]),
+            "pontuacao": pontos.astype(np.int64),
+            "alertas": mascara.astype(np.int32),
+        },
+        index=indice if indice is not None and len(indice) == len(codigo) else None,
+    )
+
+
+def pressao_arterial_df(df):
+    """
+    PA sistólica e diastólica numéricas de um DataFrame da tabela triagem.
+    Usa PA_Sistolica/PA_Diastolica; só separa a string 'sis/dia' para linhas
+    ainda sem backfill (ou DataFrames sem essas colunas).
+    """
+    if "PA_Sistolica" in df.columns and "PA_Diastolica" in df.columns:
+        sistolica = pd.to_numeric(df["PA_Sistolica"], errors="coerce")
+        diastolica = pd.to_numeric(df["PA_Diastolica"], errors="coerce")
+    else:
+        sistolica = pd.Series(np.nan, index=df.index)
+        diastolica = pd.Series(np.nan, index=df.index)
+    faltando = sistolica.isna()
+    if faltando.any() and "PA" in df.columns:
+        pa = df.loc[faltando, "PA"].astype(str).str.split("/", n=1, expand=True)
+        sistolica[faltando] = pd.to_numeric(pa[0], errors="coerce")
+        if pa.shape[1] > 1:
+            diastolica[faltando] = pd.to_numeric(pa[1], errors="coerce")
+    return sistolica, diastolica
+
+
+def calcular_urgencia_df(df):
+    """Reclassifica em lote um DataFrame no formato da tabela triagem."""
+    pa_sistolica, pa_diastolica = pressao_arterial_df(df)
+    return calcular_urgencia_lote(
+        temperatura=df["Temp"],
+        pa_sistolica=pa_sistolica,
+        pa_diastolica=pa_diastolica,
+        freq_respiratoria=df["FR"],
+        freq_cardiaca=df["FC"],
+        idade=df["Idade"],
+        spo2=df["SpO2"] if "SpO2" in df.columns else None,
+        nivel_consciencia=df["nivel_consciencia"] if "nivel_consciencia" in df.columns else "Alerta",
+    )
+
+
+def decodificar_alertas(mascara):
+    """Converte a máscara de bits de calcular_urgencia_lote na lista de alertas da versão escalar."""
+    mascara = int(mascara)
+    return [alerta for i, alerta in enumerate(ALERTAS_URGENCIA) if mascara & (1 << i)]
+
 # ==================== FUNÇÕES AUXILIARES ====================
 def mostrar_fila_pacientes(df):
     """Mostra a fila de pacientes aguardando atendimento"""
     st.markdown("### 🧾 Fila de Atendimento")
     
-    # CSS para botão de atualizar urgência
-    st.markdown("""
-    <style>
-    /* Botão de atualizar urgência mais compacto e claro */
-    button[kind="secondary"] {
-        height: 38px !important;
-        min-height: 38px !important;
-        padding: 0 12px !important;
-        background-color: #f1f5f9 !important;
-        color: #1e293b !important;
-        border: 1px solid #cbd5e1 !important;
-    }
-    button[kind="secondary"]:hover {
-        background-color: #e2e8f0 !important;
-        border-color: #94a3b8 !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     if df.empty:
         st.info("📋 Nenhum paciente na fila de atendimento no momento.")
         return
     
-    # Definir ordem de prioridade
-    prioridade_ordem = {
-        'PRIORIDADE MÁXIMA': 1,
-        'ALTA PRIORIDADE': 2,
-        'MÉDIA PRIORIDADE': 3,
-        'BAIXA PRIORIDADE': 4,
-        'MÍNIMA (ELETIVA)': 5
-    }
+    # Ordem de atendimento vem pronta do índice da fila (prioridade, chegada):
+    # só as linhas até o fim da página são buscadas; as que o índice ainda
+    # não conhece vão para o fim
+    indice = indice_fila()
+    ids = pd.Index(df['id'].astype(str))
     
-    # Adicionar coluna de ordem e ordenar
-    df_ordenado = df.copy()
-    df_ordenado['ordem_prioridade'] = df_ordenado['urgencia_manual'].map(prioridade_ordem).fillna(6)
-    df_ordenado = df_ordenado.sort_values('ordem_prioridade')
+    # Paginação: widgets só para a página visível
+    total = len(df)
+    paginas = (total - 1) // TAMANHO_PAGINA_FILA + 1
+    pagina = min(st.session_state.get('fila_pagina', 0), paginas - 1)
+    st.session_state['fila_pagina'] = pagina
+    inicio = pagina * TAMANHO_PAGINA_FILA
+    df_pagina = df.iloc[indice.fatia(ids, inicio, inicio + TAMANHO_PAGINA_FILA)]
+    if paginas > 1:
+        st.caption(f"Pacientes {inicio + 1}–{inicio + len(df_pagina)} de {total} na fila")
     
     # Mapas de cores e emojis
     cor_map = {
@@ -350,7 +696,7 @@ def mostrar_fila_pacientes(df):
         'MÍNIMA (ELETIVA)': '240 min'
     }
     
-    for idx, paciente in df_ordenado.iterrows():
+    for idx, paciente in df_pagina.iterrows():
         urgencia = paciente.get('urgencia_manual', 'MÉDIA PRIORIDADE')
         cor = cor_map.get(urgencia, '#64748b')
         emoji = emoji_map.get(urgencia, '⚪')
@@ -394,89 +740,60 @@ def mostrar_fila_pacientes(df):
                         label_visibility="collapsed"
                     )
                 
+                # Os callbacks rodam antes do rerun: a fila já é desenhada com a
+                # alteração gravada
                 with col_btn:
-                    if st.button("✓", key=f"btn_urgencia_{paciente['id']}", help="Atualizar urgência", type="secondary"):
-                        cursor = db_conn.cursor()
-                        cursor.execute(
-                            # TODO: Update with your table name
-                            "UPDATE avicena_care.triagem SET urgencia_manual = ? WHERE id = ?",
-                            (nova_urgencia, str(paciente['id']))
-                        )
-                        
-                        st.success("✓ Atualizado")
-                        time.sleep(0.3)
-                        st.rerun()
+                    st.button(
+                        "✓", key=f"btn_urgencia_{paciente['id']}", help="Atualizar urgência", type="secondary",
+                        on_click=_reclassificar, args=(str(paciente['id']),)
+                    )
             
             with col_atender:
                 st.markdown("**✅ Finalizar Atendimento**")
-                if st.button("🏥 Marcar como Atendido", key=f"btn_atendido_{paciente['id']}", type="primary", use_container_width=True):
-                    cursor = db_conn.cursor()
-                    cursor.execute(
-                        # TODO: Update with your table name
-                        "UPDATE avicena_care.triagem SET status = 'ATENDIDO', data_atendimento = now() WHERE id = ?",
-                        (str(paciente['id']),)
-                    )
-                    st.success(f"✅ {paciente['Nome']} marcado como atendido!")
-                    time.sleep(0.5)
-                    st.rerun()
+                st.button(
+                    "🏥 Marcar como Atendido", key=f"btn_atendido_{paciente['id']}", type="primary", use_container_width=True,
+                    on_click=_marcar_atendido, args=(str(paciente['id']), paciente['Nome'])
+                )
+    
+    if paginas == 1:
+        return
+    
+    # Navegação entre páginas
+    col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+    with col_anterior:
+        if pagina > 0 and st.button("⬅️ Anteriores", key="fila_anterior", use_container_width=True):
+            st.session_state['fila_pagina'] = pagina - 1
+            st.rerun(scope="fragment")
+    with col_pagina:
+        st.caption(f"Página {pagina + 1} de {paginas}")
+    with col_proxima:
+        if pagina < paginas - 1 and st.button("Próximos ➡️", key="fila_proxima", use_container_width=True):
+            st.session_state['fila_pagina'] = pagina + 1
+            st.rerun(scope="fragment")
+    
+    # Próximos pacientes depois da página numa tabela só (um único componente,
+    # rolagem no navegador), fatiados do índice como a própria página
+    fim = inicio + TAMANHO_PAGINA_FILA
+    restantes = total - fim
+    if restantes <= 0:
+        return
+    with st.expander(f"📋 Próximos na fila ({restantes})", expanded=False):
+        proximos = df.iloc[indice.fatia(ids, fim, fim + LINHAS_TABELA_FILA)]
+        tabela = proximos[[c for c in ('Nome', 'Idade', 'urgencia_manual', 'PA', 'FC', 'FR', 'Temp', 'Queixa_Principal')
+                           if c in proximos.columns]]
+        st.dataframe(
+            tabela.set_axis(pd.RangeIndex(fim + 1, fim + 1 + len(tabela), name='Posição'))
+                  .rename(columns={'urgencia_manual': 'Urgência'}),
+            use_container_width=True,
+            height=min(400, 35 * (len(tabela) + 1) + 3),
+        )
+        if restantes > len(tabela):
+            st.caption(f"Mais {restantes - len(tabela)} paciente(s) nas páginas seguintes.")
 
 def mostrar_form_novo_paciente():
     """Formulário para cadastro de novo paciente"""
     st.markdown("### ➕ Cadastrar Novo Paciente")
     
-    # CSS para formulário com fundo branco
-    st.markdown("""
-    <style>
-    /* Fundo branco para inputs de texto */
-    div[data-testid="stForm"] input[type="text"],
-    div[data-testid="stForm"] input[type="number"],
-    div[data-testid="stForm"] textarea {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        border: 1px solid #cbd5e1 !important;
-    }
-    
-    /* Fundo branco para selectbox */
-    div[data-testid="stForm"] div[data-baseweb="select"] > div {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-    }
-    
-    /* Botões +/- dos campos numéricos com fundo claro - múltiplos seletores */
-    div[data-testid="stForm"] button[kind="stepUpButton"],
-    div[data-testid="stForm"] button[kind="stepDownButton"],
-    div[data-testid="stForm"] button[data-testid="stNumberInputStepUp"],
-    div[data-testid="stForm"] button[data-testid="stNumberInputStepDown"],
-    div[data-testid="stForm"] div[data-testid="stNumberInput"] button {
-        background-color: #f1f5f9 !important;
-        color: #1e293b !important;
-        border: 1px solid #cbd5e1 !important;
-    }
-    
-    div[data-testid="stForm"] button[kind="stepUpButton"]:hover,
-    div[data-testid="stForm"] button[kind="stepDownButton"]:hover,
-    div[data-testid="stForm"] button[data-testid="stNumberInputStepUp"]:hover,
-    div[data-testid="stForm"] button[data-testid="stNumberInputStepDown"]:hover,
-    div[data-testid="stForm"] div[data-testid="stNumberInput"] button:hover {
-        background-color: #e2e8f0 !important;
-        color: #0f172a !important;
-    }
-    
-    /* Forçar cores nos SVG dos botões */
-    div[data-testid="stForm"] button[kind="stepUpButton"] svg,
-    div[data-testid="stForm"] button[kind="stepDownButton"] svg,
-    div[data-testid="stForm"] div[data-testid="stNumberInput"] button svg {
-        fill: #1e293b !important;
-        color: #1e293b !important;
-    }
-    
-    /* Placeholder com cor clara */
-    div[data-testid="stForm"] input::placeholder,
-    div[data-testid="stForm"] textarea::placeholder {
-        color: #94a3b8 !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
     
     with st.form("form_novo_paciente"):
         # Seção: Dados Pessoais
@@ -570,6 +887,8 @@ def mostrar_form_novo_paciente():
                         "Nome": nome,
                         "Idade": int(idade),
                         "PA": f"{int(pa_sistolica)}/{int(pa_diastolica)}",
+                        "PA_Sistolica": int(pa_sistolica),
+                        "PA_Diastolica": int(pa_diastolica),
                         "FC": int(freq_cardiaca),
                         "FR": int(freq_respiratoria),
                         "Temp": float(temperatura),
@@ -586,19 +905,12 @@ def mostrar_form_novo_paciente():
                         "medicacoes": medicacoes if medicacoes else "Nenhuma",
                         "data_cadastro": datetime.now()
                     }
-                    cursor = db_conn.cursor()
-                    cursor.execute("""
-                        -- TODO: Update with your table name and columns
-                        INSERT INTO avicena_care.triagem (
-                            id, Nome, Idade, PA, FC, FR, Temp, Comorbidade, Alergia,
-                            Queixa_Principal, urgencia_automatica, urgencia_manual, status,
-                            SpO2, nivel_consciencia, genero, intensidade_dor, data_cadastro, medicacoes
-                        ) VALUES (
-                            %(id)s, %(Nome)s, %(Idade)s, %(PA)s, %(FC)s, %(FR)s, %(Temp)s, %(Comorbidade)s, %(Alergia)s,
-                            %(Queixa_Principal)s, %(urgencia_automatica)s, %(urgencia_manual)s, %(status)s,
-                            %(SpO2)s, %(nivel_consciencia)s, %(genero)s, %(intensidade_dor)s, %(data_cadastro)s, %(medicacoes)s
-                        )
-                    """, patient_insert_data)
+                    repositorio.inserir(patient_insert_data)
+                    indice_fila().inserir(
+                        patient_insert_data['id'], patient_insert_data['urgencia_manual'],
+                        patient_insert_data['data_cadastro']
+                    )
+                    invalidar_cache_triagem()
                     
                     st.success(f"✅ Paciente {nome} cadastrado com sucesso!")
                     
@@ -764,6 +1076,31 @@ def mostrar_form_novo_paciente():
             else:
                 st.error("❌ Preencha os campos obrigatórios (Nome e Queixa)")
 
+# Largura das faixas dos histogramas da análise clínica
+FAIXA_HISTOGRAMA = {'Temp': 0.25, 'FC': 5}
+
+def figura_histograma(histograma, largura, **kwargs):
+    """Histograma a partir das faixas já contadas no banco (colunas faixa, pacientes)."""
+    fig = px.bar(histograma.assign(faixa=histograma['faixa'] + largura / 2), x='faixa', y='pacientes', **kwargs)
+    fig.update_traces(width=largura, marker_line=dict(color='white', width=1))
+    return fig
+
+def figura_quartis(distribuicao, color_discrete_map, title, labels, template):
+    """Box plot a partir dos quartis calculados no banco (uma caixa por prioridade)."""
+    fig = go.Figure()
+    for linha in distribuicao.itertuples(index=False):
+        grupo = linha.urgencia_manual
+        fig.add_trace(go.Box(
+            x=[grupo], q1=[linha.q1], median=[linha.mediana], q3=[linha.q3],
+            lowerfence=[linha.minimo], upperfence=[linha.maximo],
+            name=grupo, marker_color=color_discrete_map.get(grupo, '#64748b'),
+        ))
+    fig.update_layout(
+        template=template, title=title,
+        xaxis_title=labels['urgencia_manual'], yaxis_title=labels['valor'],
+    )
+    return fig
+
 def mostrar_analise_clinica(df):
     """Análise clínica com visualizações elegantes e clinicamente relevantes"""
     
@@ -771,6 +1108,10 @@ def mostrar_analise_clinica(df):
         st.info("📊 Nenhum dado disponível para análise.")
         return
     
+    # Figuras reaproveitadas enquanto os dados não mudarem
+    figuras = cache_figuras()
+    assinatura = assinatura_df(df)
+    
     # Configuração de tema claro para os gráficos com texto escuro
     template = "plotly_white"
     
@@ -829,11 +1170,6 @@ def mostrar_analise_clinica(df):
     
     # ==================== HEADER COMPACTO ====================
     st.markdown("""
-    <style>
-    .analise-header h2, .analise-header p {
-        color: #ffffff !important;
-    }
-    </style>
     <div class='analise-header' style='background: linear-gradient(135deg, #036672 0%, #059669 100%); 
                 padding: 15px 20px; border-radius: 8px; margin-bottom: 30px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
         <h2 style='margin: 0; font-size: 1.4rem;'>📊 Análise Clínica e Correlações</h2>
@@ -843,8 +1179,11 @@ def mostrar_analise_clinica(df):
     </div>
     """, unsafe_allow_html=True)
     
-    # Calcular total de pacientes
-    total = len(df)
+    # Resumo da fila agregado no banco (barras, pizza, treemap e indicadores)
+    estatisticas = get_estatisticas_fila()
+    prioridade_counts = estatisticas.por_prioridade
+    assinatura_contagem = assinatura_df(prioridade_counts.to_frame())
+    total = estatisticas.total
     
     # ==================== SEÇÃO 2: PANORAMA GERAL ====================
     st.markdown("""
@@ -857,96 +1196,103 @@ def mostrar_analise_clinica(df):
     with col1:
         if 'urgencia_manual' in df.columns:
             # Gráfico de barras horizontal
-            prioridade_counts = df['urgencia_manual'].value_counts()
             prioridade_df = pd.DataFrame({
                 'Prioridade': prioridade_counts.index,
                 'Pacientes': prioridade_counts.values
             })
             
-            fig_barras = px.bar(
-                prioridade_df, 
-                y='Prioridade', 
-                x='Pacientes',
-                color='Prioridade',
-                color_discrete_map=cores_prioridade,
-                orientation='h',
-                text='Pacientes',
-                labels={'Pacientes': 'Pacientes'},
-                template=template
-            )
+            def construir():
+                fig_barras = px.bar(
+                    prioridade_df, 
+                    y='Prioridade', 
+                    x='Pacientes',
+                    color='Prioridade',
+                    color_discrete_map=cores_prioridade,
+                    orientation='h',
+                    text='Pacientes',
+                    labels={'Pacientes': 'Pacientes'},
+                    template=template
+                )
             
-            fig_barras.update_traces(
-                textposition='outside', 
-                textfont=dict(size=12, color='#000000', family='Arial', weight='bold'),
-                marker=dict(line=dict(color='white', width=2), opacity=0.9),
-                hovertemplate='<b>%{y}</b><br>Pacientes: %{x}<extra></extra>'
-            )
+                fig_barras.update_traces(
+                    textposition='outside', 
+                    textfont=dict(size=12, color='#000000', family='Arial', weight='bold'),
+                    marker=dict(line=dict(color='white', width=2), opacity=0.9),
+                    hovertemplate='<b>%{y}</b><br>Pacientes: %{x}<extra></extra>'
+                )
             
-            layout_barras = config_layout.copy()
-            layout_barras.pop('title', None)  # Remove título undefined
-            layout_barras['yaxis'] = {
-                'categoryorder': 'array', 
-                'categoryarray': ['MÍNIMA (ELETIVA)', 'BAIXA PRIORIDADE', 'MÉDIA PRIORIDADE', 'ALTA PRIORIDADE', 'PRIORIDADE MÁXIMA'],
-                'title': None,
-                'tickfont': dict(size=10, color='#475569')
-            }
-            layout_barras['xaxis'] = {
-                'title': dict(text='Número de Pacientes', font=dict(size=11, color='#64748b')),
-                'tickfont': dict(size=10, color='#64748b'),
-                'gridcolor': '#f1f5f9'
-            }
-            layout_barras['plot_bgcolor'] = 'white'
-            layout_barras['paper_bgcolor'] = 'white'
+                layout_barras = config_layout.copy()
+                layout_barras.pop('title', None)  # Remove título undefined
+                layout_barras['yaxis'] = {
+                    'categoryorder': 'array', 
+                    'categoryarray': ['MÍNIMA (ELETIVA)', 'BAIXA PRIORIDADE', 'MÉDIA PRIORIDADE', 'ALTA PRIORIDADE', 'PRIORIDADE MÁXIMA'],
+                    'title': None,
+                    'tickfont': dict(size=10, color='#475569')
+                }
+                layout_barras['xaxis'] = {
+                    'title': dict(text='Número de Pacientes', font=dict(size=11, color='#64748b')),
+                    'tickfont': dict(size=10, color='#64748b'),
+                    'gridcolor': '#f1f5f9'
+                }
+                layout_barras['plot_bgcolor'] = 'white'
+                layout_barras['paper_bgcolor'] = 'white'
             
-            fig_barras.update_layout(
-                showlegend=False,
-                height=300,
-                margin=dict(l=150, r=50, t=30, b=50),
-                **layout_barras
-            )
+                fig_barras.update_layout(
+                    showlegend=False,
+                    height=300,
+                    margin=dict(l=150, r=50, t=30, b=50),
+                    **layout_barras
+                )
+                return fig_barras
+
+            fig_barras = figuras.obter('barras', construir, assinatura_contagem)
             
             st.plotly_chart(fig_barras, use_container_width=True, config={'displayModeBar': False})
     
     with col2:
         if 'urgencia_manual' in df.columns:
             # Pizza com proporção
-            fig_pizza = px.pie(
-                values=prioridade_counts.values, 
-                names=prioridade_counts.index,
-                color=prioridade_counts.index,
-                color_discrete_map=cores_prioridade,
-                template=template,
-                hole=0.5  # Donut chart mais fino
-            )
+            def construir():
+                fig_pizza = px.pie(
+                    values=prioridade_counts.values, 
+                    names=prioridade_counts.index,
+                    color=prioridade_counts.index,
+                    color_discrete_map=cores_prioridade,
+                    template=template,
+                    hole=0.5  # Donut chart mais fino
+                )
             
-            pizza_layout = config_layout.copy()
-            pizza_layout.pop('title', None)  # Remove título undefined
-            pizza_layout['plot_bgcolor'] = 'white'
-            pizza_layout['paper_bgcolor'] = 'white'
-            pizza_layout['height'] = 300
-            pizza_layout['margin'] = dict(l=20, r=120, t=30, b=20)
-            pizza_layout['showlegend'] = True
-            pizza_layout['legend'] = dict(
-                orientation="v",
-                yanchor="middle",
-                y=0.5,
-                xanchor="left",
-                x=1.05,
-                font=dict(size=9, color='#475569'),
-                bgcolor='rgba(255,255,255,0.8)',
-                bordercolor='#e5e7eb',
-                borderwidth=1
-            )
+                pizza_layout = config_layout.copy()
+                pizza_layout.pop('title', None)  # Remove título undefined
+                pizza_layout['plot_bgcolor'] = 'white'
+                pizza_layout['paper_bgcolor'] = 'white'
+                pizza_layout['height'] = 300
+                pizza_layout['margin'] = dict(l=20, r=120, t=30, b=20)
+                pizza_layout['showlegend'] = True
+                pizza_layout['legend'] = dict(
+                    orientation="v",
+                    yanchor="middle",
+                    y=0.5,
+                    xanchor="left",
+                    x=1.05,
+                    font=dict(size=9, color='#475569'),
+                    bgcolor='rgba(255,255,255,0.8)',
+                    bordercolor='#e5e7eb',
+                    borderwidth=1
+                )
             
-            fig_pizza.update_layout(**pizza_layout)
+                fig_pizza.update_layout(**pizza_layout)
             
-            fig_pizza.update_traces(
-                textfont=dict(size=11, color='#000000', family='Arial', weight='bold'),
-                textposition='inside',
-                textinfo='percent',
-                marker=dict(line=dict(color='white', width=3)),
-                hovertemplate='<b>%{label}</b><br>%{value} pacientes<br>%{percent}<extra></extra>'
-            )
+                fig_pizza.update_traces(
+                    textfont=dict(size=11, color='#000000', family='Arial', weight='bold'),
+                    textposition='inside',
+                    textinfo='percent',
+                    marker=dict(line=dict(color='white', width=3)),
+                    hovertemplate='<b>%{label}</b><br>%{value} pacientes<br>%{percent}<extra></extra>'
+                )
+                return fig_pizza
+
+            fig_pizza = figuras.obter('pizza', construir, assinatura_contagem)
             
             st.plotly_chart(fig_pizza, use_container_width=True, config={'displayModeBar': False})
     
@@ -959,35 +1305,38 @@ def mostrar_analise_clinica(df):
     st.caption("🎯 Identifica pacientes em choque, hipertensão ou instabilidade cardiovascular")
     
     if 'PA' in df.columns and 'FC' in df.columns:
-        df_hemo = df.copy()
-        df_hemo['PA_Sistolica'] = df_hemo['PA'].apply(lambda x: int(str(x).split('/')[0]) if '/' in str(x) else None)
+        df_hemo = df.assign(PA_Sistolica=pressao_arterial_df(df)[0])
         df_hemo = df_hemo.dropna(subset=['PA_Sistolica', 'FC'])
         
-        fig_matriz = px.scatter(
-            df_hemo, 
-            x='FC', 
-            y='PA_Sistolica',
-            color='urgencia_manual',
-            color_discrete_map=cores_prioridade,
-            size=[20]*len(df_hemo),
-            hover_data=['Nome'] if 'Nome' in df.columns else None,
-            labels={'FC': 'Frequência Cardíaca (bpm)', 'PA_Sistolica': 'PA Sistólica (mmHg)'},
-            template=template,
-            title='Correlação Hemodinâmica - Padrões de Instabilidade'
-        )
+        def construir():
+            fig_matriz = px.scatter(
+                df_hemo, 
+                x='FC', 
+                y='PA_Sistolica',
+                color='urgencia_manual',
+                color_discrete_map=cores_prioridade,
+                size=[20]*len(df_hemo),
+                hover_data=['Nome'] if 'Nome' in df.columns else None,
+                labels={'FC': 'Frequência Cardíaca (bpm)', 'PA_Sistolica': 'PA Sistólica (mmHg)'},
+                template=template,
+                title='Correlação Hemodinâmica - Padrões de Instabilidade'
+            )
         
-        # Zonas de referência clínica
-        fig_matriz.add_hrect(y0=90, y1=140, line_width=0, fillcolor="green", opacity=0.08, 
-                            annotation_text="PA Normal", annotation_position="right")
-        fig_matriz.add_hrect(y0=140, y1=200, line_width=0, fillcolor="orange", opacity=0.08, 
-                            annotation_text="Hipertensão", annotation_position="right")
-        fig_matriz.add_hrect(y0=0, y1=90, line_width=0, fillcolor="red", opacity=0.08, 
-                            annotation_text="Hipotensão/Choque", annotation_position="right")
+            # Zonas de referência clínica
+            fig_matriz.add_hrect(y0=90, y1=140, line_width=0, fillcolor="green", opacity=0.08, 
+                                annotation_text="PA Normal", annotation_position="right")
+            fig_matriz.add_hrect(y0=140, y1=200, line_width=0, fillcolor="orange", opacity=0.08, 
+                                annotation_text="Hipertensão", annotation_position="right")
+            fig_matriz.add_hrect(y0=0, y1=90, line_width=0, fillcolor="red", opacity=0.08, 
+                                annotation_text="Hipotensão/Choque", annotation_position="right")
         
-        fig_matriz.add_vrect(x0=60, x1=100, line_width=0, fillcolor="green", opacity=0.06)
-        fig_matriz.add_vrect(x0=100, x1=150, line_width=0, fillcolor="orange", opacity=0.06)
+            fig_matriz.add_vrect(x0=60, x1=100, line_width=0, fillcolor="green", opacity=0.06)
+            fig_matriz.add_vrect(x0=100, x1=150, line_width=0, fillcolor="orange", opacity=0.06)
         
-        fig_matriz.update_layout(height=500, **config_layout)
+            fig_matriz.update_layout(height=500, **config_layout)
+            return fig_matriz
+
+        fig_matriz = figuras.obter('matriz_risco', construir, assinatura)
         
         st.plotly_chart(fig_matriz, use_container_width=True)
     
@@ -1068,8 +1417,8 @@ def mostrar_analise_clinica(df):
                     parametros.append('Temp')
                     valores_normalizados.append(max(0, min(100, val)))
                 
-                if 'PA' in paciente and pd.notna(paciente['PA']):
-                    pa_sist = int(str(paciente['PA']).split('/')[0]) if '/' in str(paciente['PA']) else 120
+                if 'PA_Sistolica' in paciente and pd.notna(paciente['PA_Sistolica']):
+                    pa_sist = int(paciente['PA_Sistolica'])
                     if pa_sist < 90:
                         val = 100 - ((90 - pa_sist) / 20 * 50)
                     elif pa_sist > 140:
@@ -1088,41 +1437,45 @@ def mostrar_analise_clinica(df):
                     parametros.append('SpO₂')
                     valores_normalizados.append(max(0, min(100, val)))
                 
-                fig_radar = go.Figure()
-                
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=valores_normalizados,
-                    theta=parametros,
-                    fill='toself',
-                    fillcolor=f'rgba({int(cor[1:3], 16)}, {int(cor[3:5], 16)}, {int(cor[5:7], 16)}, 0.3)',
-                    line=dict(color=cor, width=3),
-                    name=paciente['Nome']
-                ))
-                
-                fig_radar.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True, 
-                            range=[0, 100],
-                            tickfont=dict(size=11, color='#000000'),
-                            tickvals=[50, 100],
-                            ticktext=['Alterado', 'Normal']
+                def construir():
+                    fig_radar = go.Figure()
+                
+                    fig_radar.add_trace(go.Scatterpolar(
+                        r=valores_normalizados,
+                        theta=parametros,
+                        fill='toself',
+                        fillcolor=f'rgba({int(cor[1:3], 16)}, {int(cor[3:5], 16)}, {int(cor[5:7], 16)}, 0.3)',
+                        line=dict(color=cor, width=3),
+                        name=paciente['Nome']
+                    ))
+                
+                    fig_radar.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True, 
+                                range=[0, 100],
+                                tickfont=dict(size=11, color='#000000'),
+                                tickvals=[50, 100],
+                                ticktext=['Alterado', 'Normal']
+                            ),
+                            bgcolor='white',
+                            angularaxis=dict(
+                                tickfont=dict(size=12, color='#000000')
+                            )
                         ),
-                        bgcolor='white',
-                        angularaxis=dict(
-                            tickfont=dict(size=12, color='#000000')
-                        )
-                    ),
-                    showlegend=False,
-                    height=400,
-                    title=dict(
-                        text='Perfil de Sinais Vitais',
-                        font=dict(size=14, color='#000000')
-                    ),
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    font=dict(family='Arial, sans-serif', size=13, color='#000000')
-                )
+                        showlegend=False,
+                        height=400,
+                        title=dict(
+                            text='Perfil de Sinais Vitais',
+                            font=dict(size=14, color='#000000')
+                        ),
+                        plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        font=dict(family='Arial, sans-serif', size=13, color='#000000')
+                    )
+                    return fig_radar
+
+                fig_radar = figuras.obter('radar', construir, assinatura, paciente=paciente_selecionado)
                 
                 st.plotly_chart(fig_radar, use_container_width=True)
     
@@ -1131,282 +1484,310 @@ def mostrar_analise_clinica(df):
     # ==================== SEÇÃO 5: ANÁLISES AVANÇADAS ====================
     st.markdown("### 🔬 Análises Clínicas Avançadas")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Distribuição de Sinais", "🌡️ Correlações", "⚠️ Alertas Clínicos", "📈 Análise Gestão"])
+    # Usados pelos alertas e pelos indicadores de gestão (abas executadas independentemente)
+    criticos = estatisticas.criticos
+    altos = estatisticas.altos
     
-    with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Histograma de temperatura
-            if 'Temp' in df.columns:
-                fig_temp = px.histogram(
-                    df, 
-                    x='Temp',
-                    nbins=20,
-                    title='Distribuição de Temperatura',
-                    labels={'Temp': 'Temperatura (°C)', 'count': 'Número de Pacientes'},
-                    template=template,
-                    color_discrete_sequence=['#036672']
-                )
-                
-                fig_temp.add_vline(x=36.5, line_dash="dash", line_color="green", 
-                                  annotation_text="Normal", annotation_position="top")
-                fig_temp.add_vline(x=37.5, line_dash="dash", line_color="orange", 
-                                  annotation_text="Febre", annotation_position="top")
-                
-                fig_temp.update_layout(height=350, **config_layout)
-                st.plotly_chart(fig_temp, use_container_width=True)
-        
-        with col2:
-            # Histograma de FC
-            if 'FC' in df.columns:
-                fig_fc_hist = px.histogram(
-                    df, 
-                    x='FC',
-                    nbins=20,
-                    title='Distribuição de Frequência Cardíaca',
-                    labels={'FC': 'FC (bpm)', 'count': 'Número de Pacientes'},
-                    template=template,
-                    color_discrete_sequence=['#059669']
-                )
-                
-                fig_fc_hist.add_vline(x=60, line_dash="dash", line_color="blue", 
-                                     annotation_text="Bradicardia", annotation_position="top")
-                fig_fc_hist.add_vline(x=100, line_dash="dash", line_color="orange", 
-                                     annotation_text="Taquicardia", annotation_position="top")
-                
-                fig_fc_hist.update_layout(height=350, **config_layout)
-                st.plotly_chart(fig_fc_hist, use_container_width=True)
+    tab1, tab2, tab3, tab4 = criar_abas(
+        ["📊 Distribuição de Sinais", "🌡️ Correlações", "⚠️ Alertas Clínicos", "📈 Análise Gestão"],
+        chave="abas_analise_avancada",
+    )
     
-    with tab2:
-        # Box plots comparativos
-        if 'urgencia_manual' in df.columns:
+    with tab1:
+        if aba_aberta(tab1):
             col1, col2 = st.columns(2)
             
             with col1:
+                # Histograma de temperatura (faixas contadas no banco)
                 if 'Temp' in df.columns:
-                    fig_box_temp = px.box(
-                        df,
-                        x='urgencia_manual',
-                        y='Temp',
-                        color='urgencia_manual',
-                        color_discrete_map=cores_prioridade,
-                        title='Temperatura por Prioridade',
-                        labels={'urgencia_manual': 'Prioridade', 'Temp': 'Temperatura (°C)'},
-                        template=template
-                    )
-                    fig_box_temp.update_layout(height=400, showlegend=False, **config_layout)
-                    st.plotly_chart(fig_box_temp, use_container_width=True)
+                    hist_temp = get_histograma_fila('Temp', FAIXA_HISTOGRAMA['Temp'])
+                    def construir():
+                        fig_temp = figura_histograma(
+                            hist_temp,
+                            FAIXA_HISTOGRAMA['Temp'],
+                            title='Distribuição de Temperatura',
+                            labels={'faixa': 'Temperatura (°C)', 'pacientes': 'Número de Pacientes'},
+                            template=template,
+                            color_discrete_sequence=['#036672']
+                        )
+                    
+                        fig_temp.add_vline(x=36.5, line_dash="dash", line_color="green", 
+                                          annotation_text="Normal", annotation_position="top")
+                        fig_temp.add_vline(x=37.5, line_dash="dash", line_color="orange", 
+                                          annotation_text="Febre", annotation_position="top")
+                    
+                        fig_temp.update_layout(height=350, **config_layout)
+                        return fig_temp
+
+                    fig_temp = figuras.obter('hist_temperatura', construir, assinatura_df(hist_temp))
+                    st.plotly_chart(fig_temp, use_container_width=True)
             
             with col2:
+                # Histograma de FC
                 if 'FC' in df.columns:
-                    fig_box_fc = px.box(
-                        df,
-                        x='urgencia_manual',
-                        y='FC',
-                        color='urgencia_manual',
-                        color_discrete_map=cores_prioridade,
-                        title='Frequência Cardíaca por Prioridade',
-                        labels={'urgencia_manual': 'Prioridade', 'FC': 'FC (bpm)'},
-                        template=template
-                    )
-                    fig_box_fc.update_layout(height=400, showlegend=False, **config_layout)
-                    st.plotly_chart(fig_box_fc, use_container_width=True)
+                    hist_fc = get_histograma_fila('FC', FAIXA_HISTOGRAMA['FC'])
+                    def construir():
+                        fig_fc_hist = figura_histograma(
+                            hist_fc,
+                            FAIXA_HISTOGRAMA['FC'],
+                            title='Distribuição de Frequência Cardíaca',
+                            labels={'faixa': 'FC (bpm)', 'pacientes': 'Número de Pacientes'},
+                            template=template,
+                            color_discrete_sequence=['#059669']
+                        )
+                    
+                        fig_fc_hist.add_vline(x=60, line_dash="dash", line_color="blue", 
+                                             annotation_text="Bradicardia", annotation_position="top")
+                        fig_fc_hist.add_vline(x=100, line_dash="dash", line_color="orange", 
+                                             annotation_text="Taquicardia", annotation_position="top")
+                    
+                        fig_fc_hist.update_layout(height=350, **config_layout)
+                        return fig_fc_hist
+
+                    fig_fc_hist = figuras.obter('hist_fc', construir, assinatura_df(hist_fc))
+                    st.plotly_chart(fig_fc_hist, use_container_width=True)
+    
+    with tab2:
+        if aba_aberta(tab2):
+            # Box plots comparativos
+            if 'urgencia_manual' in df.columns:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    if 'Temp' in df.columns:
+                        dist_temp = get_distribuicao_fila('Temp')
+                        def construir():
+                            fig_box_temp = figura_quartis(
+                                dist_temp,
+                                color_discrete_map=cores_prioridade,
+                                title='Temperatura por Prioridade',
+                                labels={'urgencia_manual': 'Prioridade', 'valor': 'Temperatura (°C)'},
+                                template=template
+                            )
+                            fig_box_temp.update_layout(height=400, showlegend=False, **config_layout)
+                            return fig_box_temp
+
+                        fig_box_temp = figuras.obter('box_temperatura', construir, assinatura_df(dist_temp))
+                        st.plotly_chart(fig_box_temp, use_container_width=True)
+                
+                with col2:
+                    if 'FC' in df.columns:
+                        dist_fc = get_distribuicao_fila('FC')
+                        def construir():
+                            fig_box_fc = figura_quartis(
+                                dist_fc,
+                                color_discrete_map=cores_prioridade,
+                                title='Frequência Cardíaca por Prioridade',
+                                labels={'urgencia_manual': 'Prioridade', 'valor': 'FC (bpm)'},
+                                template=template
+                            )
+                            fig_box_fc.update_layout(height=400, showlegend=False, **config_layout)
+                            return fig_box_fc
+
+                        fig_box_fc = figuras.obter('box_fc', construir, assinatura_df(dist_fc))
+                        st.plotly_chart(fig_box_fc, use_container_width=True)
     
     with tab3:
-        st.markdown("#### ⚠️ Indicadores de Risco Clínico")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            choque = 0
-            if 'PA' in df.columns and 'FC' in df.columns:
-                df_temp = df.copy()
-                df_temp['PA_Sist'] = df_temp['PA'].apply(lambda x: int(str(x).split('/')[0]) if '/' in str(x) else 999)
-                choque = len(df_temp[(df_temp['PA_Sist'] < 90) & (df_temp['FC'] > 100)])
+        if aba_aberta(tab3):
+            st.markdown("#### ⚠️ Indicadores de Risco Clínico")
             
-            st.metric("🩸 Choque Possível", choque, 
-                     help="PA<90 + FC>100",
-                     delta="Crítico" if choque > 0 else None)
-        
-        with col2:
-            sepse = 0
-            if all(col in df.columns for col in ['Temp', 'FC', 'FR']):
-                sepse = len(df[(df['Temp'] > 38) & (df['FC'] > 90) & (df['FR'] > 20)])
+            col1, col2, col3, col4 = st.columns(4)
+            risco = estatisticas.risco
             
-            st.metric("🦠 Risco Sepse", sepse,
-                     help="Febre + Taquicardia + Taquipneia",
-                     delta="Atenção" if sepse > 0 else None)
-        
-        with col3:
-            insuf_resp = 0
-            if 'FR' in df.columns:
-                insuf_resp = len(df[(df['FR'] < 10) | (df['FR'] > 25)])
+            with col1:
+                choque = risco['choque']
+                
+                st.metric("🩸 Choque Possível", choque, 
+                         help="PA<90 + FC>100",
+                         delta="Crítico" if choque > 0 else None)
             
-            st.metric("🫁 Insuf. Respiratória", insuf_resp,
-                     help="FR <10 ou >25",
-                     delta="Alerta" if insuf_resp > 0 else None)
-        
-        with col4:
-            criticos = len(df[df['urgencia_manual'] == 'PRIORIDADE MÁXIMA']) if 'urgencia_manual' in df.columns else 0
-            altos = len(df[df['urgencia_manual'] == 'ALTA PRIORIDADE']) if 'urgencia_manual' in df.columns else 0 # This was duplicated, keeping one.
-
-            pct_critico = (criticos / total * 100) if total > 0 else 0
-            st.metric("🚨 Taxa Críticos", f"{pct_critico:.1f}%",
-                     help="% vermelhos/laranjas",
-                     delta=f"{criticos + altos}/{total}")
+            with col2:
+                sepse = risco['sepse']
+                
+                st.metric("🦠 Risco Sepse", sepse,
+                         help="Febre + Taquicardia + Taquipneia",
+                         delta="Atenção" if sepse > 0 else None)
+            
+            with col3:
+                insuf_resp = risco['insuf_respiratoria']
+                
+                st.metric("🫁 Insuf. Respiratória", insuf_resp,
+                         help="FR <10 ou >25",
+                         delta="Alerta" if insuf_resp > 0 else None)
+            
+            with col4:
+                pct_critico = estatisticas.percentual(criticos)
+                st.metric("🚨 Taxa Críticos", f"{pct_critico:.1f}%",
+                         help="% vermelhos/laranjas",
+                         delta=f"{criticos + altos}/{total}")
     
     with tab4:
-        st.markdown("#### 📊 Análises para Gestão")
-        
-        # ==================== 1. TREEMAP HIERÁRQUICO ====================
-        st.markdown("##### 🌳 Treemap Hierárquico de Prioridades")
-        if 'urgencia_manual' in df.columns:
-            prioridade_counts = df['urgencia_manual'].value_counts()
-            treemap_df = pd.DataFrame({
-                'Prioridade': prioridade_counts.index,
-                'Pacientes': prioridade_counts.values,
-                'Parent': ['Total'] * len(prioridade_counts)
-            })
+        if aba_aberta(tab4):
+            st.markdown("#### 📊 Análises para Gestão")
             
-            # Adicionar linha total
-            total_row = pd.DataFrame({
-                'Prioridade': ['Total'],
-                'Pacientes': [len(df)],
-                'Parent': ['']
-            })
-            treemap_df = pd.concat([total_row, treemap_df], ignore_index=True)
+            # ==================== 1. TREEMAP HIERÁRQUICO ====================
+            st.markdown("##### 🌳 Treemap Hierárquico de Prioridades")
+            if 'urgencia_manual' in df.columns:
+                treemap_df = pd.DataFrame({
+                    'Prioridade': prioridade_counts.index,
+                    'Pacientes': prioridade_counts.values,
+                    'Parent': ['Total'] * len(prioridade_counts)
+                })
+                
+                # Adicionar linha total
+                total_row = pd.DataFrame({
+                    'Prioridade': ['Total'],
+                    'Pacientes': [total],
+                    'Parent': ['']
+                })
+                treemap_df = pd.concat([total_row, treemap_df], ignore_index=True)
+                
+                def construir():
+                    fig_treemap = px.treemap(
+                        treemap_df,
+                        names='Prioridade',
+                        parents='Parent',
+                        values='Pacientes',
+                        color='Prioridade',
+                        color_discrete_map={**cores_prioridade, 'Total': '#f1f5f9'},
+                        title='Proporção Visual das Prioridades'
+                    )
+                
+                    treemap_layout = config_layout.copy()
+                    treemap_layout.pop('title', None)
+                    treemap_layout['height'] = 400
+                    treemap_layout['margin'] = dict(l=10, r=10, t=40, b=10)
+                
+                    fig_treemap.update_traces(
+                        textfont=dict(size=14, color='white', family='Arial', weight='bold'),
+                        marker=dict(line=dict(color='white', width=2))
+                    )
+                
+                    fig_treemap.update_layout(**treemap_layout)
+                    return fig_treemap
+
+                fig_treemap = figuras.obter('treemap', construir, assinatura_contagem, total=estatisticas.total)
+                st.plotly_chart(fig_treemap, use_container_width=True, config={'displayModeBar': False})
             
-            fig_treemap = px.treemap(
-                treemap_df,
-                names='Prioridade',
-                parents='Parent',
-                values='Pacientes',
-                color='Prioridade',
-                color_discrete_map={**cores_prioridade, 'Total': '#f1f5f9'},
-                title='Proporção Visual das Prioridades'
-            )
-            
-            treemap_layout = config_layout.copy()
-            treemap_layout.pop('title', None)
-            treemap_layout['height'] = 400
-            treemap_layout['margin'] = dict(l=10, r=10, t=40, b=10)
-            
-            fig_treemap.update_traces(
-                textfont=dict(size=14, color='white', family='Arial', weight='bold'),
-                marker=dict(line=dict(color='white', width=2))
-            )
-            
-            fig_treemap.update_layout(**treemap_layout)
-            st.plotly_chart(fig_treemap, use_container_width=True, config={'displayModeBar': False})
-        
-        st.markdown("---")
-        
-        # ==================== 2. GAUGE CHARTS ====================
-        st.markdown("##### ⏱️ Indicadores de Performance")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Taxa de ocupação crítica
-            taxa_critica = (criticos / total * 100) if total > 0 else 0
-            
-            fig_gauge1 = go.Figure(go.Indicator(
-                mode="gauge+number+delta",
-                value=taxa_critica,
-                title={'text': "Taxa Críticos (%)", 'font': {'size': 14, 'color': '#1e293b'}},
-                delta={'reference': 20, 'increasing': {'color': "red"}, 'decreasing': {'color': "green"}},
-                gauge={
-                    'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
-                    'bar': {'color': "#dc2626"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "#e5e7eb",
-                    'steps': [
-                        {'range': [0, 15], 'color': '#d1fae5'},
-                        {'range': [15, 30], 'color': '#fef3c7'},
-                        {'range': [30, 100], 'color': '#fee2e2'}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 30
-                    }
-                }
-            ))
-            
-            fig_gauge1.update_layout(
-                height=250,
-                margin=dict(l=20, r=20, t=50, b=20),
-                paper_bgcolor='white',
-                font=dict(color='#1e293b')
-            )
-            
-            st.plotly_chart(fig_gauge1, use_container_width=True, config={'displayModeBar': False})
-        
-        with col2:
-            # Taxa de urgências altas
-            taxa_alta = ((criticos + altos) / total * 100) if total > 0 else 0
-            
-            fig_gauge2 = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=taxa_alta,
-                title={'text': "Alta + Máxima (%)", 'font': {'size': 14, 'color': '#1e293b'}},
-                gauge={
-                    'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
-                    'bar': {'color': "#ea580c"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "#e5e7eb",
-                    'steps': [
-                        {'range': [0, 30], 'color': '#d1fae5'},
-                        {'range': [30, 50], 'color': '#fef3c7'},
-                        {'range': [50, 100], 'color': '#fed7aa'}
-                    ]
-                }
-            ))
+            st.markdown("---")
             
-            fig_gauge2.update_layout(
-                height=250,
-                margin=dict(l=20, r=20, t=50, b=20),
-                paper_bgcolor='white',
-                font=dict(color='#1e293b')
-            )
+            # ==================== 2. GAUGE CHARTS ====================
+            st.markdown("##### ⏱️ Indicadores de Performance")
             
-            st.plotly_chart(fig_gauge2, use_container_width=True, config={'displayModeBar': False})
-        
-        with col3:
-            # Capacidade total
-            capacidade_maxima = 50  # Ajustar conforme necessário
-            taxa_ocupacao = (total / capacidade_maxima * 100) if capacidade_maxima > 0 else 0
+            col1, col2, col3 = st.columns(3)
             
-            fig_gauge3 = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=taxa_ocupacao,
-                title={'text': "Taxa Ocupação (%)", 'font': {'size': 14, 'color': '#1e293b'}},
-                number={'suffix': "%"},
-                gauge={
-                    'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
-                    'bar': {'color': "#036672"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "#e5e7eb",
-                    'steps': [
-                        {'range': [0, 60], 'color': '#d1fae5'},
-                        {'range': [60, 80], 'color': '#fef3c7'},
-                        {'range': [80, 100], 'color': '#fee2e2'}
-                    ]
-                }
-            ))
+            with col1:
+                # Taxa de ocupação crítica
+                taxa_critica = estatisticas.percentual(criticos)
+                
+                def construir():
+                    fig_gauge1 = go.Figure(go.Indicator(
+                        mode="gauge+number+delta",
+                        value=taxa_critica,
+                        title={'text': "Taxa Críticos (%)", 'font': {'size': 14, 'color': '#1e293b'}},
+                        delta={'reference': 20, 'increasing': {'color': "red"}, 'decreasing': {'color': "green"}},
+                        gauge={
+                            'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
+                            'bar': {'color': "#dc2626"},
+                            'bgcolor': "white",
+                            'borderwidth': 2,
+                            'bordercolor': "#e5e7eb",
+                            'steps': [
+                                {'range': [0, 15], 'color': '#d1fae5'},
+                                {'range': [15, 30], 'color': '#fef3c7'},
+                                {'range': [30, 100], 'color': '#fee2e2'}
+                            ],
+                            'threshold': {
+                                'line': {'color': "red", 'width': 4},
+                                'thickness': 0.75,
+                                'value': 30
+                            }
+                        }
+                    ))
+                
+                    fig_gauge1.update_layout(
+                        height=250,
+                        margin=dict(l=20, r=20, t=50, b=20),
+                        paper_bgcolor='white',
+                        font=dict(color='#1e293b')
+                    )
+                    return fig_gauge1
+
+                fig_gauge1 = figuras.obter('gauge_criticos', construir, assinatura_contagem, total=estatisticas.total)
+                
+                st.plotly_chart(fig_gauge1, use_container_width=True, config={'displayModeBar': False})
             
-            fig_gauge3.update_layout(
-                height=250,
-                margin=dict(l=20, r=20, t=50, b=20),
-                paper_bgcolor='white',
-                font=dict(color='#1e293b')
-            )
+            with col2:
+                # Taxa de urgências altas
+                taxa_alta = estatisticas.percentual(criticos + altos)
+                
+                def construir():
+                    fig_gauge2 = go.Figure(go.Indicator(
+                        mode="gauge+number",
+                        value=taxa_alta,
+                        title={'text': "Alta + Máxima (%)", 'font': {'size': 14, 'color': '#1e293b'}},
+                        gauge={
+                            'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
+                            'bar': {'color': "#ea580c"},
+                            'bgcolor': "white",
+                            'borderwidth': 2,
+                            'bordercolor': "#e5e7eb",
+                            'steps': [
+                                {'range': [0, 30], 'color': '#d1fae5'},
+                                {'range': [30, 50], 'color': '#fef3c7'},
+                                {'range': [50, 100], 'color': '#fed7aa'}
+                            ]
+                        }
+                    ))
+                
+                    fig_gauge2.update_layout(
+                        height=250,
+                        margin=dict(l=20, r=20, t=50, b=20),
+                        paper_bgcolor='white',
+                        font=dict(color='#1e293b')
+                    )
+                    return fig_gauge2
+
+                fig_gauge2 = figuras.obter('gauge_alta', construir, assinatura_contagem, total=estatisticas.total)
+                
+                st.plotly_chart(fig_gauge2, use_container_width=True, config={'displayModeBar': False})
             
-            st.plotly_chart(fig_gauge3, use_container_width=True, config={'displayModeBar': False})
+            with col3:
+                # Capacidade total
+                capacidade_maxima = 50  # Ajustar conforme necessário
+                taxa_ocupacao = (total / capacidade_maxima * 100) if capacidade_maxima > 0 else 0
+                
+                def construir():
+                    fig_gauge3 = go.Figure(go.Indicator(
+                        mode="gauge+number",
+                        value=taxa_ocupacao,
+                        title={'text': "Taxa Ocupação (%)", 'font': {'size': 14, 'color': '#1e293b'}},
+                        number={'suffix': "%"},
+                        gauge={
+                            'axis': {'range': [None, 100], 'tickfont': {'size': 10, 'color': '#475569'}},
+                            'bar': {'color': "#036672"},
+                            'bgcolor': "white",
+                            'borderwidth': 2,
+                            'bordercolor': "#e5e7eb",
+                            'steps': [
+                                {'range': [0, 60], 'color': '#d1fae5'},
+                                {'range': [60, 80], 'color': '#fef3c7'},
+                                {'range': [80, 100], 'color': '#fee2e2'}
+                            ]
+                        }
+                    ))
+                
+                    fig_gauge3.update_layout(
+                        height=250,
+                        margin=dict(l=20, r=20, t=50, b=20),
+                        paper_bgcolor='white',
+                        font=dict(color='#1e293b')
+                    )
+                    return fig_gauge3
+
+                fig_gauge3 = figuras.obter('gauge_ocupacao', construir, assinatura_contagem, total=estatisticas.total)
+                
+                st.plotly_chart(fig_gauge3, use_container_width=True, config={'displayModeBar': False})
 
 def mostrar_relatorios(df):
     """Relatórios e estatísticas"""
@@ -1418,828 +1799,47 @@ def mostrar_relatorios(df):
     
     st.markdown("#### Dados Completos")
     
-    # Aplicar estilo customizado ao dataframe
-    st.markdown("""
-    <style>
-    /* Estilo da tabela de dados */
-    div[data-testid="stDataFrame"] {
-        background-color: white;
-        border-radius: 8px;
-        padding: 10px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.06);
-    }
-    
-    /* Cabeçalho da tabela */
-    div[data-testid="stDataFrame"] table thead th {
-        background: linear-gradient(135deg, #036672 0%, #059669 100%) !important;
-        color: white !important;
-        font-weight: 600 !important;
-        padding: 12px 8px !important;
-        border: none !important;
-    }
-    
-    /* Linhas da tabela */
-    div[data-testid="stDataFrame"] table tbody tr {
-        background-color: white !important;
-    }
-    
-    div[data-testid="stDataFrame"] table tbody tr:nth-child(even) {
-        background-color: #f8fafc !important;
-    }
-    
-    div[data-testid="stDataFrame"] table tbody tr:hover {
-        background-color: #e0f2fe !important;
-    }
-    
-    /* Células da tabela */
-    div[data-testid="stDataFrame"] table tbody td {
-        color: #1e293b !important;
-        padding: 10px 8px !important;
-        border-bottom: 1px solid #e5e7eb !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
     
     st.dataframe(df, use_container_width=True)
 
 # ========================= ESTILOS CSS - TEMA MODERNO =========================
-st.markdown("""
-<style>
-    /* Remover elementos padrão do Streamlit */
-    header[data-testid="stHeader"] {
-        display: none;
-    }
-    
-    .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 1400px;
-    }
-    
-    /* Fundo bege/off-white moderno */
-    .stApp {
-        background: linear-gradient(135deg, #faf8f5 0%, #f0ede8 100%);
-    }
-    
-    .main {
-        background-color: transparent;
-    }
-    
-    /* Header moderno com degradê ciano/verde/azul - COMPACTO */
-    .welcome-header {
-        background: linear-gradient(135deg, #036672 0%, #047c7d 25%, #059669 75%, #0284c7 100%);
-        border-radius: 0;
-        padding: 25px 30px;
-        margin: -80px -80px 30px -80px;
-        box-shadow: 0 4px 12px rgba(3, 102, 114, 0.15);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .welcome-header::before {
-        content: '';
-        position: absolute;
-        top: -50%;
-        right: -20%;
-        width: 300px;
-        height: 300px;
-        background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-        border-radius: 50%;
-    }
-    
-    .welcome-header h1 {
-        color: white;
-        font-size: 1.8rem;
-        font-weight: 700;
-        margin: 5px 0;
-        letter-spacing: -0.5px;
-        position: relative;
-    }
-    
-    .welcome-header p {
-        color: rgba(255, 255, 255, 0.95);
-        font-size: 0.95rem;
-        margin: 0;
-        position: relative;
-        font-weight: 300;
-    }
-    
-    .welcome-icon {
-        font-size: 2.5rem;
-        margin-bottom: 5px;
-        margin-top: 8px;
-        filter: drop-shadow(0 2px 4px rgba(0,0,0,0.2));
-        position: relative;
-    }
-    
-    /* Cards modernos com glassmorphism */
-    .info-card {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 16px;
-        padding: 30px;
-        margin: 10px 0;
-        border: 1px solid rgba(3, 102, 114, 0.1);
-        box-shadow: 
-            0 8px 16px rgba(0, 0, 0, 0.06),
-            0 2px 4px rgba(0, 0, 0, 0.04);
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    
-    .info-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 
-            0 12px 24px rgba(0, 0, 0, 0.08),
-            0 4px 8px rgba(0, 0, 0, 0.06);
-    }
-    
-    .info-card h3 {
-        color: #036672;
-        font-size: 1.3rem;
-        font-weight: 700;
-        margin-bottom: 18px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-    }
-    
-    .info-card p, .info-card li {
-        color: #334155;
-        line-height: 1.7;
-        font-size: 0.95rem;
-    }
-    
-    .info-card ul {
-        margin: 15px 0;
-        padding-left: 20px;
-    }
-    
-    .info-card li {
-        margin: 8px 0;
-        position: relative;
-        padding-left: 8px;
-    }
-    
-    .info-card li::marker {
-        color: #059669;
-    }
-    
-    .info-card hr {
-        border: none;
-        border-top: 1px solid rgba(3, 102, 114, 0.15);
-        margin: 20px 0;
-    }
-    
-    /* Botões modernos com degradê */
-    .stButton button {
-        background: linear-gradient(135deg, #036672 0%, #047c7d 50%, #059669 100%) !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 16px 28px !important;
-        color: white !important;
-        font-weight: 600 !important;
-        font-size: 1.05rem !important;
-        box-shadow: 
-            0 4px 12px rgba(3, 102, 114, 0.3),
-            0 2px 4px rgba(5, 150, 105, 0.2) !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        letter-spacing: 0.3px !important;
-    }
-    
-    .stButton button:hover {
-        background: linear-gradient(135deg, #047c7d 0%, #059669 50%, #0284c7 100%) !important;
-        transform: translateY(-2px) !important;
-        box-shadow: 
-            0 6px 20px rgba(3, 102, 114, 0.4),
-            0 4px 8px rgba(5, 150, 105, 0.3) !important;
-    }
-    
-    .stButton button:active {
-        transform: translateY(0px) !important;
-        box-shadow: 
-            0 2px 8px rgba(3, 102, 114, 0.3),
-            0 1px 4px rgba(5, 150, 105, 0.2) !important;
-    }
-    
-    /* Sidebar moderno */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #faf8f5 0%, #f5f3f0 100%);
-        border-right: 1px solid rgba(3, 102, 114, 0.1);
-    }
-    
-    /* Badge de acesso restrito */
-    .access-badge {
-        display: inline-block;
-        background: linear-gradient(135deg, rgba(3, 102, 114, 0.1) 0%, rgba(5, 150, 105, 0.1) 100%);
-        color: #036672;
-        padding: 6px 14px;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        font-weight: 600;
-        border: 1px solid rgba(3, 102, 114, 0.2);
-        margin-top: 10px;
-    }
-    
-    /* Animações suaves */
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .info-card {
-        animation: fadeIn 0.5s ease-out;
-    }
-    
-    /* Scrollbar personalizada */
-    ::-webkit-scrollbar {
-        width: 10px;
-        height: 10px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #f5f3f0;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(135deg, #036672, #059669);
-        border-radius: 5px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(135deg, #047c7d, #0284c7);
-    }
-    
-    /* Estilos do Dashboard PCACR */
-    .pcacr-wrapper {
-        margin: 20px 0;
-    }
-    
-    .pcacr-box {
-        background: white;
-        border-radius: 16px;
-        padding: 25px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-    }
-    
-    .pcacr-box h2 {
-        color: #000000 !important;
-        font-size: 1.4rem;
-        font-weight: 700;
-        margin-bottom: 10px;
-    }
-    
-    .pcacr-box > p {
-        color: #334155 !important;
-        font-size: 0.95rem;
-        margin-bottom: 20px;
-    }
-    
-    .pcacr-legend {
-        display: flex;
-        gap: 15px;
-        flex-wrap: wrap;
-        margin-bottom: 25px;
-    }
-    
-    .pcacr-pillx {
-        display: flex;
-        align-items: center;
-        gap: 8px;
-        color: #1e293b !important;
-        font-size: 0.9rem;
-        font-weight: 500;
-    }
-    
-    .pcacr-dot {
-        width: 12px;
-        height: 12px;
-        border-radius: 50%;
-        display: inline-block;
-    }
-    
-    .pcacr-dot.d-max { background-color: #dc2626; }
-    .pcacr-dot.d-alta { background-color: #ea580c; }
-    .pcacr-dot.d-media { background-color: #eab308; }
-    .pcacr-dot.d-baixa { background-color: #16a34a; }
-    .pcacr-dot.d-min { background-color: #2563eb; }
-    
-    /* Dashboard Minimalista */
-    .pcacr-box-minimal {
-        background: white;
-        border-radius: 12px;
-        padding: 20px 25px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.06);
-    }
-    
-    .pcacr-header-row {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        margin-bottom: 20px;
-        padding-bottom: 15px;
-        border-bottom: 1px solid #e5e7eb;
-    }
-    
-    .pcacr-title-section h2 {
-        color: #000000 !important;
-        font-size: 1.2rem;
-        font-weight: 700;
-        margin: 0 0 4px 0;
-    }
-    
-    .pcacr-title-section p {
-        color: #64748b !important;
-        font-size: 0.85rem;
-        margin: 0;
-    }
-    
-    .pcacr-legend-inline {
-        display: flex;
-        gap: 12px;
-        flex-wrap: wrap;
-    }
-    
-    .pcacr-dot-modern {
-        width: 14px;
-        height: 14px;
-        border-radius: 50%;
-        display: inline-block;
-        box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-        border: 2px solid white;
-    }
-    
-    .pcacr-dot-modern.d-max { background-color: #dc2626; }
-    .pcacr-dot-modern.d-alta { background-color: #ea580c; }
-    .pcacr-dot-modern.d-media { background-color: #eab308; }
-    .pcacr-dot-modern.d-baixa { background-color: #16a34a; }
-    .pcacr-dot-modern.d-min { background-color: #2563eb; }
-    
-    .kpi-band-minimal {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
-        gap: 12px;
-    }
-    
-    .kpi-box-minimal {
-        background: #fafafa;
-        border-radius: 8px;
-        padding: 16px 12px;
-        text-align: center;
-        border: 1px solid #f0f0f0;
-        transition: all 0.2s ease;
-    }
-    
-    .kpi-box-minimal:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-        background: white;
-    }
-    
-    .kpi-icon-minimal {
-        font-size: 1.5rem;
-        margin-bottom: 8px;
-    }
-    
-    .kpi-circle-modern {
-        width: 40px;
-        height: 40px;
-        border-radius: 50%;
-        margin: 0 auto 8px auto;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.12);
-        border: 3px solid white;
-    }
-    
-    .kpi-circle-modern.d-max { background-color: #dc2626; }
-    .kpi-circle-modern.d-alta { background-color: #ea580c; }
-    .kpi-circle-modern.d-media { background-color: #eab308; }
-    .kpi-circle-modern.d-baixa { background-color: #16a34a; }
-    .kpi-circle-modern.d-min { background-color: #2563eb; }
-    
-    .kpi-value-minimal {
-        font-size: 2rem;
-        font-weight: 800;
-        color: #000000 !important;
-        margin: 8px 0;
-        line-height: 1;
-    }
-    
-    .kpi-label-minimal {
-        font-size: 0.75rem;
-        font-weight: 600;
-        color: #475569 !important;
-        margin: 6px 0;
-        text-transform: uppercase;
-        letter-spacing: 0.3px;
-        line-height: 1.3;
-    }
-    
-    .kpi-meta-minimal {
-        font-size: 0.7rem;
-        color: #94a3b8 !important;
-        margin-top: 4px;
-    }
-    
-    .kpi-band {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-        gap: 15px;
-    }
-    
-    .kpi-box {
-        background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%);
-        border-radius: 12px;
-        padding: 20px;
-        text-align: center;
-        border: 1px solid #e2e8f0;
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    
-    .kpi-box:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 8px 16px rgba(0,0,0,0.1);
-    }
-    
-    .kpi-icon {
-        font-size: 2rem;
-        margin-bottom: 10px;
-    }
-    
-    .kpi-value2 {
-        font-size: 2.5rem;
-        font-weight: 800;
-        color: #000000 !important;
-        margin: 10px 0;
-        line-height: 1;
-    }
-    
-    .kpi-label2 {
-        font-size: 0.85rem;
-        font-weight: 600;
-        color: #1e293b !important;
-        margin: 8px 0;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .kpi-meta2 {
-        font-size: 0.8rem;
-        color: #64748b !important;
-        margin-top: 5px;
-    }
-    
-    .pcacr-status-inline {
-        display: inline-block;
-        background: linear-gradient(135deg, rgba(5, 150, 105, 0.1), rgba(3, 102, 114, 0.1));
-        color: #059669 !important;
-        padding: 6px 14px;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        font-weight: 600;
-        margin-bottom: 15px;
-        border: 1px solid rgba(5, 150, 105, 0.3);
-    }
-    
-    /* Header Global das interfaces - COLADO NO TOPO */
-    .ac-global-header {
-        background: linear-gradient(135deg, #036672 0%, #047c7d 50%, #059669 100%);
-        border-radius: 0;
-        padding: 30px 30px 20px 30px;
-        margin: -80px -80px 25px -80px;
-        box-shadow: 0 4px 12px rgba(3, 102, 114, 0.2);
-    }
-    
-    .ac-header-wrap {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-    }
-    
-    .ac-brand {
-        display: flex;
-        align-items: center;
-        gap: 15px;
-    }
-    
-    .ac-logo {
-        font-size: 2.5rem;
-        filter: drop-shadow(0 2px 4px rgba(0,0,0,0.2));
-    }
-    
-    .ac-text {
-        color: white;
-    }
-    
-    .ac-title {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #ffffff !important;
-        margin-bottom: 4px;
-    }
-    
-    .ac-sub {
-        font-size: 0.9rem;
-        color: rgba(255, 255, 255, 0.9) !important;
-        font-weight: 400;
-    }
-    
-    .ac-status-pill {
-        background: rgba(255, 255, 255, 0.2);
-        backdrop-filter: blur(10px);
-        padding: 8px 16px;
-        border-radius: 20px;
-        color: #ffffff !important;
-        font-size: 0.85rem;
-        font-weight: 600;
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    .ac-status-pill span {
-        width: 8px;
-        height: 8px;
-        background: #10b981;
-        border-radius: 50%;
-        display: inline-block;
-        box-shadow: 0 0 8px #10b981;
-        animation: pulse 2s infinite;
-    }
-    
-    @keyframes pulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.5; }
-    }
-    
-    /* Estilo das Abas (Tabs) */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background-color: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: white;
-        border-radius: 8px 8px 0 0;
-        color: #1e293b !important;
-        font-weight: 600;
-        padding: 12px 24px;
-        border: 1px solid #e2e8f0;
-        border-bottom: none;
-    }
-    
-    .stTabs [data-baseweb="tab"] span,
-    .stTabs [data-baseweb="tab"] p,
-    .stTabs [data-baseweb="tab"] div {
-        color: #1e293b !important;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #036672 0%, #059669 100%) !important;
-        color: white !important;
-        border-color: #036672;
-    }
-    
-    .stTabs [aria-selected="true"] span,
-    .stTabs [aria-selected="true"] p,
-    .stTabs [aria-selected="true"] div,
-    .stTabs button[aria-selected="true"] span,
-    .stTabs button[aria-selected="true"] p,
-    .stTabs button[aria-selected="true"] div {
-        color: white !important;
-    }
-    
-    .stTabs [data-baseweb="tab-panel"] {
-        background-color: white;
-        border-radius: 0 12px 12px 12px;
-        padding: 24px;
-        border: 1px solid #e2e8f0;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-    
-    /* Conteúdo dentro das abas */
-    .stTabs [data-baseweb="tab-panel"] * {
-        color: #1e293b !important;
-    }
-    
-    /* Exceção PRIORITÁRIA: header da análise clínica deve ser branco */
-    .stTabs [data-baseweb="tab-panel"] .analise-header,
-    .stTabs [data-baseweb="tab-panel"] .analise-header *,
-    .stTabs [data-baseweb="tab-panel"] .analise-header h2,
-    .stTabs [data-baseweb="tab-panel"] .analise-header p {
-        color: #ffffff !important;
-    }
-    
-    .stTabs [data-baseweb="tab-panel"] h1,
-    .stTabs [data-baseweb="tab-panel"] h2,
-    .stTabs [data-baseweb="tab-panel"] h3,
-    .stTabs [data-baseweb="tab-panel"] h4,
-    .stTabs [data-baseweb="tab-panel"] h5,
-    .stTabs [data-baseweb="tab-panel"] h6 {
-        color: #0f172a !important;
-    }
-    
-    /* Exceção: header da análise clínica deve ser branco */
-    .analise-header h2,
-    .analise-header p {
-        color: #ffffff !important;
-    }
-    
-    .stTabs [data-baseweb="tab-panel"] p,
-    .stTabs [data-baseweb="tab-panel"] span,
-    .stTabs [data-baseweb="tab-panel"] div,
-    .stTabs [data-baseweb="tab-panel"] label {
-        color: #334155 !important;
-    }
-    
-    .stTabs [data-baseweb="tab-panel"] .stMarkdown {
-        color: #1e293b !important;
-    }
-    
-    /* Selectbox - Fundo claro e texto escuro */
-    div[data-baseweb="select"] > div {
-        background-color: white !important;
-        color: #1e293b !important;
-    }
-    
-    div[data-baseweb="select"] input {
-        color: #1e293b !important;
-    }
-    
-    div[data-baseweb="select"] span {
-        color: #1e293b !important;
-    }
-    
-    /* Dropdown do selectbox */
-    ul[role="listbox"] {
-        background-color: white !important;
-    }
-    
-    ul[role="listbox"] li {
-        color: #1e293b !important;
-        background-color: white !important;
-    }
-    
-    ul[role="listbox"] li:hover {
-        background-color: #f1f5f9 !important;
-        color: #0f172a !important;
-    }
-    
-    /* Expanders - Correção de fundo escuro */
-    .stExpander {
-        background-color: white !important;
-        border: 1px solid #e2e8f0 !important;
-        border-radius: 8px !important;
-        margin-bottom: 10px !important;
-    }
-    
-    .stExpander [data-testid="stExpanderDetails"] {
-        background-color: white !important;
-        color: #1e293b !important;
-    }
-    
-    .stExpander summary {
-        background-color: white !important;
-        color: #1e293b !important;
-    }
-    
-    .stExpander summary:hover {
-        background-color: #f8fafc !important;
-    }
-    
-    .stExpander [data-testid="stExpanderDetails"] p,
-    .stExpander [data-testid="stExpanderDetails"] span,
-    .stExpander [data-testid="stExpanderDetails"] div {
-        color: #334155 !important;
-    }
-    
-    /* Forçar texto preto em TODOS os gráficos Plotly */
-    .js-plotly-plot .plotly text,
-    .js-plotly-plot .plotly .gtitle,
-    .js-plotly-plot .plotly .xtick text,
-    .js-plotly-plot .plotly .ytick text,
-    .js-plotly-plot .plotly .legendtext,
-    .js-plotly-plot .plotly .annotation-text,
-    .js-plotly-plot .plotly .legend text,
-    .js-plotly-plot .plotly .g-xtitle text,
-    .js-plotly-plot .plotly .g-ytitle text {
-        fill: #000000 !important;
-        color: #000000 !important;
-    }
-    
-    /* Títulos de legenda */
-    .js-plotly-plot .legend-title text {
-        fill: #000000 !important;
-    }
-    
-    /* FORÇAR TODOS os elementos de texto SVG no Plotly */
-    .js-plotly-plot svg text {
-        fill: #000000 !important;
-        color: #000000 !important;
-        stroke: none !important;
-    }
-    
-    /* Labels e traces */
-    .js-plotly-plot .trace text {
-        fill: #000000 !important;
-    }
-    
-    /* Garantir que percentuais e valores nos gráficos sejam pretos */
-    .js-plotly-plot .slice text,
-    .js-plotly-plot .surface text,
-    .js-plotly-plot .textpoint text {
-        fill: #000000 !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Hover/Tooltip dos gráficos Plotly - Fundo branco com texto preto */
-    .js-plotly-plot .hoverlayer .hovertext {
-        fill: #ffffff !important;
-        stroke: #e5e7eb !important;
-    }
-    
-    .js-plotly-plot .hoverlayer .hovertext path {
-        fill: #ffffff !important;
-        stroke: #d1d5db !important;
-    }
-    
-    .js-plotly-plot .hoverlayer .hovertext text {
-        fill: #000000 !important;
-        color: #000000 !important;
-    }
-    
-    /* Hover box background */
-    g.hovertext path {
-        fill: #ffffff !important;
-        stroke: #cbd5e1 !important;
-        stroke-width: 1px !important;
-    }
-    
-    /* Hover text */
-    g.hovertext text {
-        fill: #000000 !important;
-    }
-    
-    /* Legendas - garantir que sempre sejam visíveis */
-    .js-plotly-plot .legend {
-        background: white !important;
-    }
-    
-    .js-plotly-plot .legend .bg {
-        fill: white !important;
-        fill-opacity: 0.9 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# styles.css + estilos/*.css numa folha só, servida como arquivo estático (ver tema.py)
+@st.cache_resource(show_spinner=False)
+def folha_de_estilos():
+    """Monta e publica a folha do tema uma vez por processo: (nome do arquivo ou None, css)."""
+    css = montar_folha()
+    if not st.get_option("server.enableStaticServing"):
+        return None, css
+    try:
+        return publicar_folha(css), css
+    except OSError as e:
+        print(f"⚠️ Não foi possível publicar a folha de estilos ({e}); usando CSS embutido")
+        return None, css
+
+def aplicar_tema():
+    """Referencia a folha do tema; sem serviço de estáticos, embute o CSS minificado."""
+    nome, css = folha_de_estilos()
+    if nome:
+        # Poucos bytes por rerun: o navegador baixa o arquivo uma vez e o mantém em cache
+        st.markdown(f"<link rel='stylesheet' href='app/static/{nome}'>", unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+aplicar_tema()
 
 # ==================== TELA INICIAL ====================
 def show_welcome_screen():
     """Tela de boas-vindas com seleção de perfil"""
-    st.markdown("""
-        <div class='welcome-header'>
-            <div class='welcome-icon'>🏥</div>
-            <h1>Bem-vindo ao Avicena Care</h1>
-            <p>Sistema Integrado de Triagem Médica</p>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(BOAS_VINDAS_CABECALHO, unsafe_allow_html=True)
 
     # Layout: Informações à esquerda, botões à direita
     col_info, col_acesso = st.columns([1.2, 1])
     
     with col_info:
-        st.markdown("""
-            <div class='info-card'>
-                <h3 style='color: #036672; margin-bottom: 20px;'>
-                    📋 Protocolo PCACR
-                </h3>
-                <p style='color: #475569; line-height: 1.8; font-size: 0.95rem;'>
-                    Sistema de triagem médica baseado no <strong>Protocolo Catarinense de 
-                    Acolhimento com Classificação de Risco (PCACR)</strong>, que permite 
-                    a priorização de pacientes conforme urgência clínica.
-                </p>
-                <hr style='border: none; border-top: 1px solid #e5e7eb; margin: 20px 0;'>
-                <p style='color: #64748b; font-size: 0.9rem; margin-bottom: 10px;'>
-                    <strong>Principais recursos:</strong>
-                </p>
-                <ul style='color: #64748b; font-size: 0.9rem; line-height: 1.6; margin-left: 20px;'>
-                    <li>Classificação automática por sinais vitais</li>
-                    <li>Gestão em tempo real da fila de atendimento</li>
-                    <li>Dashboard com indicadores de urgência</li>
-                    <li>Relatórios e análises clínicas</li>
-                </ul>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(BOAS_VINDAS_PROTOCOLO, unsafe_allow_html=True)
     
     with col_acesso:
-        st.markdown("""
-            <div class='info-card' style='height: 100%;'>
-                <h3 style='text-align: center; color: #036672; margin-bottom: 25px;'>
-                    🔐 Acesso ao Sistema
-                </h3>
-                <p style='text-align: center; color: #64748b; margin-bottom: 30px; font-size: 0.9rem;'>
-                    Selecione seu perfil profissional para acessar:
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(BOAS_VINDAS_ACESSO, unsafe_allow_html=True)
         
         st.markdown("<div style='margin-top: -15px;'></div>", unsafe_allow_html=True)
         
@@ -2253,41 +1853,83 @@ def show_welcome_screen():
             st.session_state['tipo_acesso'] = 'medico'
             st.rerun()
         
-        st.markdown("""
-            <div style='text-align: center; margin-top: 30px;'>
-                <p style='color: #94a3b8; font-size: 0.85rem;'>
-                    Acesso restrito a profissionais<br>de saúde autorizados
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(BOAS_VINDAS_RODAPE, unsafe_allow_html=True)
+
+# ==================== NAVEGAÇÃO ====================
+# Sob demanda: trocar de aba reexecuta o script e só a aba aberta roda suas
+# consultas, predições e gráficos. Com False, todas as abas rodam a cada rerun
+# (troca de aba instantânea, sem ida ao servidor).
+ABAS_SOB_DEMANDA = True
+
+def criar_abas(rotulos, chave):
+    """st.tabs que, no modo sob demanda, guarda a aba aberta na sessão."""
+    if not ABAS_SOB_DEMANDA:
+        return st.tabs(rotulos)
+    return st.tabs(rotulos, key=chave, on_change="rerun")
+
+def aba_aberta(aba):
+    """True se o conteúdo da aba deve ser executado neste rerun."""
+    # None: abas sem estado (modo ansioso), todas rodam
+    return aba.open is not False
+
+# ==================== FRAGMENTOS ====================
+# Cada seção roda como fragmento: um clique dentro dela reexecuta só a seção,
+# e cada uma lê seus próprios dados (get_fila é cacheado, então ler de novo é barato)
+
+# A faixa de KPIs não recebe cliques; atualiza sozinha para acompanhar a fila
+INTERVALO_KPIS_SEGUNDOS = 5
+
+def carregar_fila():
+    """Fila atual com as alterações desta sessão ainda a caminho do banco."""
+    return aplicar_alteracoes_otimistas(get_fila())
+
+def mostrar_estado_diario():
+    """Escritas do diário local ainda não aplicadas no banco e as descartadas."""
+    escritor = init_escritor()
+    if not isinstance(escritor, (RepositorioComDiario, EscritorTriagem)):
+        return
+    mortas = escritor.mortas
+    if mortas:
+        st.error(f"❌ {mortas} escrita(s) recusada(s) pelo banco e descartada(s) do envio. "
+                 f"Verifique o diário em '{escritor.diario.caminho}'.")
+    pendentes = escritor.pendentes
+    if pendentes:
+        if isinstance(escritor, EscritorTriagem):
+            st.caption(f"⏳ {pendentes} alteração(ões) da fila a caminho do banco.")
+        elif isinstance(escritor, RepositorioSincronizado):
+            st.caption(f"⏳ {pendentes} escrita(s) aguardando envio ao banco remoto.")
+        else:
+            st.warning(f"⏳ {pendentes} escrita(s) aguardando envio ao banco: "
+                       "já aparecem aqui, mas ainda não em outros servidores do app.")
+
+@st.fragment(run_every=INTERVALO_KPIS_SEGUNDOS)
+def fragmento_kpis():
+    mostrar_estado_diario()
+    mostrar_dashboard_kpis(get_estatisticas_fila())
+    st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+
+@st.fragment
+def fragmento_fila():
+    aviso = st.session_state.pop('aviso_fila', None)
+    if aviso:
+        st.toast(aviso)
+    mostrar_fila_pacientes(carregar_fila())
+
+@st.fragment
+def fragmento_analise():
+    mostrar_analise_clinica(carregar_fila())
+
+@st.fragment
+def fragmento_historico():
+    aviso = st.session_state.pop('aviso_historico', None)
+    if aviso:
+        st.toast(aviso)
+    mostrar_historico_atendimentos()
 
 # ==================== INTERFACES ESPECÍFICAS ====================
 def mostrar_interface_enfermeiro_completa():
     """Interface completa para enfermeiros: Dashboard, Lista e Novo Paciente"""
     
-    # Carregar dados
-    df = get_data()
-    
-    # CSS para link de logout
-    st.markdown("""
-    <style>
-    .logout-link {
-        color: #ffffff !important;
-        text-decoration: none !important;
-        font-size: 0.85rem;
-        font-weight: 400;
-        transition: opacity 0.2s;
-        cursor: pointer;
-        margin-left: 20px;
-    }
-    .logout-link:hover {
-        opacity: 0.8;
-        text-decoration: underline !important;
-        color: #ffffff !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Verificar logout via query params
     if 'logout' in st.query_params:
         st.session_state['tipo_acesso'] = None
@@ -2302,440 +1944,341 @@ def mostrar_interface_enfermeiro_completa():
             st.rerun()
     
     # Header principal com link visual (redireciona via URL)
-    brand_header = """
-    <div class='ac-global-header'>
-        <div class='ac-header-wrap'>
-                <div class='ac-brand'>
-                        <div class='ac-logo'>🏥</div>
-                        <div class='ac-text'>
-                                    <div class='ac-title'>Avicena Care - Enfermagem</div>
-                                    <div class='ac-sub'>Protocolo Catarinense de Acolhimento (PCACR)</div>
-                        </div>
-                </div>
-                <div style='display: flex; align-items: center;'>
-                    <div class='ac-status-pill'><span></span> PCACR Ativo</div>
-                    <a href='?logout=true' class='logout-link' target='_self'>🚪 Sair</a>
-                </div>
-        </div>
-    </div>
-    """
-    st.markdown(brand_header, unsafe_allow_html=True)
+    st.markdown(cabecalho_perfil('enfermeiro'), unsafe_allow_html=True)
     
     # Dashboard com contadores de prioridade
-    mostrar_dashboard_kpis(df)
-    st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+    fragmento_kpis()
     
     # Tabs: Lista de Pacientes, Novo Paciente e Histórico
-    tab_lista, tab_novo, tab_historico = st.tabs(["🧾 Fila de Atendimento", "➕ Novo Paciente", "📋 Histórico"])
+    tab_lista, tab_novo, tab_historico = criar_abas(
+        ["🧾 Fila de Atendimento", "➕ Novo Paciente", "📋 Histórico"], chave="abas_enfermeiro"
+    )
     
     with tab_lista:
-        mostrar_fila_pacientes(df)
+        if aba_aberta(tab_lista):
+            fragmento_fila()
     
     with tab_novo:
-        mostrar_form_novo_paciente()
+        if aba_aberta(tab_novo):
+            mostrar_form_novo_paciente()
     
     with tab_historico:
-        mostrar_historico_atendimentos()
+        if aba_aberta(tab_historico):
+            fragmento_historico()
 
 def mostrar_interface_medico_completa():
     """Interface completa para médicos: Dashboard, Lista, Análise Clínica, Relatórios e Novo Paciente"""
 
-    # Carregar dados
-    df = get_data()
-
-    # CSS para link de logout
-    st.markdown("""
-    <style>
-    .logout-link {
-        color: #ffffff !important;
-        text-decoration: none !important;
-        font-size: 0.85rem;
-        font-weight: 400;
-        transition: opacity 0.2s;
-        cursor: pointer;
-        margin-left: 20px;
-    }
-    .logout-link:hover {
-        opacity: 0.8;
-        text-decoration: underline !important;
-        color: #ffffff !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     # Header principal
-    brand_header = """
-    <div class='ac-global-header'>
-        <div class='ac-header-wrap'>
-                <div class='ac-brand'>
-                        <div class='ac-logo'>⚕️</div>
-                        <div class='ac-text'>
-                                    <div class='ac-title'>Avicena Care - Médico</div>
-                                    <div class='ac-sub'>Análise Clínica e Preditiva</div>
-                        </div>
-                </div>
-                <div style='display: flex; align-items: center;'>
-                    <div class='ac-status-pill'><span></span> PCACR Ativo</div>
-                    <a href='?logout=true' class='logout-link' target='_self'>🚪 Sair</a>
-                </div>
-        </div>
-    </div>
-    """
-    st.markdown(brand_header, unsafe_allow_html=True)
+    st.markdown(cabecalho_perfil('medico'), unsafe_allow_html=True)
 
-    mostrar_dashboard_kpis(df)
-    st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+    fragmento_kpis()
 
     # Definir abas
     tabs = ["🧾 Fila de Atendimento", "➕ Novo Paciente", "📊 Análise Clínica", "📋 Histórico"]
     if ML_AVAILABLE:
         tabs.insert(3, "🤖 Análise Preditiva")
-        tab_lista, tab_novo, tab_analise, tab_ml, tab_historico = st.tabs(tabs)
+        tab_lista, tab_novo, tab_analise, tab_ml, tab_historico = criar_abas(tabs, chave="abas_medico")
     else:
         # If ML is not available, there are only 4 tabs
-        tab_lista, tab_novo, tab_analise, tab_historico = st.tabs(tabs)
+        tab_lista, tab_novo, tab_analise, tab_historico = criar_abas(tabs, chave="abas_medico")
         tab_ml = None # Explicitly set tab_ml to None if not available
 
     with tab_lista:
-        mostrar_fila_pacientes(df)
+        if aba_aberta(tab_lista):
+            fragmento_fila()
 
     with tab_novo:
-        mostrar_form_novo_paciente()
+        if aba_aberta(tab_novo):
+            mostrar_form_novo_paciente()
 
     with tab_analise:
-        mostrar_analise_clinica(df)
+        if aba_aberta(tab_analise):
+            fragmento_analise()
 
     with tab_historico:
-        mostrar_historico_atendimentos()
+        if aba_aberta(tab_historico):
+            fragmento_historico()
 
     if ML_AVAILABLE:
         with tab_ml:
-            st.markdown("### 🤖 Análise Preditiva Baseada em ML")
+            if aba_aberta(tab_ml):
+                mostrar_analise_preditiva(carregar_fila())
+
+def mostrar_analise_preditiva(df):
+    """Predição do modelo, validação clínica e scores para um paciente da fila."""
+    st.markdown("### 🤖 Análise Preditiva Baseada em ML")
+    
+    metricas_modelo = predictor.get_model_metrics()
+    if metricas_modelo:
+        st.caption(
+            f"Modelo carregado em {metricas_modelo['load_time_s']*1000:.0f} ms · "
+            f"{metricas_modelo['model_size_mb']:.1f} MB · "
+            f"aquecimento {metricas_modelo['warmup_time_s']*1000:.0f} ms"
+        )
+    
+    if df.empty:
+        st.info("📋 Nenhum paciente na fila para análise.")
+    else:
+        # Seletor de paciente
+        paciente_options = [f"{row['Nome']} - {row['urgencia_manual']}" for _, row in df.iterrows()]
+        selected = st.selectbox("Selecione um paciente para análise:", paciente_options)
+        
+        if selected:
+            idx = paciente_options.index(selected)
+            paciente = df.iloc[idx]
             
-            if df.empty:
-                st.info("📋 Nenhum paciente na fila para análise.")
-            else:
-                # Seletor de paciente
-                paciente_options = [f"{row['Nome']} - {row['urgencia_manual']}" for _, row in df.iterrows()]
-                selected = st.selectbox("Selecione um paciente para análise:", paciente_options)
+            # Extrair sinais vitais
+            pa_sistolica = int(paciente['PA_Sistolica']) if pd.notna(paciente.get('PA_Sistolica')) else 120
+            pa_diastolica = int(paciente['PA_Diastolica']) if pd.notna(paciente.get('PA_Diastolica')) else 80
+            
+            # Carregar dados adicionais (com valores padrão para registros antigos)
+            spo2_valor = int(paciente['SpO2']) if 'SpO2' in paciente and pd.notna(paciente['SpO2']) else 95
+            nivel_consciencia_valor = paciente['nivel_consciencia'] if 'nivel_consciencia' in paciente and pd.notna(paciente['nivel_consciencia']) else 'Alerta'
+            genero_valor = paciente['genero'] if 'genero' in paciente and pd.notna(paciente['genero']) else 'Feminino'
+            
+            patient_data = {
+                'freq_cardiaca': int(paciente['FC']),
+                'spo2': spo2_valor,
+                'temperatura': float(paciente['Temp']),
+                'pa_sistolica': pa_sistolica,
+                'pa_diastolica': pa_diastolica,
+                'freq_respiratoria': int(paciente['FR']),
+                'idade': int(paciente['Idade']),
+                'genero': genero_valor
+            } # type: ignore
+            
+            try:
+                # Fazer predição
+                resultado = predictor.predict_pcacr(patient_data)
                 
-                if selected:
-                    idx = paciente_options.index(selected)
-                    paciente = df.iloc[idx]
-                    
-                    # Extrair sinais vitais
-                    pa_parts = paciente['PA'].split('/')
-                    pa_sistolica = int(pa_parts[0]) if len(pa_parts) > 0 else 120
-                    pa_diastolica = int(pa_parts[1]) if len(pa_parts) > 1 else 80 # type: ignore
-                    
-                    # Carregar dados adicionais (com valores padrão para registros antigos)
-                    spo2_valor = int(paciente['SpO2']) if 'SpO2' in paciente and pd.notna(paciente['SpO2']) else 95
-                    nivel_consciencia_valor = paciente['nivel_consciencia'] if 'nivel_consciencia' in paciente and pd.notna(paciente['nivel_consciencia']) else 'Alerta'
-                    genero_valor = paciente['genero'] if 'genero' in paciente and pd.notna(paciente['genero']) else 'Feminino'
-                    
-                    patient_data = {
-                        'freq_cardiaca': int(paciente['FC']),
-                        'spo2': spo2_valor,
-                        'temperatura': float(paciente['Temp']),
-                        'pa_sistolica': pa_sistolica,
-                        'pa_diastolica': pa_diastolica,
-                        'freq_respiratoria': int(paciente['FR']),
-                        'idade': int(paciente['Idade']),
-                        'genero': genero_valor
-                    } # type: ignore
+                # CALCULAR SCORES para validação
+                scores = calcular_todos_scores(
+                    freq_cardiaca=int(paciente['FC']),
+                    freq_respiratoria=int(paciente['FR']),
+                    temperatura=float(paciente['Temp']),
+                    pa_sistolica=pa_sistolica,
+                    spo2=spo2_valor,
+                    nivel_consciencia=nivel_consciencia_valor
+                )
+                
+                # Criar urgencia_regras da classificação atual
+                urgencia_regras = (paciente['urgencia_manual'], '', '')
+                
+                # VALIDAÇÃO CLÍNICA DO ML
+                validation_result = validar_predicao_ml(
+                    ml_prediction=resultado,
+                    scores=scores,
+                    urgencia_regras=urgencia_regras
+                )
+                
+                # Card do paciente
+                st.markdown(f"#### 👤 {paciente['Nome']} ({paciente['Idade']} anos)")
+                st.markdown(f"**Queixa:** {paciente['Queixa_Principal']}")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**📋 Classificação Atual:**")
+                    st.markdown(f"### {paciente['urgencia_manual']}")
+                with col2:
+                    confidence = resultado['confidence'] * 100
                     
-                    try:
-                        # Fazer predição
-                        resultado = predictor.predict_pcacr(patient_data)
-                        
-                        # CALCULAR SCORES para validação
-                        scores = calcular_todos_scores(
-                            freq_cardiaca=int(paciente['FC']),
-                            freq_respiratoria=int(paciente['FR']),
-                            temperatura=float(paciente['Temp']),
-                            pa_sistolica=pa_sistolica,
-                            spo2=spo2_valor,
-                            nivel_consciencia=nivel_consciencia_valor
-                        )
-                        
-                        # Criar urgencia_regras da classificação atual
-                        urgencia_regras = (paciente['urgencia_manual'], '', '')
-                        
-                        # VALIDAÇÃO CLÍNICA DO ML
-                        validation_result = validar_predicao_ml(
-                            ml_prediction=resultado,
-                            scores=scores,
-                            urgencia_regras=urgencia_regras
-                        )
-                        
-                        # Card do paciente
-                        st.markdown(f"#### 👤 {paciente['Nome']} ({paciente['Idade']} anos)")
-                        st.markdown(f"**Queixa:** {paciente['Queixa_Principal']}")
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown("**📋 Classificação Atual:**")
-                            st.markdown(f"### {paciente['urgencia_manual']}")
-                        with col2:
-                            confidence = resultado['confidence'] * 100
-                            
-                            # Mostrar validação
-                            if validation_result['was_overridden']:
-                                st.markdown("**🤖 Predição ML Original:**")
-                                st.markdown(f"### ~~{resultado['prediction']}~~")
-                                st.markdown(f"*Confiança: {confidence:.1f}%*")
-                                st.markdown("**🛡️ Classificação Final (Validada):**")
-                                st.success(f"### {validation_result['prediction_final']}")
-                            else:
-                                st.markdown("**🤖 Predição ML:**")
-                                st.markdown(f"### {resultado['prediction']}")
-                                st.markdown(f"*Confiança: {confidence:.1f}%*")
-                        
-                        # ALERTA DE SOBRESCRITA
-                        if validation_result['was_overridden']:
-                            alerta = formatar_alerta_override(validation_result)
-                            st.error(alerta)
-                        
-                        st.markdown("---")
-                        
-                        # Probabilidades
-                        st.markdown("### 📊 Distribuição de Probabilidades")
-                        prob_cols = st.columns(5)
-                        classes_ordem = ['PRIORIDADE MÁXIMA', 'ALTA PRIORIDADE', 'MÉDIA PRIORIDADE', 'BAIXA PRIORIDADE', 'MÍNIMA (ELETIVA)']
-                        cores = ['🔴', '🟠', '🟡', '🟢', '🔵']
-                        
-                        for idx, (classe, cor) in enumerate(zip(classes_ordem, cores)):
-                            prob = resultado['probabilities'].get(classe, 0) * 100
-                            with prob_cols[idx]:
-                                st.metric(
-                                    f"{cor} {classe.split()[0]}", 
-                                    f"{prob:.1f}%",
-                                    delta=None
-                                )
-                        
-                        st.markdown("---")
-                        
-                        # Interpretação Clínica
-                        st.markdown("### 🩺 Interpretação Clínica")
-                        explicacao = predictor.explain_prediction(patient_data)
-                        
-                        col_sinais, col_interpretacao = st.columns([1, 1])
-                        
-                        with col_sinais:
-                            st.markdown("**Sinais Vitais:**")
-                            for linha in explicacao.split('\n'):
-                                if linha.strip():
-                                    st.markdown(linha)
-                        
-                        with col_interpretacao:
-                            st.markdown("**💡 Recomendações:**")
-                            if resultado['confidence'] > 0.7:
-                                st.success("✅ Modelo tem alta confiança na predição")
-                            elif resultado['confidence'] > 0.5:
-                                st.warning("⚠️ Confiança moderada - revisar sinais vitais")
-                            else:
-                                st.error("⚠️ Baixa confiança - avaliar clinicamente")
-                            
-                            # Alerta de sepse
-                            if resultado['prediction'] in ['PRIORIDADE MÁXIMA', 'ALTA PRIORIDADE']:
-                                st.error("🚨 **ALERTA:** Risco elevado - considerar sepse")
-                        
-                        st.markdown("---")
-                        
-                        # === SCORES CLÍNICOS ===
-                        st.markdown("### 📊 Scores Clínicos Validados")
-                        
-                        # Importar função de dor
-                        from scores_clinicos import avaliar_escala_dor
-                        dor_score = avaliar_escala_dor(0)  # Dor não disponível no histórico
-                        
-                        # Exibir scores
-                        col_qsofa, col_news2, col_sirs = st.columns(3)
-                        
-                        # qSOFA
-                        with col_qsofa:
-                            qsofa = scores['qsofa']
-                            cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'verde': '🟢'}
-                            st.markdown(f"#### {cor_map.get(qsofa['cor'], '⚪')} qSOFA")
-                            st.metric("Score", f"{qsofa['score']}/3")
-                            st.markdown(f"**{qsofa['alerta']}**")
-                        
-                        # NEWS2
-                        with col_news2:
-                            news2 = scores['news2']
-                            cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
-                            st.markdown(f"#### {cor_map.get(news2['cor'], '⚪')} NEWS2")
-                            st.metric("Score", f"{news2['score']}/20")
-                            st.markdown(f"**{news2['alerta']}**")
-                        
-                        # SIRS
-                        with col_sirs:
-                            sirs = scores['sirs']
-                            cor_map = {'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
-                            st.markdown(f"#### {cor_map.get(sirs['cor'], '⚪')} SIRS")
-                            st.metric("Score", f"{sirs['score']}/3")
-                            st.markdown(f"**{sirs['alerta']}**")
-                        
-                        # Segunda linha: MEWS, GCS
-                        col_mews, col_gcs, col_vazio = st.columns(3)
-                        
-                        # MEWS
-                        with col_mews:
-                            mews = scores['mews']
-                            cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
-                            st.markdown(f"#### {cor_map.get(mews['cor'], '⚪')} MEWS")
-                            st.metric("Score", f"{mews['score']}/15")
-                            st.markdown(f"**{mews['alerta']}**")
-                        
-                        # GCS
-                        with col_gcs:
-                            gcs = scores['gcs']
-                            cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
-                            st.markdown(f"#### {cor_map.get(gcs['cor'], '⚪')} GCS")
-                            st.metric("Score", f"{gcs['score']}/15")
-                            st.markdown(f"**{gcs['alerta']}**")
-                        
-                        st.markdown("---")
-                        
-                        # Feature Importance
-                        st.markdown("### 📈 Importância dos Fatores Clínicos")
-                        feature_importance = predictor.get_feature_importance()
-                        
-                        # Ordenar por importância
-                        sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:10]
-                        
-                        df_importance = pd.DataFrame(sorted_features, columns=['Fator', 'Importância'])
-                        
-                        # Traduzir nomes
-                        traducao = {
-                            'HR': 'Freq. Cardíaca',
-                            'Temp': 'Temperatura',
-                            'SBP': 'PA Sistólica',
-                            'DBP': 'PA Diastólica',
-                            'Resp': 'Freq. Respiratória',
-                            'O2Sat': 'Saturação O2',
-                            'Age': 'Idade',
-                            'MAP': 'PAM',
-                            'Glucose': 'Glicose',
-                            'Lactate': 'Lactato'
-                        }
-                        df_importance['Fator'] = df_importance['Fator'].map(lambda x: traducao.get(x, x))
-                        
-                        # Criar gráfico com Plotly para controlar cores
-                        import plotly.graph_objects as go
-                        
-                        fig = go.Figure(data=[
-                            go.Bar(
-                                x=df_importance['Fator'],
-                                y=df_importance['Importância'],
-                                marker_color='#4A90E2',  # Azul claro
-                                text=df_importance['Importância'].round(3),
-                                textposition='outside'
-                            )
-                        ])
-                        
-                        fig.update_layout(
-                            plot_bgcolor='white',
-                            paper_bgcolor='white',
-                            font=dict(color='black'),
-                            xaxis=dict(
-                                showgrid=True,
-                                gridcolor='lightgray',
-                                title_font=dict(color='black')
-                            ),
-                            yaxis=dict(
-                                showgrid=True,
-                                gridcolor='lightgray',
-                                title='Importância',
-                                title_font=dict(color='black')
-                            ),
-                            margin=dict(l=40, r=40, t=40, b=40)
+                    # Mostrar validação
+                    if validation_result['was_overridden']:
+                        st.markdown("**🤖 Predição ML Original:**")
+                        st.markdown(f"### ~~{resultado['prediction']}~~")
+                        st.markdown(f"*Confiança: {confidence:.1f}%*")
+                        st.markdown("**🛡️ Classificação Final (Validada):**")
+                        st.success(f"### {validation_result['prediction_final']}")
+                    else:
+                        st.markdown("**🤖 Predição ML:**")
+                        st.markdown(f"### {resultado['prediction']}")
+                        st.markdown(f"*Confiança: {confidence:.1f}%*")
+                
+                # ALERTA DE SOBRESCRITA
+                if validation_result['was_overridden']:
+                    alerta = formatar_alerta_override(validation_result)
+                    st.error(alerta)
+                
+                st.markdown("---")
+                
+                # Probabilidades
+                st.markdown("### 📊 Distribuição de Probabilidades")
+                prob_cols = st.columns(5)
+                classes_ordem = ['PRIORIDADE MÁXIMA', 'ALTA PRIORIDADE', 'MÉDIA PRIORIDADE', 'BAIXA PRIORIDADE', 'MÍNIMA (ELETIVA)']
+                cores = ['🔴', '🟠', '🟡', '🟢', '🔵']
+                
+                for idx, (classe, cor) in enumerate(zip(classes_ordem, cores)):
+                    prob = resultado['probabilities'].get(classe, 0) * 100
+                    with prob_cols[idx]:
+                        st.metric(
+                            f"{cor} {classe.split()[0]}", 
+                            f"{prob:.1f}%",
+                            delta=None
                         )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                    except Exception as e:
-                        st.error(f"❌ Erro na análise preditiva: {str(e)}")
-
-def mostrar_dashboard_kpis(df):
-    """Exibe o dashboard de KPIs de prioridade."""
-    total_pacientes = len(df)
-    urgencia_maxima = len(df[df["urgencia_manual"] == "PRIORIDADE MÁXIMA"])
-    urgencia_alta = len(df[df["urgencia_manual"] == "ALTA PRIORIDADE"])
-    urgencia_media = len(df[df["urgencia_manual"] == "MÉDIA PRIORIDADE"])
-    urgencia_baixa = len(df[df["urgencia_manual"] == "BAIXA PRIORIDADE"])
-    urgencia_minima = len(df[df["urgencia_manual"] == "MÍNIMA (ELETIVA)"])
-
-    protocol_html = f"""
-    <div class='pcacr-wrapper'>
-      <div class='pcacr-box-minimal'>
-         <div class='pcacr-header-row'>
-            <div class='pcacr-title-section'>
-               <h2>📋 Protocolo PCACR Ativo</h2>
-               <p>Classificação de risco por cores e tempos alvo</p>
-            </div>
-            <div class='pcacr-legend-inline'>
-               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-max'></span>Máxima (0min)</div>
-               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-alta'></span>Alta (15min)</div>
-               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-media'></span>Média (60min)</div>
-               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-baixa'></span>Baixa (120min)</div>
-               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-min'></span>Mínima (240min)</div>
-            </div>
-         </div>
-         <div class='kpi-band-minimal'>
-            <div class='kpi-box-minimal total'>
-                <div class='kpi-icon-minimal'>📊</div>
-                <div class='kpi-value-minimal'>{total_pacientes}</div>
-                <div class='kpi-label-minimal'>TOTAL DE PACIENTES</div>
-                <div class='kpi-meta-minimal'>Atual</div>
-            </div>
-            <div class='kpi-box-minimal max'>
-                <div class='kpi-circle-modern d-max'></div>
-                <div class='kpi-value-minimal'>{urgencia_maxima}</div>
-                <div class='kpi-label-minimal'>PRIORIDADE MÁXIMA</div>
-                <div class='kpi-meta-minimal'>0 minutos</div>
-            </div>
-            <div class='kpi-box-minimal alta'>
-                <div class='kpi-circle-modern d-alta'></div>
-                <div class='kpi-value-minimal'>{urgencia_alta}</div>
-                <div class='kpi-label-minimal'>PRIORIDADE ALTA</div>
-                <div class='kpi-meta-minimal'>15 minutos</div>
-            </div>
-            <div class='kpi-box-minimal media'>
-                <div class='kpi-circle-modern d-media'></div>
-                <div class='kpi-value-minimal'>{urgencia_media}</div>
-                <div class='kpi-label-minimal'>PRIORIDADE MÉDIA</div>
-                <div class='kpi-meta-minimal'>60 minutos</div>
-            </div>
-            <div class='kpi-box-minimal baixa'>
-                <div class='kpi-circle-modern d-baixa'></div>
-                <div class='kpi-value-minimal'>{urgencia_baixa}</div>
-                <div class='kpi-label-minimal'>PRIORIDADE BAIXA</div>
-                <div class='kpi-meta-minimal'>120 minutos</div>
-            </div>
-            <div class='kpi-box-minimal min'>
-                <div class='kpi-circle-modern d-min'></div>
-                <div class='kpi-value-minimal'>{urgencia_minima}</div>
-                <div class='kpi-label-minimal'>PRIORIDADE MÍNIMA</div>
-                <div class='kpi-meta-minimal'>240 minutos</div>
-            </div>
-         </div>
-      </div>
-    </div>
-    """
-    st.markdown(protocol_html, unsafe_allow_html=True)
+                
+                st.markdown("---")
+                
+                # Interpretação Clínica
+                st.markdown("### 🩺 Interpretação Clínica")
+                explicacao = predictor.explain_prediction(patient_data)
+                
+                col_sinais, col_interpretacao = st.columns([1, 1])
+                
+                with col_sinais:
+                    st.markdown("**Sinais Vitais:**")
+                    for linha in explicacao.split('\n'):
+                        if linha.strip():
+                            st.markdown(linha)
+                
+                with col_interpretacao:
+                    st.markdown("**💡 Recomendações:**")
+                    if resultado['confidence'] > 0.7:
+                        st.success("✅ Modelo tem alta confiança na predição")
+                    elif resultado['confidence'] > 0.5:
+                        st.warning("⚠️ Confiança moderada - revisar sinais vitais")
+                    else:
+                        st.error("⚠️ Baixa confiança - avaliar clinicamente")
+                    
+                    # Alerta de sepse
+                    if resultado['prediction'] in ['PRIORIDADE MÁXIMA', 'ALTA PRIORIDADE']:
+                        st.error("🚨 **ALERTA:** Risco elevado - considerar sepse")
+                
+                st.markdown("---")
+                
+                # === SCORES CLÍNICOS ===
+                st.markdown("### 📊 Scores Clínicos Validados")
+                
+                # Importar função de dor
+                from scores_clinicos import avaliar_escala_dor
+                dor_score = avaliar_escala_dor(0)  # Dor não disponível no histórico
+                
+                # Exibir scores
+                col_qsofa, col_news2, col_sirs = st.columns(3)
+                
+                # qSOFA
+                with col_qsofa:
+                    qsofa = scores['qsofa']
+                    cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'verde': '🟢'}
+                    st.markdown(f"#### {cor_map.get(qsofa['cor'], '⚪')} qSOFA")
+                    st.metric("Score", f"{qsofa['score']}/3")
+                    st.markdown(f"**{qsofa['alerta']}**")
+                
+                # NEWS2
+                with col_news2:
+                    news2 = scores['news2']
+                    cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
+                    st.markdown(f"#### {cor_map.get(news2['cor'], '⚪')} NEWS2")
+                    st.metric("Score", f"{news2['score']}/20")
+                    st.markdown(f"**{news2['alerta']}**")
+                
+                # SIRS
+                with col_sirs:
+                    sirs = scores['sirs']
+                    cor_map = {'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
+                    st.markdown(f"#### {cor_map.get(sirs['cor'], '⚪')} SIRS")
+                    st.metric("Score", f"{sirs['score']}/3")
+                    st.markdown(f"**{sirs['alerta']}**")
+                
+                # Segunda linha: MEWS, GCS
+                col_mews, col_gcs, col_vazio = st.columns(3)
+                
+                # MEWS
+                with col_mews:
+                    mews = scores['mews']
+                    cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
+                    st.markdown(f"#### {cor_map.get(mews['cor'], '⚪')} MEWS")
+                    st.metric("Score", f"{mews['score']}/15")
+                    st.markdown(f"**{mews['alerta']}**")
+                
+                # GCS
+                with col_gcs:
+                    gcs = scores['gcs']
+                    cor_map = {'vermelho': '🔴', 'laranja': '🟠', 'amarelo': '🟡', 'verde': '🟢'}
+                    st.markdown(f"#### {cor_map.get(gcs['cor'], '⚪')} GCS")
+                    st.metric("Score", f"{gcs['score']}/15")
+                    st.markdown(f"**{gcs['alerta']}**")
+                
+                st.markdown("---")
+                
+                # Feature Importance
+                st.markdown("### 📈 Importância dos Fatores Clínicos")
+                feature_importance = predictor.get_feature_importance()
+                
+                # Ordenar por importância
+                sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:10]
+                
+                df_importance = pd.DataFrame(sorted_features, columns=['Fator', 'Importância'])
+                
+                # Traduzir nomes
+                traducao = {
+                    'HR': 'Freq. Cardíaca',
+                    'Temp': 'Temperatura',
+                    'SBP': 'PA Sistólica',
+                    'DBP': 'PA Diastólica',
+                    'Resp': 'Freq. Respiratória',
+                    'O2Sat': 'Saturação O2',
+                    'Age': 'Idade',
+                    'MAP': 'PAM',
+                    'Glucose': 'Glicose',
+                    'Lactate': 'Lactato'
+                }
+                df_importance['Fator'] = df_importance['Fator'].map(lambda x: traducao.get(x, x))
+                
+                # Criar gráfico com Plotly para controlar cores
+                import plotly.graph_objects as go
+                
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=df_importance['Fator'],
+                        y=df_importance['Importância'],
+                        marker_color='#4A90E2',  # Azul claro
+                        text=df_importance['Importância'].round(3),
+                        textposition='outside'
+                    )
+                ])
+                
+                fig.update_layout(
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    font=dict(color='black'),
+                    xaxis=dict(
+                        showgrid=True,
+                        gridcolor='lightgray',
+                        title_font=dict(color='black')
+                    ),
+                    yaxis=dict(
+                        showgrid=True,
+                        gridcolor='lightgray',
+                        title='Importância',
+                        title_font=dict(color='black')
+                    ),
+                    margin=dict(l=40, r=40, t=40, b=40)
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+                
+            except Exception as e:
+                st.error(f"❌ Erro na análise preditiva: {str(e)}")
+
+def mostrar_dashboard_kpis(estatisticas):
+    """Exibe o dashboard de KPIs de prioridade (estatisticas: EstatisticasFila)."""
+    st.markdown(
+        faixa_kpis(estatisticas.total, *(estatisticas[prioridade] for prioridade in agregacoes.PRIORIDADES)),
+        unsafe_allow_html=True,
+    )
 
 def mostrar_historico_atendimentos():
     """Mostra histórico de pacientes atendidos com opção de busca."""
     st.markdown("### 📋 Histórico de Atendimentos")
     
-    df_atendidos = get_atendidos()
+    total_atendidos = contar_atendidos()
     
-    if df_atendidos.empty:
+    if total_atendidos == 0:
         st.info("📋 Nenhum atendimento registrado ainda.")
         return
     
-    st.markdown(f"**Total de atendimentos:** {len(df_atendidos)}")
+    st.markdown(f"**Total de atendimentos:** {total_atendidos}")
     
     # Filtros
     col_filtro1, col_filtro2 = st.columns(2)
@@ -2744,22 +2287,32 @@ def mostrar_historico_atendimentos():
     with col_filtro2:
         filtro_periodo = st.selectbox("📅 Período:", ["Todos", "Hoje", "Última semana", "Último mês"], key="filtro_periodo")
 
-    # Aplicar filtros
+    # Filtros aplicados no SQL (o histórico pode ter milhões de linhas)
+    filtros = {}
     if filtro_nome:
-        df_atendidos = df_atendidos[df_atendidos['Nome'].str.contains(filtro_nome, case=False, na=False)]
+        filtros['nome'] = filtro_nome
 
     if filtro_periodo != "Todos":
-        df_atendidos['data_atendimento'] = pd.to_datetime(df_atendidos['data_atendimento'])
-        now = datetime.now()
+        # Arredondado ao minuto para que reruns seguidos reaproveitem o cache
+        now = datetime.now().replace(second=0, microsecond=0)
         if filtro_periodo == "Hoje":
-            df_atendidos = df_atendidos[df_atendidos['data_atendimento'].dt.date == now.date()]
+            filtros['data_inicio'] = datetime(now.year, now.month, now.day)
         elif filtro_periodo == "Última semana":
-            start_date = now - pd.Timedelta(days=7)
-            df_atendidos = df_atendidos[df_atendidos['data_atendimento'] >= start_date]
+            filtros['data_inicio'] = now - pd.Timedelta(days=7)
         elif filtro_periodo == "Último mês":
-            start_date = now - pd.Timedelta(days=30)
-            df_atendidos = df_atendidos[df_atendidos['data_atendimento'] >= start_date]
+            filtros['data_inicio'] = now - pd.Timedelta(days=30)
+
+    # Paginação por keyset: pilha de cursores das páginas já visitadas,
+    # reiniciada quando os filtros mudam
+    if st.session_state.get('historico_filtros') != (filtro_nome, filtro_periodo):
+        st.session_state['historico_filtros'] = (filtro_nome, filtro_periodo)
+        st.session_state['historico_cursores'] = [None]
+    cursores = st.session_state['historico_cursores']
 
+    df_atendidos, proximo = get_pagina_atendidos(apos=cursores[-1], **filtros)
+
+    if df_atendidos.empty:
+        st.info("🔍 Nenhum atendimento encontrado para os filtros selecionados.")
 
     for _, paciente in df_atendidos.iterrows():
         urgencia = paciente['urgencia_manual']
@@ -2785,13 +2338,24 @@ def mostrar_historico_atendimentos():
                 st.write(f"**Cadastro:** {data_cad_str}")
                 st.write(f"**Atendimento:** {data_atend_str}")
                 
-                if st.button("↩️ Retornar à Fila", key=f"retornar_{paciente['id']}"):
-                    with db_conn.cursor() as cursor:
-                        # TODO: Update with your table name
-                        cursor.execute("UPDATE avicena_care.triagem SET status = 'AGUARDANDO', data_atendimento = NULL WHERE id = ?", (str(paciente['id']),))
-                    st.success(f"✅ {paciente['Nome']} retornou à fila!")
-                    time.sleep(0.5)
-                    st.rerun()
+                st.button(
+                    "↩️ Retornar à Fila", key=f"retornar_{paciente['id']}",
+                    on_click=_retornar_fila, args=(str(paciente['id']), paciente['Nome'])
+                )
+
+    # Navegação entre páginas
+    if len(cursores) > 1 or proximo is not None:
+        col_anterior, col_pagina, col_proxima = st.columns([1, 2, 1])
+        with col_anterior:
+            if len(cursores) > 1 and st.button("⬅️ Anteriores", key="historico_anterior", use_container_width=True):
+                cursores.pop()
+                st.rerun(scope="fragment")
+        with col_pagina:
+            st.caption(f"Página {len(cursores)}")
+        with col_proxima:
+            if proximo is not None and st.button("Próximos ➡️", key="historico_proximo", use_container_width=True):
+                cursores.append(proximo)
+                st.rerun(scope="fragment")
 
 # Inicializar estado da sessão para controle da tela
 def main():
@@ -2829,9 +2393,14 @@ def main():
         mostrar_interface_medico_completa()
 
 if __name__ == "__main__":
-    # Inicializa a conexão e o banco de dados uma única vez no início
-    db_conn = init_databricks_connection()
-    with db_conn.cursor() as cursor:
-        load_initial_data(cursor)
+    # Inicializa o repositório (Databricks, SQLite local ou ambos) uma única vez no início
+    repositorio = init_repositorio()
+    escritor = init_escritor()
+    preparar_banco()
+    
+    # Carrega o modelo de ML já na inicialização (uma vez por processo),
+    # em vez de no primeiro cadastro de paciente
+    if ML_AVAILABLE:
+        predictor.load_model()
     
     main()
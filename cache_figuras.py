@@ -0,0 +1,105 @@
+"""
+Cache de figuras Plotly
+Figuras indexadas pelo conteúdo dos dados e pelos parâmetros, com descarte LRU,
+guardadas já serializadas para o st.plotly_chart
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+def assinatura_df(df):
+    """Hash do conteúdo do DataFrame (colunas, tipos, índice e valores)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+    try:
+        valores = pd.util.hash_pandas_object(df, index=True)
+    except TypeError:
+        # Colunas com valores não hasheáveis (listas, dicts): compara pelo texto
+        valores = pd.util.hash_pandas_object(df.astype(str), index=True)
+    h.update(valores.values.tobytes())
+    return h.hexdigest()
+
+
+class FiguraSerializada(go.Figure):
+    """
+    Figura com a especificação JSON calculada uma vez
+
+    O st.plotly_chart não aceita JSON pronto: a cada rerun ele chama
+    to_dict() (cópia profunda de todos os traços, o grosso do custo) e depois
+    plotly.io.to_json(). Aqui to_dict() devolve a especificação `spec` já
+    decodificada, então só resta codificar dicts e listas simples. Alterar a
+    figura depois de criada não muda o que é desenhado.
+    """
+
+    def __init__(self, figura):
+        super().__init__(figura)
+        self._spec = pio.to_json(figura, validate=False)
+        self._especificacao = json.loads(self._spec)
+
+    @property
+    def spec(self):
+        """JSON da figura, como o st.plotly_chart o envia ao navegador."""
+        return self._spec
+
+    def to_dict(self):
+        return self._especificacao
+
+
+class CacheFiguras:
+    """
+    Figuras já montadas e serializadas, compartilhadas pelo processo
+
+    A chave é (nome, assinatura dos dados, parâmetros); mudou qualquer um, a
+    figura é montada de novo. As figuras devolvidas (FiguraSerializada) são
+    compartilhadas entre sessões e não devem ser alteradas por quem as recebe.
+    """
+
+    def __init__(self, capacidade=64):
+        self.capacidade = capacidade
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, nome, construir, assinatura=None, **parametros):
+        """
+        Devolve a figura em cache ou a monta com construir() e a serializa
+
+        Args:
+            nome: Identifica o gráfico
+            construir: Função sem argumentos que monta a figura
+            assinatura: Assinatura dos dados de entrada (ver assinatura_df)
+            **parametros: Demais valores que mudam a figura (hasheáveis)
+        """
+        chave = (nome, assinatura, tuple(sorted(parametros.items())))
+        with self._lock:
+            figura = self._figuras.get(chave)
+            if figura is not None:
+                self._figuras.move_to_end(chave)
+                self.acertos += 1
+                return figura
+            self.faltas += 1
+
+        # Montada fora do lock: duas sessões podem montar a mesma figura ao
+        # mesmo tempo, mas nenhuma espera pela outra
+        figura = FiguraSerializada(construir())
+        with self._lock:
+            self._figuras[chave] = figura
+            self._figuras.move_to_end(chave)
+            while len(self._figuras) > self.capacidade:
+                self._figuras.popitem(last=False)
+        return figura
+
+    def limpar(self):
+        with self._lock:
+            self._figuras.clear()
+
+    def __len__(self):
+        return len(self._figuras)
@@ -0,0 +1,168 @@
+"""
+Pool de conexões com o Databricks SQL Warehouse
+Conexões limitadas, verificação de vida no checkout e reconexão com backoff
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from databricks import sql
+
+# Erros que indicam conexão/sessão perdida (a conexão é descartada, não devolvida).
+# Erros de SQL (ServerOperationError, ProgrammingError...) não entram aqui.
+ERROS_CONEXAO = (sql.exc.OperationalError, sql.exc.InterfaceError)
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões DB-API
+
+    Cada checkout recebe um cursor próprio; a conexão volta para o pool ao
+    final do bloco, ou é descartada se falhou com erro de conexão. Conexões
+    ociosas há mais de `verificar_apos_s` passam por um SELECT 1 antes de
+    serem entregues.
+    """
+
+    def __init__(self, fabrica, tamanho=4, timeout_s=30.0, tentativas=3,
+                 espera_base_s=0.5, verificar_apos_s=60.0, erros_conexao=ERROS_CONEXAO):
+        """
+        Args:
+            fabrica: Função sem argumentos que abre uma conexão nova
+            tamanho: Máximo de conexões abertas ao mesmo tempo
+            timeout_s: Espera máxima por uma conexão livre
+            tentativas: Tentativas de conexão/execução antes de desistir
+            espera_base_s: Espera inicial do backoff exponencial
+            verificar_apos_s: Ociosidade a partir da qual a conexão é testada
+            erros_conexao: Exceções tratadas como conexão perdida
+        """
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.timeout_s = timeout_s
+        self.tentativas = tentativas
+        self.espera_base_s = espera_base_s
+        self.verificar_apos_s = verificar_apos_s
+        self.erros_conexao = erros_conexao
+
+        self._livres = queue.LifoQueue()  # (conexao, instante da devolução)
+        self._vagas = threading.BoundedSemaphore(tamanho)
+
+    # ------------------------------------------------------------------
+    # Checkout / devolução
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def cursor(self):
+        """Empresta uma conexão do pool e entrega um cursor exclusivo."""
+        conexao = self._obter()
+        perdida = False
+        try:
+            cursor = conexao.cursor()
+            try:
+                yield cursor
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+        except self.erros_conexao:
+            perdida = True
+            raise
+        finally:
+            if perdida:
+                self._descartar(conexao)
+                self._marcar_suspeitas()
+            else:
+                self._livres.put((conexao, time.monotonic()))
+            self._vagas.release()
+
+    def executar(self, funcao, *args, **kwargs):
+        """
+        Executa funcao(cursor, ...) com reconexão transparente
+
+        Se a conexão cair no meio, a chamada é repetida em outra conexão com
+        backoff. Use para leituras e escritas idempotentes.
+        """
+        for tentativa in range(self.tentativas):
+            try:
+                with self.cursor() as cursor:
+                    return funcao(cursor, *args, **kwargs)
+            except self.erros_conexao as e:
+                if tentativa == self.tentativas - 1:
+                    raise
+                print(f"⚠️ Conexão perdida ({e.__class__.__name__}), tentando novamente...")
+                self._esperar(tentativa)
+
+    def fechar(self):
+        """Fecha todas as conexões ociosas."""
+        while True:
+            try:
+                conexao, _ = self._livres.get_nowait()
+            except queue.Empty:
+                return
+            self._descartar(conexao)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _obter(self):
+        if not self._vagas.acquire(timeout=self.timeout_s):
+            raise TimeoutError(f"Nenhuma conexão livre em {self.timeout_s}s (pool de {self.tamanho})")
+        try:
+            while True:
+                try:
+                    conexao, devolvida_em = self._livres.get_nowait()
+                except queue.Empty:
+                    return self._conectar()
+                if self._viva(conexao, devolvida_em):
+                    return conexao
+                self._descartar(conexao)
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    def _conectar(self):
+        for tentativa in range(self.tentativas):
+            try:
+                return self.fabrica()
+            except self.erros_conexao:
+                if tentativa == self.tentativas - 1:
+                    raise
+                self._esperar(tentativa)
+
+    def _viva(self, conexao, devolvida_em):
+        if getattr(conexao, "open", True) is False:
+            return False
+        if time.monotonic() - devolvida_em < self.verificar_apos_s:
+            return True
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _marcar_suspeitas(self):
+        # Uma queda costuma derrubar as outras conexões também: as ociosas
+        # passam pelo SELECT 1 no próximo checkout
+        ociosas = []
+        while True:
+            try:
+                conexao, _ = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            ociosas.append(conexao)
+        for conexao in reversed(ociosas):
+            self._livres.put((conexao, float("-inf")))
+
+    def _descartar(self, conexao):
+        try:
+            conexao.close()
+        except Exception:
+            pass
+
+    def _esperar(self, tentativa):
+        time.sleep(self.espera_base_s * (2 ** tentativa))
@@ -0,0 +1,567 @@
+"""
+Camada de consultas da tabela de triagem
+Monta SELECTs parametrizados com filtros, projeção de colunas e paginação por keyset
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# TODO: Update with your schema/table name if different from 'avicena_care.triagem'
+TABELA_TRIAGEM = "avicena_care.triagem"
+
+TODAS_COLUNAS = (
+    "id", "Nome", "Idade", "PA", "PA_Sistolica", "PA_Diastolica", "FC", "FR", "Temp", "SpO2", "nivel_consciencia",
+    "genero", "intensidade_dor", "Comorbidade", "Alergia", "Queixa_Principal",
+    "urgencia_automatica", "urgencia_manual", "status", "data_cadastro",
+    "data_atendimento", "medicacoes", "last_modified",
+)
+
+# Colunas usadas pela fila, KPIs, análise clínica e aba de ML
+COLUNAS_FILA = (
+    "id", "Nome", "Idade", "PA", "PA_Sistolica", "PA_Diastolica", "FC", "FR", "Temp", "SpO2", "nivel_consciencia",
+    "genero", "Queixa_Principal", "urgencia_manual", "data_cadastro",
+)
+
+# Colunas usadas pelo histórico de atendimentos
+COLUNAS_HISTORICO = (
+    "id", "Nome", "Idade", "PA", "FC", "FR", "Temp", "Queixa_Principal",
+    "urgencia_manual", "data_cadastro", "data_atendimento",
+)
+
+# Colunas aceitas como chave de ordenação/paginação
+COLUNAS_ORDEM = ("data_cadastro", "data_atendimento", "last_modified")
+# Valor da chave de ordenação para datas nulas: essas linhas vão para o fim da
+# ordem decrescente e continuam alcançáveis pelo keyset (NULL < x nunca é verdade)
+SENTINELA_ORDEM = datetime(1900, 1, 1)
+
+# Classificações do protocolo, da mais urgente para a eletiva
+PRIORIDADES = ("PRIORIDADE MÁXIMA", "ALTA PRIORIDADE", "MÉDIA PRIORIDADE", "BAIXA PRIORIDADE", "MÍNIMA (ELETIVA)")
+
+# Tipos compactos dos DataFrames lidos do banco (ver tipar_colunas)
+# Enumerações -> category; valores fora da lista entram como categorias extras
+CATEGORIAS = {
+    "urgencia_manual": PRIORIDADES,
+    "urgencia_automatica": PRIORIDADES,
+    "status": ("AGUARDANDO", "ATENDIDO"),
+    "genero": ("Masculino", "Feminino", "Outro"),
+    "nivel_consciencia": ("Alerta", "Confuso", "Sonolento", "Inconsciente"),
+}
+# Sinais vitais inteiros -> int16 (float32 se houver nulos: inteiros continuam exatos).
+# Temp fica em float64: em float32, 39.1 vira 39.0999... e cai fora de "temp >= 39.1"
+COLUNAS_INTEIRAS = ("Idade", "PA_Sistolica", "PA_Diastolica", "FC", "FR", "SpO2", "intensidade_dor")
+COLUNAS_DATA = ("data_cadastro", "data_atendimento", "last_modified")
+
+# Leitura colunar (fetchall_arrow) quando o cursor oferece; False força o fetchall() do DB-API
+USAR_ARROW = pa is not None
+# Falhas que fazem a consulta ser refeita pelo fetchall(): Arrow indisponível no
+# conector/servidor ou conversão que o pyarrow não faz. Conexão perdida não entra
+# aqui (sobe para o PoolConexoes, que repete em outra conexão), nem erros de
+# programação como TypeError/AttributeError
+ERROS_ARROW = (NotImplementedError, ImportError) + ((pa.ArrowException,) if pa else ())
+# Tipo do cursor -> leitura Arrow utilizável. Decidido na primeira consulta de
+# cada tipo: uma falha passa o tipo para o fetchall() de vez (e avisa uma vez só)
+_ARROW_POR_CURSOR = {}
+
+
+def _escapar_like(texto):
+    """Escapa curingas do LIKE ('!' é o caractere de escape)."""
+    return texto.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def separar_pa(pa):
+    """'120/80' -> (120, 80); partes ausentes ou inválidas viram None."""
+    partes = str(pa).split("/", 1) if pa is not None else []
+    valores = []
+    for parte in partes[:2]:
+        try:
+            valores.append(int(parte.strip()))
+        except ValueError:
+            valores.append(None)
+    valores += [None] * (2 - len(valores))
+    return tuple(valores)
+
+
+def _completar_pa(registro):
+    """Preenche PA_Sistolica/PA_Diastolica a partir de 'PA' quando não vierem no registro."""
+    if "PA" not in registro or "PA_Sistolica" in registro:
+        return registro
+    sistolica, diastolica = separar_pa(registro["PA"])
+    return dict(registro, PA_Sistolica=sistolica, PA_Diastolica=diastolica)
+
+
+def _montar_filtros(status=None, data_inicio=None, data_fim=None, prioridades=None,
+                    nome=None, ordem="data_cadastro", pa_sistolica_min=None,
+                    pa_sistolica_max=None):
+    """Monta a cláusula WHERE (lista de condições) e os parâmetros nomeados."""
+    condicoes = []
+    params = {}
+
+    if status:
+        condicoes.append("status = %(status)s")
+        params["status"] = status
+
+    # Período aplicado sobre a mesma coluna da ordenação
+    if data_inicio is not None:
+        condicoes.append(f"{ordem} >= %(data_inicio)s")
+        params["data_inicio"] = data_inicio
+    if data_fim is not None:
+        condicoes.append(f"{ordem} < %(data_fim)s")
+        params["data_fim"] = data_fim
+
+    if prioridades:
+        marcadores = []
+        for i, prioridade in enumerate(prioridades):
+            marcadores.append(f"%(prioridade_{i})s")
+            params[f"prioridade_{i}"] = prioridade
+        condicoes.append(f"urgencia_manual IN ({', '.join(marcadores)})")
+
+    if nome:
+        condicoes.append("lower(Nome) LIKE %(nome)s ESCAPE '!'")
+        params["nome"] = f"%{_escapar_like(nome.lower())}%"
+
+    if pa_sistolica_min is not None:
+        condicoes.append("PA_Sistolica >= %(pa_sistolica_min)s")
+        params["pa_sistolica_min"] = int(pa_sistolica_min)
+    if pa_sistolica_max is not None:
+        condicoes.append("PA_Sistolica <= %(pa_sistolica_max)s")
+        params["pa_sistolica_max"] = int(pa_sistolica_max)
+
+    return condicoes, params
+
+
+def montar_consulta(colunas=None, status=None, data_inicio=None, data_fim=None,
+                    prioridades=None, nome=None, ordem="data_cadastro",
+                    apos=None, limite=None, pa_sistolica_min=None, pa_sistolica_max=None):
+    """
+    Monta um SELECT sobre a tabela de triagem com os filtros no SQL
+
+    Args:
+        colunas: Colunas projetadas (padrão: todas)
+        status: Filtra por status ('AGUARDANDO', 'ATENDIDO'); None = todos
+        data_inicio, data_fim: Período [inicio, fim) sobre a coluna de ordem
+        prioridades: Lista de urgencia_manual aceitas
+        nome: Trecho do nome (sem diferenciar maiúsculas)
+        pa_sistolica_min, pa_sistolica_max: Faixa de PA sistólica (mmHg)
+        ordem: 'data_cadastro' ou 'data_atendimento' (ordem decrescente)
+        apos: Cursor keyset (valor_ordem, id) da última linha da página anterior
+        limite: Tamanho da página
+
+    Returns:
+        tuple: (sql, params) no paramstyle pyformat
+    """
+    colunas = tuple(colunas) if colunas else TODAS_COLUNAS
+    desconhecidas = set(colunas) - set(TODAS_COLUNAS)
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas: {sorted(desconhecidas)}")
+    if ordem not in COLUNAS_ORDEM:
+        raise ValueError(f"Ordenação inválida: {ordem}")
+
+    condicoes, params = _montar_filtros(status, data_inicio, data_fim, prioridades, nome, ordem,
+                                        pa_sistolica_min, pa_sistolica_max)
+
+    # Keyset: linhas estritamente depois da última vista, na ordem (chave DESC, id DESC)
+    chave = f"COALESCE({ordem}, %(sentinela_ordem)s)"
+    params["sentinela_ordem"] = SENTINELA_ORDEM
+    if apos is not None:
+        condicoes.append(
+            f"({chave} < %(apos_valor)s OR ({chave} = %(apos_valor)s AND id < %(apos_id)s))"
+        )
+        params["apos_valor"], params["apos_id"] = apos
+
+    query = f"SELECT {', '.join(colunas)} FROM {TABELA_TRIAGEM}"
+    if condicoes:
+        query += " WHERE " + " AND ".join(condicoes)
+    query += f" ORDER BY {chave} DESC, id DESC"
+    if limite is not None:
+        query += f" LIMIT {int(limite)}"
+
+    return query, params
+
+
+def montar_contagem(status=None, data_inicio=None, data_fim=None, prioridades=None,
+                    nome=None, ordem="data_cadastro", pa_sistolica_min=None,
+                    pa_sistolica_max=None):
+    """Monta um SELECT COUNT(*) com os mesmos filtros de montar_consulta."""
+    condicoes, params = _montar_filtros(status, data_inicio, data_fim, prioridades, nome, ordem,
+                                        pa_sistolica_min, pa_sistolica_max)
+    query = f"SELECT COUNT(*) FROM {TABELA_TRIAGEM}"
+    if condicoes:
+        query += " WHERE " + " AND ".join(condicoes)
+    return query, params
+
+
+# Marcador de valor: carimbo de data/hora do momento da escrita
+AGORA = object()
+
+
+def _valor_sql(coluna, valor, params, agora):
+    if valor is AGORA:
+        if agora is None:
+            return "current_timestamp()"
+        params["agora"] = agora
+        return "%(agora)s"
+    params[coluna] = valor
+    return f"%({coluna})s"
+
+
+def montar_insercao(registro, agora=None):
+    """
+    Monta o INSERT de um paciente (dict coluna -> valor)
+
+    last_modified recebe o horário do servidor (current_timestamp()) ou,
+    se `agora` for informado, esse valor como parâmetro (SQLite).
+    PA_Sistolica/PA_Diastolica são derivadas de 'PA' se não vierem.
+    """
+    registro = _completar_pa(registro)
+    desconhecidas = set(registro) - set(TODAS_COLUNAS)
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas: {sorted(desconhecidas)}")
+    valores = {c: registro[c] for c in TODAS_COLUNAS if c in registro}
+    valores["last_modified"] = AGORA
+
+    params = {}
+    marcadores = [_valor_sql(c, v, params, agora) for c, v in valores.items()]
+    query = (
+        f"INSERT INTO {TABELA_TRIAGEM} ({', '.join(valores)})"
+        f" VALUES ({', '.join(marcadores)})"
+    )
+    return query, params
+
+
+def valor_python(valor):
+    """Converte valores vindos do pandas/NumPy (NaN, NaT, int64, Timestamp) para tipos Python."""
+    if valor is None or valor is pd.NaT:
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if hasattr(valor, "item"):  # escalares NumPy
+        valor = valor.item()
+    if isinstance(valor, float) and valor != valor:  # NaN
+        return None
+    return valor
+
+
+def _valores_lote(registros, literal=None, omitir=()):
+    """Colunas (união das chaves, menos omitir), linhas de valores SQL e parâmetros de um lote."""
+    registros = [_completar_pa(r) for r in registros]
+    presentes = set().union(*registros)
+    desconhecidas = presentes - set(TODAS_COLUNAS)
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas: {sorted(desconhecidas)}")
+    colunas = [c for c in TODAS_COLUNAS if c in presentes and c != "last_modified" and c not in omitir]
+
+    params = {}
+    linhas = []
+    for i, registro in enumerate(registros):
+        valores = []
+        for c in colunas:
+            valor = valor_python(registro.get(c))
+            if literal is not None:
+                valores.append(str(literal(valor)))
+            else:
+                params[f"{c}_{i}"] = valor
+                valores.append(f"%({c}_{i})s")
+        linhas.append(valores)
+    return colunas, linhas, params
+
+
+def montar_insercao_lote(registros, agora=None, literal=None):
+    """
+    Monta um INSERT de várias linhas (VALUES (...), (...), ...)
+
+    As colunas são a união das chaves dos registros; as ausentes vão como NULL.
+
+    Args:
+        registros: Lista de dicts coluna -> valor
+        agora: Como em montar_insercao (None = current_timestamp() do servidor)
+        literal: Função valor -> literal SQL. Se informada, os valores são
+            embutidos no texto em vez de parâmetros (o Databricks limita a
+            quantidade de parâmetros por comando)
+
+    Returns:
+        tuple: (sql, params)
+    """
+    colunas, linhas, params = _valores_lote(registros, literal)
+    if literal is not None:
+        carimbo = "current_timestamp()" if agora is None else literal(agora)
+    else:
+        carimbo = _valor_sql("last_modified", AGORA, params, agora)
+
+    valores = ", ".join(f"({', '.join(linha)}, {carimbo})" for linha in linhas)
+    query = f"INSERT INTO {TABELA_TRIAGEM} ({', '.join(colunas)}, last_modified) VALUES {valores}"
+    return query, params
+
+
+def montar_merge_lote(registros, literal=None, omitir=()):
+    """
+    Monta um MERGE por id (Databricks): insere só os pacientes que ainda não
+    existem, então reenviar o mesmo lote não duplica linhas
+
+    Args:
+        registros: Lista de dicts coluna -> valor (com 'id')
+        literal: Como em montar_insercao_lote
+        omitir: Colunas que a tabela não tem (tabela antiga, não migrada)
+
+    Returns:
+        tuple: (sql, params)
+    """
+    colunas, linhas, params = _valores_lote(registros, literal, omitir)
+    if "id" not in colunas:
+        raise ValueError("MERGE por id exige a coluna 'id' em todos os registros")
+
+    inseridas = list(colunas)
+    origem = [f"s.{c}" for c in colunas]
+    if "last_modified" not in omitir:
+        inseridas.append("last_modified")
+        origem.append("current_timestamp()")
+    valores = ", ".join(f"({', '.join(linha)})" for linha in linhas)
+    query = (
+        f"MERGE INTO {TABELA_TRIAGEM} AS t"
+        f" USING (SELECT * FROM VALUES {valores} AS s({', '.join(colunas)})) AS s"
+        " ON t.id = s.id"
+        f" WHEN NOT MATCHED THEN INSERT ({', '.join(inseridas)})"
+        f" VALUES ({', '.join(origem)})"
+    )
+    return query, params
+
+
+def montar_atualizacao(paciente_id, valores, agora=None, omitir=()):
+    """
+    Monta o UPDATE de um paciente por id; last_modified é sempre atualizado
+
+    Colunas em omitir (ausentes numa tabela antiga) ficam de fora do SET.
+    """
+    desconhecidas = set(valores) - set(TODAS_COLUNAS)
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas: {sorted(desconhecidas)}")
+    valores = {c: v for c, v in dict(valores, last_modified=AGORA).items() if c not in omitir}
+    if not valores:
+        raise ValueError("Nenhuma coluna da tabela para atualizar")
+
+    params = {"paciente_id": paciente_id}
+    atribuicoes = [f"{c} = {_valor_sql(c, v, params, agora)}" for c, v in valores.items()]
+    query = f"UPDATE {TABELA_TRIAGEM} SET {', '.join(atribuicoes)} WHERE id = %(paciente_id)s"
+    return query, params
+
+
+def _categoria(serie, conhecidas):
+    if isinstance(serie.dtype, pd.CategoricalDtype) and tuple(serie.cat.categories[:len(conhecidas)]) == conhecidas:
+        return serie
+    extras = sorted(set(serie.dropna().astype(str)) - set(conhecidas))
+    return serie.astype(pd.CategoricalDtype(list(conhecidas) + extras))
+
+
+def _inteiro(serie):
+    """int16 sem nulos e dentro da faixa; senão float32 (inteiros pequenos continuam exatos)."""
+    valores = pd.to_numeric(serie, errors="coerce")
+    validos = valores.dropna()
+    if not (validos % 1 == 0).all():
+        return valores.astype(np.float64)
+    limites = np.iinfo(np.int16)
+    if len(validos) == len(valores) and (validos.empty or limites.min <= validos.min() <= validos.max() <= limites.max):
+        return valores.astype(np.int16)
+    return valores.astype(np.float32)
+
+
+def tipar_colunas(df):
+    """
+    Converte as colunas conhecidas para tipos compactos (no próprio DataFrame)
+
+    Enumerações viram category, sinais vitais inteiros int16/float32 e datas
+    datetime64; colunas ausentes ou desconhecidas ficam como vieram. Pode ser
+    aplicada de novo sobre um DataFrame já tipado.
+    """
+    for coluna, conhecidas in CATEGORIAS.items():
+        if coluna in df.columns:
+            df[coluna] = _categoria(df[coluna], conhecidas)
+    for coluna in COLUNAS_INTEIRAS:
+        if coluna in df.columns and df[coluna].dtype not in (np.int16, np.float32):
+            df[coluna] = _inteiro(df[coluna])
+    for coluna in COLUNAS_DATA:
+        if coluna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = pd.to_datetime(df[coluna], errors="coerce")
+    return df
+
+
+def _buscar_arrow(cursor):
+    """
+    Resultado como DataFrame direto da tabela Arrow, ou None se não der
+
+    Evita o caminho do fetchall(), em que o conector converte a mesma tabela
+    Arrow em tuplas Python linha a linha. split_blocks/self_destruct deixam as
+    colunas numéricas sem nulos virarem arrays numpy sem cópia extra. Se não
+    der, o tipo do cursor passa a usar o fetchall() nas próximas consultas.
+    """
+    try:
+        tabela = cursor.fetchall_arrow()
+        # Conector sem pyarrow devolve a própria tabela colunar, não um pa.Table
+        if isinstance(tabela, pa.Table):
+            return tabela.to_pandas(split_blocks=True, self_destruct=True)
+        motivo = type(tabela).__name__
+    except ERROS_ARROW as e:
+        motivo = e.__class__.__name__
+    _ARROW_POR_CURSOR[type(cursor)] = False
+    print(f"⚠️ Leitura Arrow indisponível para {type(cursor).__name__} ({motivo}), usando fetchall()")
+    return None
+
+
+def _usa_arrow(cursor):
+    if not USAR_ARROW:
+        return False
+    tipo = type(cursor)
+    suporte = _ARROW_POR_CURSOR.get(tipo)
+    if suporte is None:
+        suporte = _ARROW_POR_CURSOR[tipo] = hasattr(cursor, "fetchall_arrow")
+    return suporte
+
+
+def executar_consulta(cursor, query, params=None):
+    """Executa a consulta e devolve um DataFrame com tipos compactos (tipar_colunas)."""
+    cursor.execute(query, params or None)
+
+    if _usa_arrow(cursor):
+        df = _buscar_arrow(cursor)
+        if df is not None:
+            return tipar_colunas(df)
+        # O resultado pode ter sido consumido pela tentativa: refaz a consulta
+        cursor.execute(query, params or None)
+
+    # PERMANENT FIX: Use the standard DB-API 2.0 method to fetch data.
+    # This is more robust and avoids the specific 'fetchall_pandas()' method
+    # which is sensitive to connection state corruption.
+    columns = [desc[0] for desc in cursor.description]
+    data = cursor.fetchall()
+    return tipar_colunas(pd.DataFrame(data, columns=columns))
+
+
+def buscar_pagina(cursor, tamanho, apos=None, ordem="data_cadastro", colunas=None, **filtros):
+    """
+    Busca uma página de resultados com paginação por keyset
+
+    Returns:
+        tuple: (DataFrame da página, cursor da próxima página ou None se acabou)
+    """
+    colunas = tuple(colunas) if colunas else TODAS_COLUNAS
+    # A chave do keyset precisa estar na projeção
+    colunas += tuple(c for c in (ordem, "id") if c not in colunas)
+    query, params = montar_consulta(colunas=colunas, ordem=ordem, apos=apos, limite=tamanho, **filtros)
+    df = executar_consulta(cursor, query, params)
+
+    proximo = None
+    if len(df) == tamanho:
+        ultima = df.iloc[-1]
+        valor = ultima[ordem]
+        if pd.isna(valor):
+            valor = SENTINELA_ORDEM
+        elif isinstance(valor, pd.Timestamp):
+            valor = valor.to_pydatetime()
+        proximo = (valor, ultima["id"])
+    return df, proximo
+
+
+def contar(cursor, **filtros):
+    """Conta as linhas que atendem aos filtros."""
+    query, params = montar_contagem(**filtros)
+    cursor.execute(query, params or None)
+    return cursor.fetchone()[0]
+
+
+def montar_consulta_delta(colunas, desde):
+    """
+    Monta o SELECT das linhas alteradas desde a marca d'água (last_modified)
+
+    Não filtra por status: uma linha que saiu da fila também precisa chegar
+    para ser removida do DataFrame em memória. O ">=" repete as linhas da
+    própria marca, o que é inofensivo porque o merge é por id.
+    """
+    colunas = tuple(colunas) + tuple(c for c in ("status", "last_modified") if c not in colunas)
+    query = (
+        f"SELECT {', '.join(colunas)} FROM {TABELA_TRIAGEM}"
+        " WHERE last_modified >= %(desde)s"
+    )
+    return query, {"desde": desde}
+
+
+def aplicar_delta(fila, delta, status="AGUARDANDO", ordem="data_cadastro"):
+    """
+    Aplica as linhas alteradas sobre a fila em memória
+
+    Linhas do delta substituem as de mesmo id; as que não estão mais no
+    status da fila são removidas.
+    """
+    if delta.empty:
+        return fila
+    restantes = fila[~fila["id"].isin(delta["id"])]
+    novas = delta[delta["status"] == status]
+    partes = [df for df in (restantes, novas[fila.columns]) if not df.empty]
+    if not partes:
+        return fila.iloc[0:0]
+    # Categorias extras diferentes entre fila e delta fazem o concat voltar a object
+    fila = tipar_colunas(pd.concat(partes, ignore_index=True))
+    return fila.sort_values([ordem, "id"], ascending=False, ignore_index=True)
+
+
+class FilaIncremental:
+    """
+    Fila de espera mantida em memória e atualizada por delta
+
+    A primeira leitura (e uma ressincronização periódica, que cobre linhas
+    apagadas fora do app) traz a fila inteira; as seguintes trazem só as
+    linhas com last_modified a partir da última marca d'água vista, menos uma
+    sobreposição: uma escrita confirmada durante a leitura pode ter
+    last_modified anterior à marca. As linhas repetidas são mescladas por id.
+    """
+
+    def __init__(self, colunas, status="AGUARDANDO", ressincronizar_s=600, sobreposicao_s=30):
+        self.colunas = tuple(colunas)
+        self.status = status
+        self.ressincronizar_s = ressincronizar_s
+        self.sobreposicao = timedelta(seconds=sobreposicao_s)
+        self.fila = None
+        self.marca = None
+        self.ultima_carga = 0.0
+        self._lock = threading.Lock()
+
+    def atualizar(self, cursor):
+        """Atualiza a fila (carga completa ou delta) e devolve uma cópia."""
+        with self._lock:
+            agora = time.monotonic()
+            if (self.fila is None or self.marca is None
+                    or agora - self.ultima_carga > self.ressincronizar_s):
+                self._carregar_tudo(cursor)
+                self.ultima_carga = agora
+            else:
+                query, params = montar_consulta_delta(self.colunas, self.marca - self.sobreposicao)
+                delta = executar_consulta(cursor, query, params)
+                self.fila = aplicar_delta(self.fila, delta, self.status)
+                self._avancar_marca(delta)
+            return self.fila.copy()
+
+    def _carregar_tudo(self, cursor):
+        # A marca é lida antes da fila: o que mudar entre as duas consultas
+        # volta no próximo delta em vez de se perder
+        cursor.execute(f"SELECT MAX(last_modified) FROM {TABELA_TRIAGEM}")
+        marca = cursor.fetchone()[0]
+        # SQLite devolve o MAX() como texto; tabela vazia devolve NULL
+        if isinstance(marca, str):
+            marca = datetime.fromisoformat(marca)
+        self.marca = marca
+        query, params = montar_consulta(colunas=self.colunas, status=self.status)
+        self.fila = executar_consulta(cursor, query, params)
+
+    def _avancar_marca(self, delta):
+        if not delta.empty:
+            maximo = delta["last_modified"].max()
+            if isinstance(maximo, pd.Timestamp):
+                maximo = maximo.to_pydatetime()
+            if self.marca is None or maximo > self.marca:
+                self.marca = maximo
@@ -0,0 +1,262 @@
+"""
+Diário local de escritas (write-ahead)
+Escritas da triagem ficam num SQLite em modo WAL e são confirmadas na hora;
+uma thread as reaplica no banco remoto em ordem, juntando as atualizações
+pendentes do mesmo paciente. Uma entrada que o banco recusa repetidamente
+vai para a fila de mortas e não trava as seguintes
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+def _codificar(valor):
+    if isinstance(valor, datetime):
+        return {"$datetime": valor.isoformat()}
+    raise TypeError(f"Valor não serializável no diário: {valor!r}")
+
+
+def _decodificar(objeto):
+    if set(objeto) == {"$datetime"}:
+        return datetime.fromisoformat(objeto["$datetime"])
+    return objeto
+
+
+class DiarioEscritas:
+    """
+    Diário append-only das escritas ainda não aplicadas no destino
+
+    Cada entrada é (seq, operação, argumentos em JSON). A entrada só sai do
+    diário depois que o destino confirmou a operação; se for descartada
+    (morta), fica guardada com o último erro para inspeção.
+    """
+
+    def __init__(self, caminho="avicena_diario.db"):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        # FULL: a confirmação ao usuário só acontece com a entrada no disco
+        self._conexao.execute("PRAGMA synchronous=FULL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS diario (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                operacao TEXT NOT NULL,
+                argumentos TEXT NOT NULL,
+                criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                tentativas INTEGER DEFAULT 0,
+                ultimo_erro TEXT,
+                morta INTEGER DEFAULT 0
+            )
+        """)
+        # Diários criados antes da fila de mortas
+        colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(diario)")}
+        if "morta" not in colunas:
+            self._conexao.execute("ALTER TABLE diario ADD COLUMN morta INTEGER DEFAULT 0")
+        self._lock = threading.Lock()
+
+    def registrar(self, operacao, *args):
+        """Grava a operação no diário e devolve seu número de sequência."""
+        argumentos = json.dumps(args, default=_codificar, ensure_ascii=False)
+        with self._lock:
+            cursor = self._conexao.execute(
+                "INSERT INTO diario (operacao, argumentos) VALUES (?, ?)", (operacao, argumentos)
+            )
+            return cursor.lastrowid
+
+    def pendentes(self, limite=100):
+        """Entradas ainda não aplicadas (sem as mortas), em ordem: [(seq, operacao, args), ...]."""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT seq, operacao, argumentos FROM diario WHERE morta = 0 ORDER BY seq LIMIT ?", (limite,)
+            ).fetchall()
+        return [(seq, operacao, tuple(json.loads(argumentos, object_hook=_decodificar)))
+                for seq, operacao, argumentos in linhas]
+
+    def mortas(self, limite=100):
+        """Entradas descartadas, em ordem: [(seq, operacao, args, tentativas, ultimo_erro), ...]."""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT seq, operacao, argumentos, tentativas, ultimo_erro FROM diario"
+                " WHERE morta = 1 ORDER BY seq LIMIT ?", (limite,)
+            ).fetchall()
+        return [(seq, operacao, tuple(json.loads(argumentos, object_hook=_decodificar)), tentativas, erro)
+                for seq, operacao, argumentos, tentativas, erro in linhas]
+
+    def contar_mortas(self):
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM diario WHERE morta = 1").fetchone()[0]
+
+    def pendente(self, seq):
+        """A entrada ainda espera ser aplicada (não foi confirmada nem descartada)?"""
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT 1 FROM diario WHERE seq = ? AND morta = 0", (seq,)
+            ).fetchone() is not None
+
+    def confirmar(self, seq):
+        """Remove a entrada aplicada no destino."""
+        with self._lock:
+            self._conexao.execute("DELETE FROM diario WHERE seq = ?", (seq,))
+
+    def registrar_falha(self, seq, erro, contar=True):
+        """
+        Guarda o erro da entrada e devolve quantas tentativas ela já teve
+
+        contar=False (banco fora do ar) registra o erro sem gastar tentativa.
+        """
+        with self._lock:
+            self._conexao.execute(
+                "UPDATE diario SET tentativas = tentativas + ?, ultimo_erro = ? WHERE seq = ?",
+                (int(contar), str(erro), seq),
+            )
+            return self._conexao.execute("SELECT tentativas FROM diario WHERE seq = ?", (seq,)).fetchone()[0]
+
+    def descartar(self, seq):
+        """Move a entrada para a fila de mortas: deixa de ser reaplicada."""
+        with self._lock:
+            self._conexao.execute("UPDATE diario SET morta = 1 WHERE seq = ?", (seq,))
+
+    def __len__(self):
+        """Entradas pendentes (as mortas não contam)."""
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM diario WHERE morta = 0").fetchone()[0]
+
+
+def coalescer(entradas, separadas=()):
+    """
+    Junta as entradas 'atualizar' pendentes do mesmo paciente numa só
+
+    Os valores são combinados coluna a coluna (o mais recente vence) e a
+    atualização combinada ocupa o lugar da última da série. Outra operação
+    sobre o mesmo paciente (o cadastro dele) encerra a série; entradas em
+    `separadas` nunca são combinadas.
+
+    Args:
+        entradas: [(seq, operacao, args), ...] em ordem, como em pendentes()
+        separadas: seqs que devem ser aplicadas sozinhas
+
+    Returns:
+        list: [(seqs, operacao, args), ...] em ordem de aplicação
+    """
+    grupos = []
+    abertos = {}  # paciente_id -> posição em grupos da série que ainda pode crescer
+    for seq, operacao, args in entradas:
+        if operacao == "atualizar" and seq not in separadas:
+            paciente_id, valores = args
+            i = abertos.pop(paciente_id, None)
+            if i is not None:
+                seqs, _, (_, anteriores) = grupos[i]
+                grupos[i] = None
+                seqs, valores = seqs + [seq], {**anteriores, **valores}
+            else:
+                seqs = [seq]
+            abertos[paciente_id] = len(grupos)
+            grupos.append((seqs, operacao, (paciente_id, valores)))
+            continue
+        if operacao == "inserir":
+            abertos.pop(str(args[0]["id"]), None)
+        elif operacao == "_inserir_lote":
+            for registro in args[0]:
+                abertos.pop(str(registro["id"]), None)
+        else:
+            abertos.clear()
+        grupos.append(([seq], operacao, args))
+    return [grupo for grupo in grupos if grupo is not None]
+
+
+class ReplicadorDiario:
+    """
+    Thread que aplica as entradas do diário no destino
+
+    As entradas são aplicadas na ordem em que foram gravadas; se uma falha,
+    a fila para nela e tenta de novo com backoff (um UPDATE não pode passar
+    na frente do INSERT do mesmo paciente). Depois de `max_tentativas`
+    recusas a entrada é descartada (fila de mortas) e as seguintes seguem;
+    erros transitórios (banco fora do ar) não gastam tentativas. As operações
+    do destino precisam ser idempotentes por id, porque uma entrada pode ser
+    reaplicada se o processo cair entre a execução e a confirmação.
+
+    Atualizações pendentes do mesmo paciente são aplicadas como uma só (ver
+    coalescer); se o destino recusar a combinação, elas voltam a ser
+    aplicadas uma a uma, para a recusa de uma não descartar as outras.
+    """
+
+    def __init__(self, diario, destino, ao_aplicar=None, espera_max_s=30.0, ocioso_s=5.0,
+                 max_tentativas=5, erros_transitorios=(), espera_inicial_s=0.5, janela_s=0.0):
+        """
+        Args:
+            diario: DiarioEscritas de origem
+            destino: Objeto com os métodos gravados no diário
+            ao_aplicar: Chamado após cada rodada com entradas aplicadas
+            espera_max_s: Teto do backoff entre tentativas
+            ocioso_s: Intervalo de verificação quando não há aviso de escrita
+            max_tentativas: Recusas até a entrada ir para a fila de mortas
+            erros_transitorios: Exceções que não contam como tentativa
+            espera_inicial_s: Primeira espera do backoff
+            janela_s: Espera após um aviso de escrita, para juntar as seguintes
+        """
+        self.diario = diario
+        self.destino = destino
+        self.ao_aplicar = ao_aplicar
+        self.espera_max_s = espera_max_s
+        self.ocioso_s = ocioso_s
+        self.max_tentativas = max_tentativas
+        self.erros_transitorios = tuple(erros_transitorios)
+        self.espera_inicial_s = espera_inicial_s
+        self.janela_s = janela_s
+        self._separadas = set()  # seqs cuja combinação o destino recusou
+        self._acordar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="diario-triagem", daemon=True)
+        self._thread.start()
+
+    def acordar(self):
+        """Avisa que há entrada nova (sem esperar o intervalo ocioso)."""
+        self._acordar.set()
+
+    def _executar(self):
+        espera = self.espera_inicial_s
+        while True:
+            if self._acordar.wait(self.ocioso_s) and self.janela_s:
+                time.sleep(self.janela_s)
+            self._acordar.clear()
+            while True:
+                entradas = self.diario.pendentes()
+                if not entradas:
+                    break
+                aplicadas = 0
+                falhou = False
+                for seqs, operacao, args in coalescer(entradas, self._separadas):
+                    try:
+                        getattr(self.destino, operacao)(*args)
+                    except Exception as e:
+                        transitorio = isinstance(e, self.erros_transitorios)
+                        if len(seqs) > 1 and not transitorio:
+                            # Reaplicadas uma a uma na próxima volta, sem gastar tentativa
+                            self._separadas.update(seqs)
+                            break
+                        tentativas = max(self.diario.registrar_falha(seq, e, contar=not transitorio) for seq in seqs)
+                        if not transitorio and tentativas >= self.max_tentativas:
+                            self.diario.descartar(seqs[0])
+                            self._separadas.discard(seqs[0])
+                            print(f"❌ '{operacao}' do diário (seq {seqs[0]}) descartado após {tentativas} tentativas: {e}")
+                            continue
+                        print(f"⚠️ Falha ao aplicar '{operacao}' do diário ({e}); nova tentativa em {espera:.1f}s")
+                        falhou = True
+                        break
+                    for seq in seqs:
+                        self.diario.confirmar(seq)
+                        self._separadas.discard(seq)
+                    aplicadas += len(seqs)
+                if aplicadas and self.ao_aplicar is not None:
+                    try:
+                        self.ao_aplicar()
+                    except Exception as e:
+                        print(f"⚠️ Erro no retorno do diário: {e}")
+                if falhou:
+                    time.sleep(espera)
+                    espera = min(espera * 2, self.espera_max_s)
+                else:
+                    espera = self.espera_inicial_s
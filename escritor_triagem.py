@@ -0,0 +1,71 @@
+"""
+Escritor assíncrono da triagem
+Alterações de pacientes gravadas no diário local e aplicadas por uma thread,
+com as alterações seguidas do mesmo paciente combinadas num único UPDATE
+"""
+
+import time
+from datetime import datetime
+
+from diario_escritas import ReplicadorDiario
+from repositorio_triagem import _resolver_valores
+
+
+class EscritorTriagem:
+    """
+    Aplica atualizações de pacientes em segundo plano
+
+    atualizar() grava a alteração no diário e retorna; o replicador espera
+    `janela_s` para juntar as que chegam em seguida e as aplica no
+    repositório, combinando as do mesmo paciente (o valor mais recente de
+    cada coluna vence), então várias reclassificações seguidas viram um único
+    UPDATE. O diário sobrevive a reinícios: uma alteração aceita é aplicada
+    mesmo que o processo caia antes.
+    """
+
+    def __init__(self, repositorio, diario, ao_aplicar=None, janela_s=0.2, max_tentativas=5):
+        """
+        Args:
+            repositorio: RepositorioTriagem de destino
+            diario: DiarioEscritas onde as alterações esperam
+            ao_aplicar: Chamado após cada rodada aplicada (ex.: invalidar caches)
+            janela_s: Espera após uma alteração para juntar as seguintes
+            max_tentativas: Recusas até a alteração ir para a fila de mortas
+        """
+        self.repositorio = repositorio
+        self.diario = diario
+        self.replicador = ReplicadorDiario(
+            diario, repositorio, ao_aplicar=ao_aplicar, janela_s=janela_s,
+            max_tentativas=max_tentativas, erros_transitorios=repositorio.erros_transitorios,
+        )
+        self.replicador.acordar()  # alterações que sobraram da execução anterior
+
+    def atualizar(self, paciente_id, valores):
+        """Grava a alteração no diário e devolve o número da entrada (ver pendente)."""
+        # AGORA vira o horário do clique, não o da aplicação
+        seq = self.diario.registrar("atualizar", str(paciente_id), _resolver_valores(valores, datetime.now()))
+        self.replicador.acordar()
+        return seq
+
+    def pendente(self, seq):
+        """A alteração ainda não foi aplicada no repositório (nem descartada)?"""
+        return self.diario.pendente(seq)
+
+    @property
+    def pendentes(self):
+        """Alterações ainda não aplicadas."""
+        return len(self.diario)
+
+    @property
+    def mortas(self):
+        """Alterações descartadas depois de max_tentativas recusas."""
+        return self.diario.contar_mortas()
+
+    def aguardar(self, timeout_s=10.0):
+        """Espera o diário esvaziar; devolve False se o tempo acabar."""
+        limite = time.monotonic() + timeout_s
+        while self.pendentes:
+            if time.monotonic() > limite:
+                return False
+            time.sleep(0.01)
+        return True
@@ -0,0 +1,169 @@
+"""
+Índice ordenado da fila de espera
+Mantém os pacientes aguardando em ordem de (prioridade, chegada) a cada
+escrita, para a fila ser lida já ordenada sem reordenar tudo a cada rerun
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ORDEM_PRIORIDADE = {
+    'PRIORIDADE MÁXIMA': 1,
+    'ALTA PRIORIDADE': 2,
+    'MÉDIA PRIORIDADE': 3,
+    'BAIXA PRIORIDADE': 4,
+    'MÍNIMA (ELETIVA)': 5,
+}
+# Classificação desconhecida/ausente vai para o fim da fila
+ORDEM_SEM_PRIORIDADE = 6
+
+
+def _chave(paciente_id, urgencia, data_cadastro):
+    """
+    (posto, chegada, id): mais urgente primeiro; na mesma prioridade, quem chegou antes
+
+    A chegada é sempre um datetime ingênuo (com fuso: convertido para UTC),
+    para chaves de leituras e de escritas locais serem comparáveis no bisect.
+    """
+    posto = ORDEM_PRIORIDADE.get(urgencia, ORDEM_SEM_PRIORIDADE)
+    if not isinstance(data_cadastro, datetime) or pd.isna(data_cadastro):
+        data_cadastro = datetime.max
+    else:
+        if isinstance(data_cadastro, pd.Timestamp):
+            data_cadastro = data_cadastro.to_pydatetime()
+        if data_cadastro.tzinfo is not None:
+            data_cadastro = data_cadastro.astimezone(timezone.utc).replace(tzinfo=None)
+    return (posto, data_cadastro, str(paciente_id))
+
+
+class IndiceFila:
+    """
+    Fila ordenada compartilhada pelo processo
+
+    As chaves ficam numa lista ordenada (bisect): ler os k primeiros é uma
+    fatia O(k); inserir, reclassificar ou remover custa uma busca binária e
+    um deslocamento da lista. Alterações feitas por este processo têm
+    prioridade sobre leituras do banco mais antigas que elas, até a leitura
+    confirmá-las (ou o prazo expirar).
+    """
+
+    def __init__(self, prazo_local_s=60.0):
+        self.prazo_local_s = prazo_local_s
+        self._chaves = []     # ordenada
+        self._por_id = {}     # id -> chave
+        self._locais = {}     # id -> (chave esperada ou None se removido, instante)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Escritas
+    # ------------------------------------------------------------------
+
+    def inserir(self, paciente_id, urgencia, data_cadastro):
+        chave = _chave(paciente_id, urgencia, data_cadastro)
+        with self._lock:
+            self._colocar(chave)
+            self._locais[chave[2]] = (chave, time.monotonic())
+
+    def reclassificar(self, paciente_id, urgencia):
+        paciente_id = str(paciente_id)
+        with self._lock:
+            atual = self._por_id.get(paciente_id)
+            if atual is None:
+                return
+            chave = (ORDEM_PRIORIDADE.get(urgencia, ORDEM_SEM_PRIORIDADE), atual[1], paciente_id)
+            self._colocar(chave)
+            self._locais[paciente_id] = (chave, time.monotonic())
+
+    def remover(self, paciente_id):
+        paciente_id = str(paciente_id)
+        with self._lock:
+            self._tirar(paciente_id)
+            self._locais[paciente_id] = (None, time.monotonic())
+
+    def sincronizar(self, df):
+        """
+        Reconcilia o índice com a fila lida do banco (colunas id, urgencia_manual,
+        data_cadastro). Só as linhas que mudaram são reposicionadas.
+        """
+        lidas = {
+            str(pid): _chave(pid, urgencia, cadastro)
+            for pid, urgencia, cadastro in zip(df['id'], df['urgencia_manual'], df['data_cadastro'])
+        }
+        agora = time.monotonic()
+        with self._lock:
+            for paciente_id, (esperada, instante) in list(self._locais.items()):
+                if lidas.get(paciente_id) == esperada or agora - instante > self.prazo_local_s:
+                    del self._locais[paciente_id]
+
+            for paciente_id in [p for p in self._por_id if p not in lidas and p not in self._locais]:
+                self._tirar(paciente_id)
+            for paciente_id, chave in lidas.items():
+                if paciente_id not in self._locais and self._por_id.get(paciente_id) != chave:
+                    self._colocar(chave)
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def primeiros(self, k=None):
+        """Ids dos k primeiros da fila (todos se k for None), em ordem de atendimento."""
+        with self._lock:
+            fatia = self._chaves if k is None else self._chaves[:k]
+            return [chave[2] for chave in fatia]
+
+    def fatia(self, ids, inicio, fim):
+        """
+        Posições em `ids` das linhas inicio..fim (exclusivo) da fila
+
+        Lê só os primeiros do índice (O(fim), e não a fila inteira). Ids do
+        índice ausentes em `ids` são pulados; linhas de `ids` que o índice
+        ainda não conhece vêm depois de todas as outras.
+
+        Args:
+            ids: pd.Index (sem repetições) com os ids das linhas lidas
+            inicio, fim: Faixa de posições na ordem de atendimento
+
+        Returns:
+            np.ndarray: Posições para ids/DataFrame.iloc
+        """
+        k = max(fim, 1)
+        while True:
+            ordem = self.primeiros(k)
+            posicoes = ids.get_indexer(ordem)
+            posicoes = posicoes[posicoes >= 0]
+            if len(posicoes) >= fim or len(ordem) < k:
+                break
+            k *= 2
+        if len(posicoes) < fim:
+            # O índice acabou antes: completa com as linhas que ele não tem
+            desconhecidas = np.setdiff1d(np.arange(len(ids)), posicoes, assume_unique=True)
+            posicoes = np.concatenate([posicoes, desconhecidas])
+        return posicoes[inicio:fim]
+
+    def posicao(self, paciente_id):
+        """Posição (0 = próximo) do paciente na fila, ou None."""
+        with self._lock:
+            chave = self._por_id.get(str(paciente_id))
+            return None if chave is None else bisect_left(self._chaves, chave)
+
+    def __len__(self):
+        return len(self._chaves)
+
+    # ------------------------------------------------------------------
+    # Internos (chamados com o lock)
+    # ------------------------------------------------------------------
+
+    def _colocar(self, chave):
+        self._tirar(chave[2])
+        insort(self._chaves, chave)
+        self._por_id[chave[2]] = chave
+
+    def _tirar(self, paciente_id):
+        chave = self._por_id.pop(paciente_id, None)
+        if chave is not None:
+            del self._chaves[bisect_left(self._chaves, chave)]
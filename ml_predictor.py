@@ -7,6 +7,44 @@ import joblib
 import numpy as np
 import pandas as pd
 import os
+import time
+import streamlit as st
+
+class CompiledForest:
+    """
+    Random Forest achatado em arrays NumPy contíguos (ver
+    train_model.export_compiled_forest). Expõe a mesma interface usada pelo
+    preditor (classes_, predict_proba, feature_importances_) sem importar
+    sklearn. A normalização do StandardScaler faz parte do artefato, então
+    predict_proba recebe as features SEM normalização.
+    """
+    
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.mean = arrays['mean']
+        self.scale = arrays['scale']
+        self.depth = int(arrays['depth'])
+        self.classes_ = arrays['classes']
+        self.feature_importances_ = arrays['importances']
+        self.features = [str(f) for f in arrays['features']]
+    
+    def predict_proba(self, X):
+        """Percorre todas as árvores ao mesmo tempo: um passo de profundidade por iteração."""
+        # Mesma conta do StandardScaler + cast para float32 feito pelas árvores do sklearn
+        X = ((np.asarray(X, dtype=np.float64) - self.mean) / self.scale).astype(np.float32)
+        linhas = np.arange(len(X))[:, None]
+        # Nó atual de cada (paciente, árvore); folhas apontam para si mesmas
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.depth):
+            go_left = X[linhas, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
 
 class PCACRPredictor:
     """Classe para predições de classificação PCACR usando ML"""
@@ -15,23 +53,39 @@ class PCACRPredictor:
         self.model = None
         self.scaler = None
         self.features = None
+        self.metrics = None
         self.model_loaded = False
         
     def load_model(self):
-        """Carrega modelo treinado"""
+        """Carrega modelo treinado (uma vez por processo, ver load_model_artifacts)"""
         try:
-            if not os.path.exists('models/pcacr_model.pkl'):
-                print("⚠️ Modelo não encontrado. Execute train_model.py primeiro.")
-                return False
-            
-            self.model = joblib.load('models/pcacr_model.pkl')
-            self.scaler = joblib.load('models/pcacr_scaler.pkl')
-            self.features = joblib.load('models/pcacr_features.pkl')
-            self.model_loaded = True
-            return True
+            artefatos = load_model_artifacts()
+        except FileNotFoundError:
+            print("⚠️ Modelo não encontrado. Execute train_model.py primeiro.")
+            return False
         except Exception as e:
             print(f"❌ Erro ao carregar modelo: {str(e)}")
             return False
+        
+        self.model = artefatos['model']
+        self.scaler = artefatos['scaler']
+        self.features = artefatos['features']
+        self.metrics = artefatos['metrics']
+        self.model_loaded = True
+        return True
+    
+    def get_model_metrics(self):
+        """
+        Retorna métricas de carregamento do modelo
+        
+        Returns:
+            dict: {'load_time_s', 'warmup_time_s', 'model_size_mb', 'artifact'}
+            ou None se o modelo não estiver carregado
+        """
+        if not self.model_loaded:
+            if not self.load_model():
+                return None
+        return self.metrics
     
     def predict_pcacr(self, patient_data):
         """
@@ -47,59 +101,86 @@ class PCACRPredictor:
                 'confidence': float (confiança da predição)
             }
         """
-        if not self.model_loaded:
-            if not self.load_model():
-                return None
+        resultados = self.predict_many([patient_data])
+        return resultados[0] if resultados else None
+    
+    def _build_feature_matrix(self, pacientes):
+        """
+        Monta a matriz de features (n × len(self.features)) para vários pacientes.
+        Campos ausentes recebem os mesmos valores padrão de predict_pcacr.
+        """
+        n = len(pacientes)
         
-        # Mapear dados do paciente para features do modelo
-        # APENAS SINAIS VITAIS coletados no formulário!
-        feature_vector = []
+        def coluna(nome, padrao):
+            if nome not in pacientes.columns:
+                return np.full(n, padrao, dtype=float)
+            return pd.to_numeric(pacientes[nome], errors='coerce').fillna(padrao).to_numpy(dtype=float)
         
         # Converter gênero para binário (0=Feminino, 1=Masculino)
-        genero_str = patient_data.get('genero', 'Masculino')
-        genero_bin = 1 if genero_str == 'Masculino' else 0
+        if 'genero' in pacientes.columns:
+            genero_bin = (pacientes['genero'].fillna('Masculino') == 'Masculino').to_numpy(dtype=float)
+        else:
+            genero_bin = np.ones(n)
         
-        sbp = patient_data.get('pa_sistolica', 120)
-        dbp = patient_data.get('pa_diastolica', 80)
+        sbp = coluna('pa_sistolica', 120)
+        dbp = coluna('pa_diastolica', 80)
         
+        # APENAS SINAIS VITAIS coletados no formulário!
         patient_features = {
-            'HR': patient_data.get('freq_cardiaca', 75),
-            'O2Sat': patient_data.get('spo2', 98),
-            'Temp': patient_data.get('temperatura', 36.5),
+            'HR': coluna('freq_cardiaca', 75),
+            'O2Sat': coluna('spo2', 98),
+            'Temp': coluna('temperatura', 36.5),
             'SBP': sbp,
             'DBP': dbp,
             'MAP': (sbp + 2 * dbp) / 3,
-            'Resp': patient_data.get('freq_respiratoria', 16),
-            'Age': patient_data.get('idade', 50),
+            'Resp': coluna('freq_respiratoria', 16),
+            'Age': coluna('idade', 50),
             'Gender': genero_bin
         }
         
-        # Construir vetor de features na ordem correta
-        for feature in self.features:
-            feature_vector.append(patient_features.get(feature, 0))
+        # Construir matriz de features na ordem correta
+        return np.column_stack([patient_features.get(feature, np.zeros(n)) for feature in self.features])
+    
+    def predict_many(self, pacientes):
+        """
+        Prediz classificação PCACR para vários pacientes de uma vez
         
-        # Converter para array numpy
-        X = np.array(feature_vector).reshape(1, -1)
+        Faz uma única chamada a scaler.transform e predict_proba para o lote;
+        a classe prevista é o argmax das probabilidades (mesmo critério de
+        model.predict).
         
-        # Normalizar
-        X_scaled = self.scaler.transform(X)
+        Args:
+            pacientes (list[dict] | pd.DataFrame): Dados dos pacientes, com as
+                mesmas chaves de predict_pcacr (uma coluna por chave)
+            
+        Returns:
+            list[dict]: Um resultado por paciente, no formato de predict_pcacr
+        """
+        if not self.model_loaded:
+            if not self.load_model():
+                return None
         
-        # Fazer predição
-        prediction = self.model.predict(X_scaled)[0]
-        probabilities = self.model.predict_proba(X_scaled)[0]
+        if not isinstance(pacientes, pd.DataFrame):
+            pacientes = pd.DataFrame(list(pacientes))
+        if pacientes.empty:
+            return []
         
-        # Mapear probabilidades para classes
-        classes = self.model.classes_
-        prob_dict = {classe: float(prob) for classe, prob in zip(classes, probabilities)}
+        X = self._build_feature_matrix(pacientes)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        probabilities = self.model.predict_proba(X)
         
-        # Calcular confiança (máxima probabilidade)
-        confidence = float(max(probabilities))
+        classes = self.model.classes_
+        best = probabilities.argmax(axis=1)
         
-        return {
-            'prediction': prediction,
-            'probabilities': prob_dict,
-            'confidence': confidence
-        }
+        return [
+            {
+                'prediction': classes[idx],
+                'probabilities': {classe: float(prob) for classe, prob in zip(classes, probs)},
+                'confidence': float(probs[idx])
+            }
+            for idx, probs in zip(best, probabilities)
+        ]
     
     def get_feature_importance(self):
         """
@@ -222,5 +303,54 @@ class PCACRPredictor:
         
         return "\n".join(interpretacao)
 
+@st.cache_resource(show_spinner="Carregando modelo de ML...")
+def load_model_artifacts():
+    """
+    Carrega os artefatos do modelo uma única vez por processo.
+    
+    O resultado é compartilhado por todas as sessões do Streamlit. Os arrays
+    são abertos com mmap_mode='r', então vários processos do app dividem a
+    mesma cópia física do modelo (via cache de páginas do sistema). Uma
+    predição de aquecimento roda antes de liberar o modelo.
+    
+    Raises:
+        FileNotFoundError: se nenhum modelo treinado existir (não é cacheado,
+            então o próximo acesso tenta de novo após o treinamento)
+    """
+    inicio = time.perf_counter()
+    
+    # Preferir a floresta compilada: carrega só arrays, sem sklearn
+    if os.path.exists('models/pcacr_forest.pkl'):
+        arquivos = ['models/pcacr_forest.pkl']
+        model = CompiledForest(joblib.load(arquivos[0], mmap_mode='r'))
+        scaler = None  # normalização embutida na floresta
+        features = model.features
+    elif os.path.exists('models/pcacr_model.pkl'):
+        arquivos = ['models/pcacr_model.pkl', 'models/pcacr_scaler.pkl', 'models/pcacr_features.pkl']
+        model, scaler, features = (joblib.load(arquivo, mmap_mode='r') for arquivo in arquivos)
+    else:
+        raise FileNotFoundError('models/pcacr_model.pkl')
+    
+    load_time = time.perf_counter() - inicio
+    
+    # Aquecimento: primeira predição com valores padrão
+    inicio = time.perf_counter()
+    aquecimento = PCACRPredictor()
+    aquecimento.model, aquecimento.scaler, aquecimento.features = model, scaler, features
+    aquecimento.model_loaded = True
+    aquecimento.predict_pcacr({})
+    warmup_time = time.perf_counter() - inicio
+    
+    metrics = {
+        'load_time_s': load_time,
+        'warmup_time_s': warmup_time,
+        'model_size_mb': sum(os.path.getsize(arquivo) for arquivo in arquivos) / 1024 / 1024,
+        'artifact': arquivos[0]
+    }
+    print(f"🤖 Modelo carregado em {load_time*1000:.0f} ms "
+          f"({metrics['model_size_mb']:.1f} MB, aquecimento {warmup_time*1000:.0f} ms)")
+    
+    return {'model': model, 'scaler': scaler, 'features': features, 'metrics': metrics}
+
 # Instância global do preditor
 predictor = PCACRPredictor()
@@ -0,0 +1,748 @@
+"""
+Repositório da tabela de triagem
+Interface única de leitura/escrita com implementações Databricks, SQLite local
+e uma combinação das duas com sincronização em segundo plano (write-behind)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import pandas as pd
+from databricks.sql.utils import ParamEscaper
+
+from diario_escritas import ReplicadorDiario
+from consultas_triagem import (
+    AGORA, COLUNAS_FILA, TABELA_TRIAGEM, TODAS_COLUNAS,
+    FilaIncremental, buscar_pagina, contar, executar_consulta,
+    montar_atualizacao, montar_consulta, montar_insercao, montar_insercao_lote,
+    montar_merge_lote, valor_python, _completar_pa,
+)
+
+# Datas gravadas como texto ISO no SQLite e lidas de volta como datetime
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+
+
+class ErroImportacaoLote(RuntimeError):
+    """Um ou mais lotes de inserir_lote falharam; resultado traz as faixas de linhas."""
+
+    def __init__(self, resultado):
+        self.resultado = resultado
+        faixas = ", ".join(f"{f['inicio']}-{f['fim'] - 1}" for f in resultado["falhas"])
+        super().__init__(
+            f"{len(resultado['falhas'])} lote(s) não importado(s) (linhas {faixas}); "
+            f"{resultado['inseridos']} linha(s) inserida(s)"
+        )
+
+
+class RepositorioTriagem(ABC):
+    """
+    Operações sobre a tabela de triagem usadas pelo app
+
+    Os métodos abstratos são o mínimo de um backend; uma implementação
+    incompleta falha ao ser instanciada, não no meio de uma requisição.
+    """
+
+    # Linhas por INSERT na importação em lote
+    TAMANHO_LOTE = 500
+    # Falhas de disponibilidade (e não da escrita em si): o diário repete sem
+    # contar tentativa, em vez de descartar a escrita enquanto o banco está fora
+    erros_transitorios = ()
+
+    @abstractmethod
+    def preparar(self):
+        """Cria a tabela (e migra colunas) se necessário."""
+
+    @abstractmethod
+    def listar(self, colunas=None, **filtros):
+        """Linhas que atendem aos filtros de montar_consulta, como DataFrame."""
+
+    @abstractmethod
+    def pagina(self, tamanho, apos=None, **filtros):
+        """Uma página por keyset (ver buscar_pagina): (DataFrame, próximo cursor)."""
+
+    @abstractmethod
+    def contar(self, **filtros):
+        """Quantidade de linhas que atendem aos filtros."""
+
+    def fila(self):
+        """Pacientes aguardando atendimento (colunas COLUNAS_FILA)."""
+        return self.listar(colunas=COLUNAS_FILA, status="AGUARDANDO")
+
+    @abstractmethod
+    def agregar(self, funcao, *args, **kwargs):
+        """Executa funcao(cursor, ...) de agregacoes_triagem e devolve só o resumo."""
+
+    @abstractmethod
+    def inserir(self, registro):
+        """Cadastra um paciente (dict coluna -> valor, com 'id')."""
+
+    def inserir_lote(self, registros, tamanho_lote=None, tolerar_falhas=False):
+        """
+        Importa muitos pacientes com INSERTs de várias linhas
+
+        Um lote que falha não interrompe os seguintes. Ao final, se algum
+        falhou, levanta ErroImportacaoLote com as faixas de linhas não
+        importadas (a menos que tolerar_falhas=True). Linhas com id já
+        existente são ignoradas, então reimportar as mesmas linhas é seguro.
+
+        Args:
+            registros: Lista de dicts (como em inserir) ou DataFrame
+            tamanho_lote: Linhas por INSERT (padrão: TAMANHO_LOTE)
+            tolerar_falhas: Devolve as falhas no resultado em vez de levantar
+
+        Returns:
+            dict: inseridos (linhas de lotes confirmados, incluindo ids já existentes),
+            falhas (lista de {inicio, fim, erro}; fim exclusivo) e tempo_s
+
+        Raises:
+            ErroImportacaoLote: Algum lote falhou e tolerar_falhas é False
+        """
+        if isinstance(registros, pd.DataFrame):
+            registros = registros.to_dict("records")
+        tamanho_lote = tamanho_lote or self.TAMANHO_LOTE
+
+        inicio_importacao = time.perf_counter()
+        inseridos = 0
+        falhas = []
+        for inicio in range(0, len(registros), tamanho_lote):
+            lote = registros[inicio:inicio + tamanho_lote]
+            try:
+                self._inserir_lote(lote)
+                inseridos += len(lote)
+            except Exception as e:
+                falhas.append({"inicio": inicio, "fim": inicio + len(lote), "erro": str(e)})
+                print(f"⚠️ Falha no lote de linhas {inicio}-{inicio + len(lote) - 1}: {e}")
+
+        resultado = {
+            "inseridos": inseridos,
+            "falhas": falhas,
+            "tempo_s": time.perf_counter() - inicio_importacao,
+        }
+        if falhas and not tolerar_falhas:
+            raise ErroImportacaoLote(resultado)
+        return resultado
+
+    @abstractmethod
+    def _inserir_lote(self, lote):
+        """Insere um lote de inserir_lote num único comando."""
+
+    @abstractmethod
+    def atualizar(self, paciente_id, valores):
+        """
+        Atualiza colunas de um paciente; valores podem usar o marcador AGORA
+
+        Devolve None quando a escrita já aparece nas leituras, ou o número
+        da entrada no diário enquanto ela ainda não chegou lá (ver pendente).
+        """
+
+    def pendente(self, seq):
+        """A escrita devolvida por atualizar ainda não aparece nas leituras?"""
+        return False
+
+    def atualizar_urgencia(self, paciente_id, urgencia):
+        return self.atualizar(paciente_id, {"urgencia_manual": urgencia})
+
+    def marcar_atendido(self, paciente_id):
+        return self.atualizar(paciente_id, {"status": "ATENDIDO", "data_atendimento": AGORA})
+
+    def retornar_fila(self, paciente_id):
+        return self.atualizar(paciente_id, {"status": "AGUARDANDO", "data_atendimento": None})
+
+
+# ======================================================================
+# Databricks
+# ======================================================================
+
+class RepositorioDatabricks(RepositorioTriagem):
+    """Tabela no Databricks SQL Warehouse, acessada por um PoolConexoes"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._fila = FilaIncremental(COLUNAS_FILA)
+        # Colunas de TODAS_COLUNAS que a tabela não tem (preparar falhou numa tabela antiga)
+        self.ausentes = ()
+
+    @property
+    def erros_transitorios(self):
+        # Conexão perdida ou pool sem conexão livre
+        return tuple(self.pool.erros_conexao) + (TimeoutError,)
+
+    def _executar(self, funcao, *args, **kwargs):
+        if not self.ausentes:
+            return self.pool.executar(funcao, *args, **kwargs)
+        return self.pool.executar(
+            lambda cursor: funcao(_CursorLegado(cursor, self.ausentes), *args, **kwargs))
+
+    def preparar(self):
+        """
+        Cria/migra a tabela. Se falhar (ex.: sem permissão de DDL), descobre
+        quais colunas a tabela existente tem: as ausentes passam a ser
+        derivadas nas leituras (ou NULL) e omitidas nas escritas. O erro
+        original é propagado depois disso.
+        """
+        try:
+            self.pool.executar(_criar_tabela_databricks)
+        except Exception:
+            existentes = self.pool.executar(_colunas_databricks)
+            self.ausentes = tuple(c for c in TODAS_COLUNAS if c.lower() not in existentes)
+            if self.ausentes:
+                print(f"⚠️ Tabela de triagem sem as colunas {', '.join(self.ausentes)}: usando o esquema antigo")
+            raise
+        self.ausentes = ()
+
+    def listar(self, colunas=None, **filtros):
+        query, params = montar_consulta(colunas=colunas, **filtros)
+        return self._executar(executar_consulta, query, params)
+
+    def pagina(self, tamanho, apos=None, **filtros):
+        return self._executar(buscar_pagina, tamanho, apos=apos, **filtros)
+
+    def contar(self, **filtros):
+        return self._executar(contar, **filtros)
+
+    def agregar(self, funcao, *args, **kwargs):
+        return self._executar(funcao, *args, **kwargs)
+
+    def fila(self):
+        if "last_modified" in self.ausentes:
+            # Sem a marca d'água não há delta: a fila vem inteira a cada leitura
+            return self.listar(colunas=COLUNAS_FILA, status="AGUARDANDO")
+        # Só as linhas alteradas desde a última leitura vêm do warehouse
+        return self._executar(self._fila.atualizar)
+
+    def inserir(self, registro):
+        # MERGE por id: reenviar o mesmo cadastro (reconexão, diário) não duplica
+        query, params = montar_merge_lote([registro], omitir=self.ausentes)
+        self._executar(lambda cursor: cursor.execute(query, params))
+
+    def _inserir_lote(self, lote):
+        # Valores embutidos com o mesmo escape do modo inline do conector:
+        # parâmetros nomeados têm limite por comando e dariam lotes de ~12 linhas
+        query, _ = montar_merge_lote(lote, literal=_ESCAPER.escape_item, omitir=self.ausentes)
+        self._executar(lambda cursor: cursor.execute(query))
+
+    def atualizar(self, paciente_id, valores):
+        query, params = montar_atualizacao(str(paciente_id), valores, omitir=self.ausentes)
+        self._executar(lambda cursor: cursor.execute(query, params))
+
+
+_ESCAPER = ParamEscaper()
+
+
+def _criar_tabela_databricks(cursor):
+    """Creates the schema and table in Databricks and ensures all columns exist."""
+    # TODO: Update with your schema name if different from 'avicena_care'
+    cursor.execute("CREATE SCHEMA IF NOT EXISTS avicena_care")
+    cursor.execute("""
+        -- TODO: Update with your table name if different from 'triagem'
+        CREATE TABLE IF NOT EXISTS avicena_care.triagem (
+            id STRING,
+            Nome STRING,
+            Idade INT,
+            PA STRING,
+            PA_Sistolica INT,
+            PA_Diastolica INT,
+            FC INT,
+            FR INT,
+            Temp DOUBLE,
+            SpO2 INT,
+            nivel_consciencia STRING,
+            genero STRING,
+            intensidade_dor INT,
+            Comorbidade STRING,
+            Alergia STRING,
+            Queixa_Principal STRING,
+            urgencia_automatica STRING,
+            urgencia_manual STRING,
+            status STRING,
+            data_cadastro TIMESTAMP,
+            data_atendimento TIMESTAMP,
+            medicacoes STRING,
+            last_modified TIMESTAMP
+        )
+    """)
+
+    # Garantir que a coluna 'medicacoes' exista (para compatibilidade com versões antigas)
+    try:
+        cursor.execute("ALTER TABLE avicena_care.triagem ADD COLUMN medicacoes STRING")
+        print("✅ Coluna 'medicacoes' adicionada à tabela 'triagem'.")
+    except Exception as e:
+        # Se a coluna já existir, o Databricks lançará um erro. Podemos ignorá-lo.
+        if "COLUMN_ALREADY_EXISTS" in str(e):
+            pass # A coluna já existe, o que é o esperado.
+
+    # 'last_modified' é a marca d'água da atualização incremental da fila
+    try:
+        cursor.execute("ALTER TABLE avicena_care.triagem ADD COLUMN last_modified TIMESTAMP")
+        print("✅ Coluna 'last_modified' adicionada à tabela 'triagem'.")
+        adicionada = True
+    except Exception as e:
+        adicionada = False
+        if "COLUMN_ALREADY_EXISTS" in str(e):
+            pass
+    if adicionada:
+        # Linhas antigas: usa a última data conhecida como data de alteração.
+        # Só na migração; depois toda escrita do app grava last_modified
+        cursor.execute("""
+            UPDATE avicena_care.triagem
+            SET last_modified = coalesce(data_atendimento, data_cadastro, current_timestamp())
+            WHERE last_modified IS NULL
+        """)
+
+    # PA numérica (PA_Sistolica/PA_Diastolica) ao lado da string 'sis/dia'
+    for coluna in ("PA_Sistolica", "PA_Diastolica"):
+        try:
+            cursor.execute(f"ALTER TABLE avicena_care.triagem ADD COLUMN {coluna} INT")
+            print(f"✅ Coluna '{coluna}' adicionada à tabela 'triagem'.")
+        except Exception as e:
+            if "COLUMN_ALREADY_EXISTS" in str(e):
+                pass
+    _preencher_pa_databricks(cursor)
+
+
+# PA no formato 'sis/dia' (só dígitos, espaços em volta permitidos)
+_PA_VALIDA = "PA RLIKE '^ *[0-9]+ */ *[0-9]+ *$'"
+
+
+def _preencher_pa_databricks(cursor):
+    """
+    Backfill: extrai PA_Sistolica/PA_Diastolica da string PA nas linhas que ainda não têm
+
+    Só toca linhas com PA bem formada e as duas colunas nulas: as demais não
+    são selecionadas de novo (nem têm last_modified alterado) a cada início.
+    """
+    cursor.execute(f"""
+        UPDATE avicena_care.triagem
+        SET PA_Sistolica = CAST(trim(split_part(PA, '/', 1)) AS INT),
+            PA_Diastolica = CAST(trim(split_part(PA, '/', 2)) AS INT),
+            last_modified = current_timestamp()
+        WHERE PA_Sistolica IS NULL AND PA_Diastolica IS NULL AND {_PA_VALIDA}
+    """)
+
+
+def _colunas_databricks(cursor):
+    """Nomes (minúsculos) das colunas que a tabela de triagem tem hoje."""
+    cursor.execute(f"SELECT * FROM {TABELA_TRIAGEM} LIMIT 0")
+    return {descricao[0].lower() for descricao in cursor.description}
+
+
+# Como as leituras enxergam cada coluna ausente numa tabela antiga (demais: NULL)
+_DERIVADAS = {
+    "PA_Sistolica": f"CASE WHEN {_PA_VALIDA} THEN CAST(trim(split_part(PA, '/', 1)) AS INT) END",
+    "PA_Diastolica": f"CASE WHEN {_PA_VALIDA} THEN CAST(trim(split_part(PA, '/', 2)) AS INT) END",
+    "last_modified": "coalesce(data_atendimento, data_cadastro)",
+}
+
+
+class _CursorLegado:
+    """
+    Cursor para uma tabela sem as colunas novas: os SELECTs leem de uma
+    subconsulta que acrescenta as colunas ausentes (derivadas ou NULL)
+    """
+
+    def __init__(self, cursor, ausentes):
+        self._cursor = cursor
+        derivadas = ", ".join(f"{_DERIVADAS.get(c, 'NULL')} AS {c}" for c in ausentes)
+        self._origem = f"FROM (SELECT *, {derivadas} FROM {TABELA_TRIAGEM}) AS triagem"
+
+    def execute(self, query, params=None):
+        self._cursor.execute(query.replace(f"FROM {TABELA_TRIAGEM}", self._origem), params)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+# ======================================================================
+# SQLite local
+# ======================================================================
+
+class _CursorSQLite:
+    """Cursor sqlite3 que aceita o paramstyle pyformat das consultas compartilhadas"""
+
+    _MARCADOR = re.compile(r"%\((\w+)\)s")
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        self._cursor.execute(self._MARCADOR.sub(r":\1", query), params or {})
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def close(self):
+        self._cursor.close()
+
+
+# Inserções idempotentes por id (reaplicação de diário, ressincronização)
+_IGNORAR_EXISTENTES = " ON CONFLICT (id) DO NOTHING"
+
+
+class RepositorioSQLite(RepositorioTriagem):
+    """
+    Tabela de triagem num arquivo SQLite local
+
+    O arquivo é anexado como 'avicena_care', então as mesmas consultas do
+    Databricks (avicena_care.triagem) rodam sem alteração. Uma conexão só,
+    protegida por lock, em modo autocommit.
+    """
+
+    def __init__(self, caminho="avicena_triagem.db"):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(
+            ":memory:", detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False, isolation_level=None,
+        )
+        self._conexao.execute("ATTACH DATABASE ? AS avicena_care", (caminho,))
+        self._lock = threading.Lock()
+        self.preparar()
+
+    def _executar(self, funcao, *args, **kwargs):
+        with self._lock:
+            cursor = _CursorSQLite(self._conexao.cursor())
+            try:
+                return funcao(cursor, *args, **kwargs)
+            finally:
+                cursor.close()
+
+    def preparar(self):
+        with self._lock:
+            self._conexao.executescript(f"""
+                CREATE TABLE IF NOT EXISTS {TABELA_TRIAGEM} (
+                    id TEXT PRIMARY KEY,
+                    Nome TEXT,
+                    Idade INTEGER,
+                    PA TEXT,
+                    PA_Sistolica INTEGER,
+                    PA_Diastolica INTEGER,
+                    FC INTEGER,
+                    FR INTEGER,
+                    Temp REAL,
+                    SpO2 INTEGER,
+                    nivel_consciencia TEXT,
+                    genero TEXT,
+                    intensidade_dor INTEGER,
+                    Comorbidade TEXT,
+                    Alergia TEXT,
+                    Queixa_Principal TEXT,
+                    urgencia_automatica TEXT,
+                    urgencia_manual TEXT,
+                    status TEXT,
+                    data_cadastro TIMESTAMP,
+                    data_atendimento TIMESTAMP,
+                    medicacoes TEXT,
+                    last_modified TIMESTAMP
+                );
+                CREATE INDEX IF NOT EXISTS avicena_care.idx_triagem_status_cadastro
+                    ON triagem (status, data_cadastro);
+                CREATE INDEX IF NOT EXISTS avicena_care.idx_triagem_status_atendimento
+                    ON triagem (status, data_atendimento);
+            """)
+            # Arquivos criados antes das colunas de PA numérica
+            existentes = {linha[1] for linha in self._conexao.execute("PRAGMA avicena_care.table_info(triagem)")}
+            for coluna in ("PA_Sistolica", "PA_Diastolica"):
+                if coluna not in existentes:
+                    self._conexao.execute(f"ALTER TABLE {TABELA_TRIAGEM} ADD COLUMN {coluna} INTEGER")
+            # Só PA bem formada ('sis/dia', dígitos e espaços): o CAST do SQLite
+            # transformaria lixo em 0/0, que os indicadores leem como choque
+            pa = "replace(PA, ' ', '')"
+            self._conexao.execute(f"""
+                UPDATE {TABELA_TRIAGEM}
+                SET PA_Sistolica = CAST(substr({pa}, 1, instr({pa}, '/') - 1) AS INTEGER),
+                    PA_Diastolica = CAST(substr({pa}, instr({pa}, '/') + 1) AS INTEGER)
+                WHERE PA_Sistolica IS NULL AND PA_Diastolica IS NULL
+                  AND {pa} GLOB '[0-9]*/[0-9]*'
+                  AND {pa} NOT GLOB '*[^0-9/]*'
+                  AND {pa} NOT GLOB '*/*/*'
+            """)
+
+    def listar(self, colunas=None, **filtros):
+        query, params = montar_consulta(colunas=colunas, **filtros)
+        return self._executar(executar_consulta, query, params)
+
+    def pagina(self, tamanho, apos=None, **filtros):
+        return self._executar(buscar_pagina, tamanho, apos=apos, **filtros)
+
+    def contar(self, **filtros):
+        return self._executar(contar, **filtros)
+
+    def agregar(self, funcao, *args, **kwargs):
+        return self._executar(funcao, *args, **kwargs)
+
+    def inserir(self, registro):
+        query, params = montar_insercao(registro, agora=datetime.now())
+        self._executar(lambda cursor: cursor.execute(query + _IGNORAR_EXISTENTES, params))
+
+    def _inserir_lote(self, lote):
+        query, params = montar_insercao_lote(lote, agora=datetime.now())
+        query += _IGNORAR_EXISTENTES
+        with self._lock:
+            with self._conexao:
+                self._conexao.execute("BEGIN")
+                _CursorSQLite(self._conexao.cursor()).execute(query, params)
+
+    def atualizar(self, paciente_id, valores):
+        query, params = montar_atualizacao(str(paciente_id), valores, agora=datetime.now())
+        self._executar(lambda cursor: cursor.execute(query, params))
+
+    def substituir(self, df):
+        """Troca todo o conteúdo local pelas linhas do DataFrame (cópia do remoto)."""
+        colunas = [c for c in TODAS_COLUNAS if c in df.columns]
+        linhas = [
+            tuple(valor_python(v) for v in linha)
+            for linha in df[colunas].itertuples(index=False, name=None)
+        ]
+        query = (
+            f"INSERT INTO {TABELA_TRIAGEM} ({', '.join(colunas)})"
+            f" VALUES ({', '.join('?' * len(colunas))})"
+        )
+        with self._lock:
+            with self._conexao:
+                self._conexao.execute("BEGIN")
+                self._conexao.execute(f"DELETE FROM {TABELA_TRIAGEM}")
+                self._conexao.executemany(query, linhas)
+
+
+# ======================================================================
+# Escritas via diário local (write-ahead)
+# ======================================================================
+
+def _resolver_valores(valores, agora):
+    """Troca AGORA pelo horário da escrita e normaliza tipos para o diário (JSON)."""
+    return {c: agora if v is AGORA else valor_python(v) for c, v in valores.items()}
+
+
+def _escritas_pendentes(entradas):
+    """
+    Cadastros e alterações das entradas do diário, combinados em ordem
+
+    Returns:
+        tuple: (novos, alteracoes), ambos dict id -> valores. Uma alteração
+        feita depois do cadastro também vale para a linha nova.
+    """
+    novos, alteracoes = {}, {}
+    for _, operacao, args in entradas:
+        if operacao == "atualizar":
+            paciente_id, valores = args
+            valores = {c: v for c, v in valores.items() if c in TODAS_COLUNAS}
+            alteracoes.setdefault(paciente_id, {}).update(valores)
+            if paciente_id in novos:
+                novos[paciente_id].update(valores)
+            continue
+        registros = args[0] if operacao == "_inserir_lote" else [args[0]]
+        for registro in registros:
+            # Cadastro repetido do mesmo id é ignorado no destino: vale o primeiro
+            novos.setdefault(str(registro["id"]), dict(_completar_pa(registro)))
+    return novos, alteracoes
+
+
+class _CursorComDiario:
+    """
+    Cursor cujos SELECTs enxergam as escritas ainda no diário: a tabela vira
+    uma subconsulta com as alterações pendentes aplicadas (CASE por id) e os
+    cadastros pendentes que o destino ainda não tem (UNION ALL)
+    """
+
+    def __init__(self, cursor, entradas):
+        self._cursor = cursor
+        self._params = {}
+        novos, alteracoes = _escritas_pendentes(entradas)
+
+        colunas = []
+        for coluna in TODAS_COLUNAS:
+            casos = "".join(
+                f" WHEN {self._param(paciente_id)} THEN {self._param(valores[coluna])}"
+                for paciente_id, valores in alteracoes.items() if coluna in valores
+            )
+            colunas.append(f"CASE id{casos} ELSE {coluna} END AS {coluna}" if casos else coluna)
+        origem = f"SELECT {', '.join(colunas)} FROM {TABELA_TRIAGEM}"
+        if novos:
+            linhas = " UNION ALL ".join(
+                "SELECT " + ", ".join(f"{self._param(registro.get(c))} AS {c}" for c in TODAS_COLUNAS)
+                for registro in novos.values()
+            )
+            origem += (
+                f" UNION ALL SELECT * FROM ({linhas}) AS novos"
+                f" WHERE id NOT IN (SELECT id FROM {TABELA_TRIAGEM})"
+            )
+        self._origem = f"FROM ({origem}) AS triagem"
+
+    def _param(self, valor):
+        if valor is None:
+            return "NULL"
+        nome = f"diario_{len(self._params)}"
+        self._params[nome] = valor
+        return f"%({nome})s"
+
+    def execute(self, query, params=None):
+        self._cursor.execute(query.replace(f"FROM {TABELA_TRIAGEM}", self._origem), {**(params or {}), **self._params})
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+class RepositorioComDiario(RepositorioTriagem):
+    """
+    Escritas confirmadas no diário local e aplicadas no destino em segundo plano
+
+    A latência de cadastro/atualização fica limitada ao disco local; se o
+    destino estiver lento ou fora, as entradas esperam no diário (que
+    sobrevive a reinícios) e são reaplicadas em ordem. As leituras enxergam
+    as entradas pendentes (ver _CursorComDiario), então um paciente cadastrado
+    com o destino lento já aparece na fila e nos indicadores; `ao_aplicar`
+    avisa quando uma entrada chega ao destino. O destino precisa executar
+    funções de cursor por `_executar` (RepositorioDatabricks, RepositorioSQLite).
+    """
+
+    def __init__(self, destino, diario, ao_aplicar=None, max_tentativas=5):
+        self.destino = destino
+        self.diario = diario
+        self.replicador = ReplicadorDiario(
+            diario, destino, ao_aplicar=ao_aplicar,
+            max_tentativas=max_tentativas, erros_transitorios=destino.erros_transitorios,
+        )
+        self.replicador.acordar()  # entradas que sobraram da execução anterior
+
+    @property
+    def pendentes(self):
+        """Escritas no diário ainda não aplicadas no destino."""
+        return len(self.diario)
+
+    @property
+    def mortas(self):
+        """Escritas descartadas depois de max_tentativas recusas do destino."""
+        return self.diario.contar_mortas()
+
+    def preparar(self):
+        self.destino.preparar()
+
+    def _ler(self, funcao, *args, **kwargs):
+        """Executa a leitura no destino com as entradas pendentes do diário sobrepostas."""
+        entradas = self.diario.pendentes(limite=-1)
+        if not entradas:
+            return self.destino._executar(funcao, *args, **kwargs)
+        return self.destino._executar(
+            lambda cursor: funcao(_CursorComDiario(cursor, entradas), *args, **kwargs))
+
+    def listar(self, colunas=None, **filtros):
+        query, params = montar_consulta(colunas=colunas, **filtros)
+        return self._ler(executar_consulta, query, params)
+
+    def pagina(self, tamanho, apos=None, **filtros):
+        return self._ler(buscar_pagina, tamanho, apos=apos, **filtros)
+
+    def contar(self, **filtros):
+        return self._ler(contar, **filtros)
+
+    def agregar(self, funcao, *args, **kwargs):
+        return self._ler(funcao, *args, **kwargs)
+
+    def fila(self):
+        if len(self.diario):
+            # Entradas pendentes não têm last_modified no destino: a fila vem inteira
+            return self.listar(colunas=COLUNAS_FILA, status="AGUARDANDO")
+        return self.destino.fila()
+
+    def pendente(self, seq):
+        # Aplicada ou descartada: a entrada não está mais à espera
+        return self.diario.pendente(seq)
+
+    def _registrar(self, operacao, *args):
+        seq = self.diario.registrar(operacao, *args)
+        self.replicador.acordar()
+        return seq
+
+    def inserir(self, registro):
+        self._registrar("inserir", _resolver_valores(registro, datetime.now()))
+
+    def _inserir_lote(self, lote):
+        agora = datetime.now()
+        self._registrar("_inserir_lote", [_resolver_valores(r, agora) for r in lote])
+
+    def atualizar(self, paciente_id, valores):
+        return self._registrar("atualizar", str(paciente_id), _resolver_valores(valores, datetime.now()))
+
+
+# ======================================================================
+# Local + remoto (write-behind)
+# ======================================================================
+
+class RepositorioSincronizado(RepositorioComDiario):
+    """
+    Leituras e escritas no repositório local; escritas repassadas ao remoto
+
+    Na inicialização a cópia local é preenchida com a tabela remota. Cada
+    escrita é aplicada localmente na hora e gravada no diário, de onde o
+    replicador a leva ao remoto, repetindo com backoff enquanto ele estiver fora.
+    """
+
+    def __init__(self, local, remoto, diario, ao_aplicar=None, max_tentativas=5):
+        super().__init__(remoto, diario, ao_aplicar=ao_aplicar, max_tentativas=max_tentativas)
+        self.local = local
+
+    @property
+    def remoto(self):
+        return self.destino
+
+    def preparar(self):
+        try:
+            self.remoto.preparar()
+        except Exception as e:
+            print(f"⚠️ Não foi possível preparar a tabela remota: {e}")
+        self.local.preparar()
+        self.sincronizar()
+
+    def sincronizar(self):
+        """Copia a tabela remota para o local. Sem remoto, segue com a cópia que já existe."""
+        try:
+            self.local.substituir(self.remoto.listar())
+        except Exception as e:
+            print(f"⚠️ Não foi possível sincronizar com o banco remoto: {e}")
+            return
+        # Escritas que ainda não chegaram ao remoto voltam a valer na cópia local
+        for _, operacao, args in self.diario.pendentes(limite=-1):
+            getattr(self.local, operacao)(*args)
+
+    def listar(self, colunas=None, **filtros):
+        return self.local.listar(colunas=colunas, **filtros)
+
+    def pagina(self, tamanho, apos=None, **filtros):
+        return self.local.pagina(tamanho, apos=apos, **filtros)
+
+    def contar(self, **filtros):
+        return self.local.contar(**filtros)
+
+    def agregar(self, funcao, *args, **kwargs):
+        return self.local.agregar(funcao, *args, **kwargs)
+
+    def fila(self):
+        return self.local.fila()
+
+    def inserir(self, registro):
+        registro = _resolver_valores(registro, datetime.now())
+        self.local.inserir(registro)
+        self._registrar("inserir", registro)
+
+    def _inserir_lote(self, lote):
+        agora = datetime.now()
+        lote = [_resolver_valores(r, agora) for r in lote]
+        self.local._inserir_lote(lote)
+        self._registrar("_inserir_lote", lote)
+
+    def atualizar(self, paciente_id, valores):
+        valores = _resolver_valores(valores, datetime.now())
+        self.local.atualizar(paciente_id, valores)
+        self._registrar("atualizar", str(paciente_id), valores)
+        return None  # as leituras vêm da cópia local, que já tem a escrita
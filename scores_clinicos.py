@@ -3,6 +3,8 @@ Módulo de Scores Clínicos para Triagem
 Implementa qSOFA, NEWS2 e SIRS
 """
 
+import numpy as np
+
 def calcular_qsofa(pa_sistolica, freq_respiratoria, nivel_consciencia="Alerta"):
     """
     qSOFA (Quick Sequential Organ Failure Assessment)
@@ -565,3 +567,153 @@ def avaliar_escala_dor(intensidade_dor):
         'cor': cor,
         'emoji': emoji
     }
+
+
+# ==================== SCORES EM LOTE (COLUNAR) ====================
+# Tabelas de interpretação indexadas pelo código de risco gravado em
+# calcular_todos_scores_lote. Textos idênticos aos das funções escalares.
+QSOFA_RISCOS = (
+    ("BAIXO", "✅ Baixo risco", "verde"),
+    ("MODERADO", "⚠️ Monitorar sinais", "laranja"),
+    ("ALTO", "🚨 SUSPEITA DE SEPSE", "vermelho"),
+)
+NEWS2_RISCOS = (
+    ("MÍNIMO", "✅ Normal", "verde"),
+    ("BAIXO", "⚠️ Monitorar", "amarelo"),
+    ("MÉDIO", "⚠️ Aumentar monitoramento", "laranja"),
+    ("ALTO", "🚨 RESPOSTA URGENTE", "vermelho"),
+)
+SIRS_RISCOS = (
+    ("NEGATIVO", "✅ SIRS ausente", "verde", "Sem resposta inflamatória"),
+    ("INCERTO", "⚠️ 1 critério presente", "amarelo", "Monitorar evolução"),
+    ("POSITIVO", "⚠️ SIRS presente", "laranja", "Resposta inflamatória detectada"),
+)
+MEWS_RISCOS = (
+    ("BAIXO", "✅ BAIXO RISCO", "verde"),
+    ("MÉDIO", "⚠️ MÉDIO RISCO", "amarelo"),
+    ("ALTO", "🔴 ALTO RISCO", "laranja"),
+    ("CRÍTICO", "🚨 RISCO CRÍTICO", "vermelho"),
+)
+GCS_CATEGORIAS = (
+    ("NORMAL", "✅ Consciente e orientado", "verde", "Mínimo"),
+    ("LEVE", "⚠️ Confusão/Desorientação leve", "amarelo", "Baixo - Avaliar causa"),
+    ("MODERADO", "🟠 Rebaixamento moderado", "laranja", "Médio - Monitoramento contínuo"),
+    ("GRAVE/COMA", "🔴 COMA - Intubação indicada (≤8)", "vermelho", "Crítico - Via aérea em risco"),
+)
+GCS_DESCRICOES = {
+    15: "Alerta, orientado no tempo/espaço",
+    13: "Confuso, desorientado",
+    10: "Sonolento, responde a estímulos verbais",
+    6: "Inconsciente, resposta motora apenas"
+}
+
+DTYPE_SCORES_LOTE = np.dtype([
+    ('qsofa', 'i1'), ('qsofa_risco', 'i1'),
+    ('news2', 'i1'), ('news2_risco', 'i1'),
+    ('sirs', 'i1'), ('sirs_risco', 'i1'),
+    ('mews', 'i1'), ('mews_risco', 'i1'),
+    ('gcs', 'i1'), ('gcs_risco', 'i1'),
+])
+
+
+def calcular_todos_scores_lote(freq_cardiaca, freq_respiratoria, temperatura,
+                               pa_sistolica, spo2, nivel_consciencia="Alerta"):
+    """
+    Versão colunar de calcular_todos_scores para vários pacientes
+    
+    Recebe arrays (ou escalares, com broadcast) e devolve um array estruturado
+    com o score inteiro e o código de risco de cada escala (ver DTYPE_SCORES_LOTE).
+    Nenhum texto é montado aqui: use expandir_scores_linha apenas para as
+    linhas que forem exibidas. pd.DataFrame(resultado) gera a versão tabular.
+    """
+    fc, fr, temp, pas, sat = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float))
+          for v in (freq_cardiaca, freq_respiratoria, temperatura, pa_sistolica, spo2))
+    )
+    consciencia = np.broadcast_to(np.asarray(nivel_consciencia, dtype=object), fc.shape)
+    alterado = consciencia != "Alerta"
+    inconsciente = consciencia == "Inconsciente"
+    confuso_sonolento = (consciencia == "Confuso") | (consciencia == "Sonolento")
+
+    resultado = np.empty(fc.shape, dtype=DTYPE_SCORES_LOTE)
+
+    # qSOFA
+    qsofa = (fr >= 22).astype(np.int8) + (pas <= 100) + alterado
+    resultado['qsofa'] = qsofa
+    resultado['qsofa_risco'] = np.select([qsofa >= 2, qsofa == 1], [2, 1], 0)
+
+    # NEWS2
+    news2 = (
+        np.select([fr <= 8, fr <= 11, fr >= 25, fr >= 21], [3, 1, 3, 2], 0)
+        + np.select([sat <= 91, sat <= 93, sat <= 95], [3, 2, 1], 0)
+        + np.select([pas <= 90, pas <= 100, pas <= 110, pas >= 220], [3, 2, 1, 3], 0)
+        + np.select([fc <= 40, fc <= 50, fc >= 131, fc >= 111, fc >= 91], [3, 1, 3, 2, 1], 0)
+        + np.select([temp <= 35.0, temp >= 39.1, temp >= 38.1, temp <= 36.0], [3, 2, 1, 1], 0)
+        + np.where(alterado, 3, 0)
+    )
+    resultado['news2'] = news2
+    resultado['news2_risco'] = np.select([news2 >= 7, news2 >= 5, news2 >= 1], [3, 2, 1], 0)
+
+    # SIRS
+    sirs = (fc > 90).astype(np.int8) + (fr > 20) + ((temp < 36.0) | (temp > 38.0))
+    resultado['sirs'] = sirs
+    resultado['sirs_risco'] = np.select([sirs >= 2, sirs == 1], [2, 1], 0)
+
+    # MEWS
+    mews = (
+        np.select([fc < 40, fc < 50, fc < 60, fc >= 130, fc >= 120, fc >= 110], [3, 2, 1, 3, 2, 1], 0)
+        + np.select([fr < 9, fr >= 30, fr >= 21, fr <= 11], [3, 3, 2, 1], 0)
+        + np.select([pas < 70, pas < 80, pas < 100, pas >= 200], [3, 2, 1, 2], 0)
+        + np.select([temp < 35.0, temp >= 38.5, temp >= 38.0], [3, 2, 1], 0)
+        + np.select([inconsciente, confuso_sonolento], [3, 1], 0)
+    )
+    resultado['mews'] = mews
+    resultado['mews_risco'] = np.select([mews >= 6, mews >= 4, mews >= 2], [3, 2, 1], 0)
+
+    # GCS simplificado (valores fora do mapeamento contam como Alerta)
+    gcs = np.select(
+        [consciencia == "Confuso", consciencia == "Sonolento", inconsciente], [13, 10, 6], 15
+    )
+    resultado['gcs'] = gcs
+    resultado['gcs_risco'] = np.select([gcs == 15, gcs >= 13, gcs >= 9], [0, 1, 2], 3)
+
+    return resultado
+
+
+def expandir_scores_linha(linha):
+    """
+    Monta os textos de interpretação de uma linha de calcular_todos_scores_lote
+    
+    Retorna dicionário no mesmo formato de calcular_todos_scores, exceto pelas
+    listas de critérios/detalhes (que dependem dos sinais vitais brutos).
+    """
+    risco, alerta, cor = QSOFA_RISCOS[linha['qsofa_risco']]
+    qsofa = {'score': int(linha['qsofa']), 'max_score': 3,
+             'risco': risco, 'alerta': alerta, 'cor': cor}
+    
+    risco, alerta, cor = NEWS2_RISCOS[linha['news2_risco']]
+    news2 = {'score': int(linha['news2']), 'max_score': 20,
+             'risco': risco, 'alerta': alerta, 'cor': cor}
+    
+    risco, alerta, cor, observacao = SIRS_RISCOS[linha['sirs_risco']]
+    sirs = {'score': int(linha['sirs']), 'max_score': 3,
+            'risco': risco, 'alerta': alerta, 'cor': cor, 'observacao': observacao}
+    
+    risco, alerta, cor = MEWS_RISCOS[linha['mews_risco']]
+    mews = {'score': int(linha['mews']), 'max_score': 15,
+            'risco': risco, 'alerta': alerta, 'cor': cor}
+    
+    score_gcs = int(linha['gcs'])
+    categoria, alerta, cor, risco = GCS_CATEGORIAS[linha['gcs_risco']]
+    gcs = {'score': score_gcs, 'max_score': 15, 'categoria': categoria,
+           'alerta': alerta, 'cor': cor, 'risco': risco,
+           'descricao': GCS_DESCRICOES.get(score_gcs, "Avaliação pendente"),
+           'intubacao': score_gcs <= 8}
+    
+    return {
+        'qsofa': qsofa,
+        'news2': news2,
+        'sirs': sirs,
+        'mews': mews,
+        'gcs': gcs
+    }
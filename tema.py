@@ -0,0 +1,73 @@
+"""
+Tema visual do Avicena Care
+Junta styles.css e os estilos do app (estilos/*.css) numa folha só, minificada
+e publicada como arquivo estático com o hash do conteúdo no nome
+"""
+
+import glob
+import hashlib
+import os
+import re
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Ordem de aplicação: o que vem depois prevalece em caso de empate
+ARQUIVOS_CSS = (
+    "styles.css",
+    "estilos/tema.css",
+    "estilos/interfaces.css",
+    "estilos/fila.css",
+    "estilos/formulario.css",
+    "estilos/analise.css",
+    "estilos/relatorios.css",
+)
+
+# Pasta servida pelo Streamlit em app/static/ (server.enableStaticServing)
+DIRETORIO_ESTATICO = os.path.join(DIRETORIO, "static")
+PREFIXO = "avicena"
+
+_COMENTARIO = re.compile(r"/\*.*?\*/", re.S)
+_ESPACOS = re.compile(r"\s+")
+# Não mexe em espaços perto de '+', '-' e ':' (calc(), combinadores, pseudo-classes)
+_SEPARADORES = re.compile(r"\s*([{};,>])\s*")
+
+
+def minificar_css(css):
+    """Remove comentários e espaços que não mudam o significado do CSS."""
+    css = _COMENTARIO.sub("", css)
+    css = _ESPACOS.sub(" ", css)
+    css = _SEPARADORES.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def montar_folha(arquivos=ARQUIVOS_CSS, diretorio=DIRETORIO):
+    """CSS consolidado e minificado de todos os arquivos do tema."""
+    partes = []
+    for arquivo in arquivos:
+        with open(os.path.join(diretorio, arquivo), encoding="utf-8") as f:
+            partes.append(minificar_css(f.read()))
+    return "\n".join(partes)
+
+
+def publicar_folha(css, destino=DIRETORIO_ESTATICO):
+    """
+    Grava a folha como <destino>/avicena.<hash>.css e devolve o nome do arquivo
+
+    O nome muda junto com o conteúdo, então o navegador pode guardar o arquivo
+    em cache sem risco de usar uma versão velha. Versões anteriores são apagadas.
+    """
+    nome = f"{PREFIXO}.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+    caminho = os.path.join(destino, nome)
+    os.makedirs(destino, exist_ok=True)
+    if not os.path.exists(caminho):
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(css)
+        os.replace(temporario, caminho)
+    for antigo in glob.glob(os.path.join(destino, f"{PREFIXO}.*.css")):
+        if os.path.basename(antigo) != nome:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+    return nome
@@ -0,0 +1,178 @@
+"""
+Templates HTML dos componentes fixos da interface
+Faixa de KPIs, cabeçalhos de perfil e tela de boas-vindas: compilados uma vez
+(indentação removida) e renderizados com memoização, então as mesmas entradas
+devolvem sempre o mesmo HTML, byte a byte
+"""
+
+from functools import lru_cache
+from html import escape
+from string import Template
+
+
+def _compilar(html):
+    """Template sem indentação nem linhas em branco (menos bytes, mesmo HTML)."""
+    return Template("\n".join(linha.strip() for linha in html.strip().splitlines() if linha.strip()))
+
+
+# ----------------------------------------------------------------------
+# Faixa de KPIs (protocolo PCACR + contadores por prioridade)
+# ----------------------------------------------------------------------
+
+_FAIXA_KPIS = _compilar("""
+    <div class='pcacr-wrapper'>
+      <div class='pcacr-box-minimal'>
+         <div class='pcacr-header-row'>
+            <div class='pcacr-title-section'>
+               <h2>📋 Protocolo PCACR Ativo</h2>
+               <p>Classificação de risco por cores e tempos alvo</p>
+            </div>
+            <div class='pcacr-legend-inline'>
+               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-max'></span>Máxima (0min)</div>
+               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-alta'></span>Alta (15min)</div>
+               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-media'></span>Média (60min)</div>
+               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-baixa'></span>Baixa (120min)</div>
+               <div class='pcacr-pillx'><span class='pcacr-dot-modern d-min'></span>Mínima (240min)</div>
+            </div>
+         </div>
+         <div class='kpi-band-minimal'>
+            <div class='kpi-box-minimal total'>
+                <div class='kpi-icon-minimal'>📊</div>
+                <div class='kpi-value-minimal'>${total}</div>
+                <div class='kpi-label-minimal'>TOTAL DE PACIENTES</div>
+                <div class='kpi-meta-minimal'>Atual</div>
+            </div>
+            <div class='kpi-box-minimal max'>
+                <div class='kpi-circle-modern d-max'></div>
+                <div class='kpi-value-minimal'>${maxima}</div>
+                <div class='kpi-label-minimal'>PRIORIDADE MÁXIMA</div>
+                <div class='kpi-meta-minimal'>0 minutos</div>
+            </div>
+            <div class='kpi-box-minimal alta'>
+                <div class='kpi-circle-modern d-alta'></div>
+                <div class='kpi-value-minimal'>${alta}</div>
+                <div class='kpi-label-minimal'>PRIORIDADE ALTA</div>
+                <div class='kpi-meta-minimal'>15 minutos</div>
+            </div>
+            <div class='kpi-box-minimal media'>
+                <div class='kpi-circle-modern d-media'></div>
+                <div class='kpi-value-minimal'>${media}</div>
+                <div class='kpi-label-minimal'>PRIORIDADE MÉDIA</div>
+                <div class='kpi-meta-minimal'>60 minutos</div>
+            </div>
+            <div class='kpi-box-minimal baixa'>
+                <div class='kpi-circle-modern d-baixa'></div>
+                <div class='kpi-value-minimal'>${baixa}</div>
+                <div class='kpi-label-minimal'>PRIORIDADE BAIXA</div>
+                <div class='kpi-meta-minimal'>120 minutos</div>
+            </div>
+            <div class='kpi-box-minimal min'>
+                <div class='kpi-circle-modern d-min'></div>
+                <div class='kpi-value-minimal'>${minima}</div>
+                <div class='kpi-label-minimal'>PRIORIDADE MÍNIMA</div>
+                <div class='kpi-meta-minimal'>240 minutos</div>
+            </div>
+         </div>
+      </div>
+    </div>
+""")
+
+
+@lru_cache(maxsize=1024)
+def faixa_kpis(total, maxima, alta, media, baixa, minima):
+    """HTML da faixa de KPIs para as contagens informadas (inteiros)."""
+    return _FAIXA_KPIS.substitute(
+        total=int(total), maxima=int(maxima), alta=int(alta),
+        media=int(media), baixa=int(baixa), minima=int(minima),
+    )
+
+
+# ----------------------------------------------------------------------
+# Cabeçalho de cada perfil
+# ----------------------------------------------------------------------
+
+_CABECALHO = _compilar("""
+    <div class='ac-global-header'>
+        <div class='ac-header-wrap'>
+            <div class='ac-brand'>
+                <div class='ac-logo'>${logo}</div>
+                <div class='ac-text'>
+                    <div class='ac-title'>${titulo}</div>
+                    <div class='ac-sub'>${subtitulo}</div>
+                </div>
+            </div>
+            <div style='display: flex; align-items: center;'>
+                <div class='ac-status-pill'><span></span> PCACR Ativo</div>
+                <a href='?logout=true' class='logout-link' target='_self'>🚪 Sair</a>
+            </div>
+        </div>
+    </div>
+""")
+
+# perfil -> (logo, título, subtítulo)
+PERFIS = {
+    "enfermeiro": ("🏥", "Avicena Care - Enfermagem", "Protocolo Catarinense de Acolhimento (PCACR)"),
+    "medico": ("⚕️", "Avicena Care - Médico", "Análise Clínica e Preditiva"),
+}
+
+
+@lru_cache(maxsize=None)
+def cabecalho_perfil(perfil):
+    """HTML do cabeçalho da interface do perfil ('enfermeiro' ou 'medico')."""
+    logo, titulo, subtitulo = PERFIS[perfil]
+    return _CABECALHO.substitute(logo=escape(logo), titulo=escape(titulo), subtitulo=escape(subtitulo))
+
+
+# ----------------------------------------------------------------------
+# Tela de boas-vindas (sem variáveis: compilada uma vez na importação)
+# ----------------------------------------------------------------------
+
+BOAS_VINDAS_CABECALHO = _compilar("""
+    <div class='welcome-header'>
+        <div class='welcome-icon'>🏥</div>
+        <h1>Bem-vindo ao Avicena Care</h1>
+        <p>Sistema Integrado de Triagem Médica</p>
+    </div>
+""").template
+
+BOAS_VINDAS_PROTOCOLO = _compilar("""
+    <div class='info-card'>
+        <h3 style='color: #036672; margin-bottom: 20px;'>
+            📋 Protocolo PCACR
+        </h3>
+        <p style='color: #475569; line-height: 1.8; font-size: 0.95rem;'>
+            Sistema de triagem médica baseado no <strong>Protocolo Catarinense de
+            Acolhimento com Classificação de Risco (PCACR)</strong>, que permite
+            a priorização de pacientes conforme urgência clínica.
+        </p>
+        <hr style='border: none; border-top: 1px solid #e5e7eb; margin: 20px 0;'>
+        <p style='color: #64748b; font-size: 0.9rem; margin-bottom: 10px;'>
+            <strong>Principais recursos:</strong>
+        </p>
+        <ul style='color: #64748b; font-size: 0.9rem; line-height: 1.6; margin-left: 20px;'>
+            <li>Classificação automática por sinais vitais</li>
+            <li>Gestão em tempo real da fila de atendimento</li>
+            <li>Dashboard com indicadores de urgência</li>
+            <li>Relatórios e análises clínicas</li>
+        </ul>
+    </div>
+""").template
+
+BOAS_VINDAS_ACESSO = _compilar("""
+    <div class='info-card' style='height: 100%;'>
+        <h3 style='text-align: center; color: #036672; margin-bottom: 25px;'>
+            🔐 Acesso ao Sistema
+        </h3>
+        <p style='text-align: center; color: #64748b; margin-bottom: 30px; font-size: 0.9rem;'>
+            Selecione seu perfil profissional para acessar:
+        </p>
+    </div>
+""").template
+
+BOAS_VINDAS_RODAPE = _compilar("""
+    <div style='text-align: center; margin-top: 30px;'>
+        <p style='color: #94a3b8; font-size: 0.85rem;'>
+            Acesso restrito a profissionais<br>de saúde autorizados
+        </p>
+    </div>
+""").template
@@ -0,0 +1,69 @@
+"""Teste das agregações no banco contra o mesmo cálculo em pandas (SQLite em memória)"""
+import math
+import random
+import uuid
+from datetime import datetime
+
+import agregacoes_triagem as agregacoes
+from repositorio_triagem import RepositorioSQLite
+
+print("="*70)
+print("🧪 TESTE DAS AGREGAÇÕES")
+print("="*70)
+
+random.seed(7)
+PRIORIDADES = ['PRIORIDADE MÁXIMA', 'ALTA PRIORIDADE', 'MÉDIA PRIORIDADE', 'BAIXA PRIORIDADE', 'MÍNIMA (ELETIVA)']
+repositorio = RepositorioSQLite(":memory:")
+repositorio.inserir_lote([
+    {
+        "id": str(uuid.uuid4()),
+        "Nome": f"Paciente {i}",
+        "PA": f"{random.randint(70, 190)}/{random.randint(40, 110)}",
+        "FC": random.randint(40, 160),
+        "FR": random.randint(6, 35),
+        "Temp": round(random.uniform(35.0, 40.5), 1),
+        "urgencia_manual": random.choice(PRIORIDADES),
+        "status": random.choice(["AGUARDANDO", "ATENDIDO"]),
+        "data_cadastro": datetime.now(),
+    }
+    for i in range(2000)
+])
+fila = repositorio.listar(status="AGUARDANDO")
+
+print("\n🔍 Estatísticas da fila (uma consulta)...")
+resumo = repositorio.agregar(agregacoes.estatisticas, status="AGUARDANDO")
+contagem = fila["urgencia_manual"].value_counts()
+assert resumo.total == len(fila)
+assert resumo.por_prioridade.to_dict() == contagem.to_dict()
+assert resumo.por_prioridade.is_monotonic_decreasing
+assert resumo.criticos == contagem["PRIORIDADE MÁXIMA"] and resumo.altos == contagem["ALTA PRIORIDADE"]
+assert resumo.risco == {
+    "choque": ((fila["PA_Sistolica"] < 90) & (fila["FC"] > 100)).sum(),
+    "sepse": ((fila["Temp"] > 38) & (fila["FC"] > 90) & (fila["FR"] > 20)).sum(),
+    "insuf_respiratoria": ((fila["FR"] < 10) | (fila["FR"] > 25)).sum(),
+}
+vazia = repositorio.agregar(agregacoes.estatisticas, status="INEXISTENTE")
+assert (vazia.total, vazia.por_prioridade.empty, vazia.percentual(0)) == (0, True, 0.0)
+print(f"   ✅ total {resumo.total}, críticos {resumo.percentual(resumo.criticos):.1f}%, risco {resumo.risco}")
+
+print("\n🔍 Histograma...")
+histograma = repositorio.agregar(agregacoes.histograma, "FC", 5, status="AGUARDANDO")
+esperado = (fila["FC"] // 5 * 5).value_counts().sort_index()
+assert histograma["faixa"].tolist() == esperado.index.astype(float).tolist()
+assert histograma["pacientes"].tolist() == esperado.tolist()
+print(f"   ✅ {len(histograma)} faixas")
+
+print("\n🔍 Quartis por prioridade...")
+distribuicao = repositorio.agregar(agregacoes.distribuicao, "FC", status="AGUARDANDO").set_index("urgencia_manual")
+for prioridade, valores in fila.groupby("urgencia_manual")["FC"]:
+    linha = distribuicao.loc[prioridade]
+    assert linha["minimo"] == valores.min() and linha["maximo"] == valores.max()
+    # Posto mais próximo: o menor valor cuja posição (1..n) é >= q * n
+    ordenados = valores.sort_values().tolist()
+    for coluna, q in (("q1", 0.25), ("mediana", 0.5), ("q3", 0.75)):
+        assert linha[coluna] == ordenados[math.ceil(q * len(ordenados)) - 1], (prioridade, coluna)
+print(f"   ✅ {len(distribuicao)} caixas")
+
+print("\n" + "="*70)
+print("✅ Agregações conferem com o pandas!")
+print("="*70)
@@ -0,0 +1,60 @@
+"""Teste do cache de figuras da análise clínica"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import plotly.tools
+
+from cache_figuras import CacheFiguras, FiguraSerializada, assinatura_df
+
+print("="*70)
+print("🧪 TESTE DO CACHE DE FIGURAS")
+print("="*70)
+
+rng = np.random.default_rng(0)
+df = pd.DataFrame({"FC": rng.integers(40, 160, 2000), "Temp": rng.normal(37, 1, 2000).round(1),
+                   "urgencia_manual": rng.choice(["ALTA PRIORIDADE", "BAIXA PRIORIDADE"], 2000)})
+montagens = []
+
+
+def construir():
+    montagens.append(1)
+    return px.scatter(df, x="FC", y="Temp", color="urgencia_manual")
+
+
+print("\n🔍 Chave por conteúdo e parâmetros, com descarte LRU...")
+cache = CacheFiguras(capacidade=2)
+figura = cache.obter("matriz", construir, assinatura_df(df))
+assert cache.obter("matriz", construir, assinatura_df(df.copy())) is figura and len(montagens) == 1
+cache.obter("matriz", construir, assinatura_df(df), paciente="p1")
+cache.obter("matriz", construir, assinatura_df(df.assign(FC=df["FC"] + 1)))
+assert len(montagens) == 3 and len(cache) == 2
+cache.obter("matriz", construir, assinatura_df(df))  # a primeira foi descartada
+assert len(montagens) == 4 and (cache.acertos, cache.faltas) == (1, 4)
+print("   ✅ Mesmos dados: mesma figura; dados ou parâmetros novos: figura nova")
+
+print("\n🔍 Figura entregue ao st.plotly_chart já serializada...")
+original = construir()
+assert isinstance(figura, FiguraSerializada)
+assert figura.spec == pio.to_json(original, validate=False)
+# O que o st.plotly_chart faz a cada rerun
+recebida = plotly.tools.return_figure_from_figure_or_data(figura, validate_figure=True)
+assert pio.to_json(recebida, validate=False) == figura.spec
+
+
+def medir(fig, n=30):
+    inicio = time.perf_counter()
+    for _ in range(n):
+        pio.to_json(plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+    return (time.perf_counter() - inicio) / n * 1000
+
+
+montada, serializada = medir(original), medir(figura)
+assert serializada < montada, (serializada, montada)
+print(f"   ✅ Mesmo JSON; {montada:.2f} ms -> {serializada:.2f} ms por rerun")
+
+print("\n" + "="*70)
+print("✅ Cache de figuras OK!")
+print("="*70)
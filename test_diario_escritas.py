@@ -0,0 +1,192 @@
+"""Teste do diário de escritas, do replicador e do RepositorioComDiario"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import agregacoes_triagem
+from diario_escritas import DiarioEscritas, ReplicadorDiario, coalescer
+from repositorio_triagem import RepositorioComDiario, RepositorioSQLite
+
+print("="*70)
+print("🧪 TESTE DO DIÁRIO DE ESCRITAS")
+print("="*70)
+
+
+def esperar(condicao, timeout_s=10.0):
+    limite = time.monotonic() + timeout_s
+    while not condicao():
+        assert time.monotonic() < limite, "tempo esgotado"
+        time.sleep(0.02)
+
+
+print("\n🔍 Registrar, confirmar e descartar entradas...")
+diario = DiarioEscritas(":memory:")
+quando = datetime(2024, 5, 1, 8, 30, 15)
+seqs = [diario.registrar("inserir", {"id": "a", "data_cadastro": quando}),
+        diario.registrar("atualizar", "a", {"status": "ATENDIDO"}),
+        diario.registrar("atualizar", "b", {"status": "ATENDIDO"})]
+assert seqs == sorted(seqs) and len(diario) == 3
+seq, operacao, args = diario.pendentes()[0]
+assert (operacao, args) == ("inserir", ({"id": "a", "data_cadastro": quando},))  # datetime volta como datetime
+diario.confirmar(seqs[0])
+assert diario.registrar_falha(seqs[1], ValueError("recusada")) == 1
+assert diario.registrar_falha(seqs[1], ConnectionError("fora do ar"), contar=False) == 1
+diario.descartar(seqs[1])
+assert [s for s, _, _ in diario.pendentes()] == [seqs[2]] and len(diario) == 1
+assert diario.contar_mortas() == 1
+assert diario.mortas()[0][1:] == ("atualizar", ("a", {"status": "ATENDIDO"}), 1, "fora do ar")
+print("   ✅ Ordem, tipos, contagem de tentativas e fila de mortas")
+
+print("\n🔍 Diário criado antes da fila de mortas...")
+with tempfile.TemporaryDirectory() as pasta:
+    caminho = os.path.join(pasta, "diario.db")
+    with sqlite3.connect(caminho) as antigo:
+        antigo.execute("CREATE TABLE diario (seq INTEGER PRIMARY KEY AUTOINCREMENT, operacao TEXT NOT NULL,"
+                       " argumentos TEXT NOT NULL, criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,"
+                       " tentativas INTEGER DEFAULT 0, ultimo_erro TEXT)")
+        antigo.execute("""INSERT INTO diario (operacao, argumentos) VALUES ('atualizar', '["a", {}]')""")
+    migrado = DiarioEscritas(caminho)
+    assert len(migrado) == 1 and migrado.contar_mortas() == 0
+    migrado._conexao.close()
+print("   ✅ Coluna 'morta' adicionada sem perder as entradas")
+
+print("\n🔍 Entrada envenenada não trava o replicador...")
+
+
+class DestinoFalso:
+    """Aplica inserir/atualizar numa lista; o paciente 'veneno' é sempre recusado"""
+
+    erros_transitorios = (ConnectionError,)
+
+    def __init__(self, quedas=0):
+        self.aplicadas = []
+        self.quedas = quedas
+
+    def _aplicar(self, *entrada):
+        if self.quedas:
+            self.quedas -= 1
+            raise ConnectionError("warehouse fora do ar")
+        if "veneno" in entrada:
+            raise ValueError("linha recusada pelo banco")
+        self.aplicadas.append(entrada)
+
+    def inserir(self, registro):
+        self._aplicar("inserir", registro["id"])
+
+    def atualizar(self, paciente_id, valores):
+        self._aplicar("atualizar", paciente_id)
+
+
+diario = DiarioEscritas(":memory:")
+for operacao, args in [("inserir", ({"id": "a"},)), ("inserir", ({"id": "veneno"},)),
+                       ("atualizar", ("a", {"status": "ATENDIDO"})), ("inserir", ({"id": "b"},))]:
+    diario.registrar(operacao, *args)
+destino = DestinoFalso()
+rodadas = threading.Semaphore(0)
+replicador = ReplicadorDiario(diario, destino, ao_aplicar=rodadas.release, max_tentativas=3,
+                              espera_inicial_s=0.01, erros_transitorios=destino.erros_transitorios)
+replicador.acordar()
+esperar(lambda: len(diario) == 0)
+assert destino.aplicadas == [("inserir", "a"), ("atualizar", "a"), ("inserir", "b")], destino.aplicadas
+[(_, operacao, args, tentativas, erro)] = diario.mortas()
+assert (operacao, args[0]["id"], tentativas, erro) == ("inserir", "veneno", 3, "linha recusada pelo banco")
+assert rodadas.acquire(timeout=1)
+print(f"   ✅ Descartada após {tentativas} tentativas; as demais foram aplicadas em ordem")
+
+print("\n🔍 Banco fora do ar não gasta tentativas...")
+diario = DiarioEscritas(":memory:")
+diario.registrar("inserir", {"id": "c"})
+destino = DestinoFalso(quedas=8)
+ReplicadorDiario(diario, destino, max_tentativas=3, espera_inicial_s=0.01, espera_max_s=0.02,
+                 erros_transitorios=destino.erros_transitorios).acordar()
+esperar(lambda: len(diario) == 0)
+assert destino.aplicadas == [("inserir", "c")] and diario.contar_mortas() == 0
+print("   ✅ 8 quedas seguidas e a escrita chegou, sem ir para a fila de mortas")
+
+print("\n🔍 Atualizações do mesmo paciente combinadas...")
+entradas = [(1, "atualizar", ("a", {"urgencia_manual": "ALTA PRIORIDADE"})),
+            (2, "atualizar", ("b", {"status": "ATENDIDO"})),
+            (3, "atualizar", ("a", {"urgencia_manual": "PRIORIDADE MÁXIMA", "status": "ATENDIDO"})),
+            (4, "inserir", ({"id": "c"},)),
+            (5, "atualizar", ("c", {"status": "ATENDIDO"})),
+            (6, "atualizar", ("a", {"status": "AGUARDANDO"}))]
+assert coalescer(entradas) == [
+    ([2], "atualizar", ("b", {"status": "ATENDIDO"})),
+    ([4], "inserir", ({"id": "c"},)),
+    ([5], "atualizar", ("c", {"status": "ATENDIDO"})),
+    ([1, 3, 6], "atualizar", ("a", {"urgencia_manual": "PRIORIDADE MÁXIMA", "status": "AGUARDANDO"})),
+]
+com_cadastro = [(1, "atualizar", ("c", {"FC": 80})), (2, "inserir", ({"id": "c"},)), (3, "atualizar", ("c", {"FC": 90}))]
+assert [seqs for seqs, _, _ in coalescer(com_cadastro)] == [[1], [2], [3]]  # o cadastro separa as séries
+assert [seqs for seqs, _, _ in coalescer(entradas[:3], separadas={3})] == [[1], [2], [3]]
+print("   ✅ Valores combinados coluna a coluna, no lugar da última atualização")
+
+print("\n🔍 RepositorioComDiario sobre o SQLite...")
+aplicou = threading.Event()
+destino = RepositorioSQLite(":memory:")
+repositorio = RepositorioComDiario(destino, DiarioEscritas(":memory:"), ao_aplicar=aplicou.set, max_tentativas=2)
+repositorio.inserir({"id": "p1", "Nome": "Paciente 1", "PA": "120/80", "status": "AGUARDANDO",
+                     "data_cadastro": datetime(2024, 5, 1, 8, 0)})
+repositorio.atualizar("p1", {"coluna_inexistente": 1})  # o destino recusa sempre
+repositorio.atualizar_urgencia("p1", "ALTA PRIORIDADE")
+esperar(lambda: repositorio.pendentes == 0)
+assert aplicou.is_set() and repositorio.mortas == 1
+fila = repositorio.fila()
+assert fila["id"].tolist() == ["p1"] and fila.loc[0, "urgencia_manual"] == "ALTA PRIORIDADE"
+seq = repositorio.marcar_atendido("p1")
+assert seq is not None
+esperar(lambda: not repositorio.pendente(seq))  # o app mantém a alteração na tela até aqui
+assert repositorio.fila().empty and repositorio.contar(status="ATENDIDO") == 1
+assert destino.marcar_atendido("p1") is None and not destino.pendente(None)  # sem diário: visível na hora
+print("   ✅ Escritas chegam ao destino em ordem; a recusada vai para a fila de mortas")
+
+print("\n🔍 Leituras enxergam o diário com o destino fora do ar...")
+
+
+class DestinoFora(RepositorioSQLite):
+    """SQLite que recusa escritas (ConnectionError) enquanto fora=True; leituras funcionam"""
+
+    erros_transitorios = (ConnectionError,)
+    fora = True
+
+    def inserir(self, registro):
+        if self.fora:
+            raise ConnectionError("warehouse fora do ar")
+        super().inserir(registro)
+
+    def atualizar(self, paciente_id, valores):
+        if self.fora:
+            raise ConnectionError("warehouse fora do ar")
+        super().atualizar(paciente_id, valores)
+
+
+destino = DestinoFora(":memory:")
+destino.fora = False
+destino.inserir({"id": "antigo", "Nome": "Antigo", "PA": "120/80", "status": "AGUARDANDO",
+                 "urgencia_manual": "BAIXA PRIORIDADE", "data_cadastro": datetime(2024, 5, 1, 7, 0)})
+destino.fora = True
+repositorio = RepositorioComDiario(destino, DiarioEscritas(":memory:"))
+repositorio.inserir({"id": "novo", "Nome": "Novo", "PA": "80/50", "FC": 120, "status": "AGUARDANDO",
+                     "urgencia_manual": "ALTA PRIORIDADE", "data_cadastro": datetime(2024, 5, 1, 8, 0)})
+repositorio.atualizar_urgencia("novo", "PRIORIDADE MÁXIMA")
+repositorio.atualizar_urgencia("antigo", "MÉDIA PRIORIDADE")
+fila = repositorio.fila().set_index("id")
+assert list(fila.index) == ["novo", "antigo"] and destino.contar() == 1
+assert fila.loc["novo", "urgencia_manual"] == "PRIORIDADE MÁXIMA" and fila.loc["novo", "PA_Sistolica"] == 80
+assert fila.loc["antigo", "urgencia_manual"] == "MÉDIA PRIORIDADE"
+estatisticas = repositorio.agregar(agregacoes_triagem.estatisticas, status="AGUARDANDO")
+assert (estatisticas.total, estatisticas.criticos, estatisticas.risco["choque"]) == (2, 1, 1)
+repositorio.marcar_atendido("antigo")
+assert repositorio.contar(status="AGUARDANDO") == 1 and repositorio.contar(status="ATENDIDO") == 1
+assert repositorio.pagina(10, status="ATENDIDO")[0]["id"].tolist() == ["antigo"]
+destino.fora = False
+esperar(lambda: repositorio.pendentes == 0, timeout_s=30)
+assert repositorio.fila()["id"].tolist() == ["novo"] and destino.contar(status="ATENDIDO") == 1
+print("   ✅ Cadastro e alterações pendentes na fila, nos KPIs e no histórico até chegarem ao destino")
+
+print("\n" + "="*70)
+print("✅ Diário de escritas OK!")
+print("="*70)
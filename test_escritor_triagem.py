@@ -0,0 +1,93 @@
+"""Teste do escritor assíncrono: alterações da fila em segundo plano, combinadas e duráveis"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from consultas_triagem import AGORA
+from diario_escritas import DiarioEscritas
+from escritor_triagem import EscritorTriagem
+from repositorio_triagem import RepositorioSQLite
+
+print("="*70)
+print("🧪 TESTE DO ESCRITOR DA TRIAGEM")
+print("="*70)
+
+
+class WarehouseLento(RepositorioSQLite):
+    """SQLite com a latência de um warehouse; guarda os UPDATEs recebidos e pode ficar fora do ar"""
+
+    erros_transitorios = (ConnectionError,)
+
+    def __init__(self, latencia_s=0.3, fora=False):
+        super().__init__(":memory:")
+        self.latencia_s = latencia_s
+        self.fora = fora
+        self.updates = []
+
+    def atualizar(self, paciente_id, valores):
+        if self.fora:
+            raise ConnectionError("warehouse fora do ar")
+        time.sleep(self.latencia_s)
+        super().atualizar(paciente_id, valores)
+        self.updates.append((paciente_id, valores))
+
+
+def cadastrar(destino, *ids):
+    destino.inserir_lote([{"id": i, "Nome": i, "status": "AGUARDANDO", "urgencia_manual": "BAIXA PRIORIDADE",
+                           "data_cadastro": datetime(2024, 5, 1, 8, 0)} for i in ids])
+
+
+print("\n🔍 Cliques não esperam o warehouse e viram um UPDATE por paciente...")
+destino = WarehouseLento()
+cadastrar(destino, "p1", "p2")
+aplicadas = threading.Event()
+escritor = EscritorTriagem(destino, DiarioEscritas(":memory:"), ao_aplicar=aplicadas.set)
+inicio = time.perf_counter()
+seqs = [escritor.atualizar("p1", {"urgencia_manual": urgencia})
+        for urgencia in ("MÉDIA PRIORIDADE", "ALTA PRIORIDADE", "PRIORIDADE MÁXIMA")]
+seqs.append(escritor.atualizar("p2", {"status": "ATENDIDO", "data_atendimento": AGORA}))
+tempo_cliques = time.perf_counter() - inicio
+assert tempo_cliques < destino.latencia_s, tempo_cliques
+assert all(escritor.pendente(seq) for seq in seqs)
+assert escritor.aguardar(timeout_s=10) and aplicadas.is_set()
+assert not any(escritor.pendente(seq) for seq in seqs)
+assert [(p, sorted(v)) for p, v in destino.updates] == [
+    ("p1", ["urgencia_manual"]), ("p2", ["data_atendimento", "status"])], destino.updates
+assert destino.updates[0][1]["urgencia_manual"] == "PRIORIDADE MÁXIMA"
+assert isinstance(destino.updates[1][1]["data_atendimento"], datetime)  # AGORA resolvido no clique
+assert destino.fila()["id"].tolist() == ["p1"]
+print(f"   ✅ 4 cliques em {tempo_cliques * 1000:.1f} ms; {len(destino.updates)} UPDATEs no warehouse")
+
+print("\n🔍 Combinação recusada volta a ser aplicada uma a uma...")
+destino = WarehouseLento(latencia_s=0)
+cadastrar(destino, "p1")
+diario = DiarioEscritas(":memory:")
+diario.registrar("atualizar", "p1", {"coluna_inexistente": 1})
+diario.registrar("atualizar", "p1", {"urgencia_manual": "ALTA PRIORIDADE"})
+escritor = EscritorTriagem(destino, diario, max_tentativas=1)
+assert escritor.aguardar(timeout_s=10)
+assert escritor.mortas == 1 and destino.updates == [("p1", {"urgencia_manual": "ALTA PRIORIDADE"})]
+print("   ✅ Só a alteração inválida foi descartada")
+
+print("\n🔍 Alteração aceita sobrevive a um reinício com o warehouse fora...")
+with tempfile.TemporaryDirectory() as pasta:
+    caminho = os.path.join(pasta, "diario.db")
+    fora = WarehouseLento(latencia_s=0, fora=True)
+    escritor = EscritorTriagem(fora, DiarioEscritas(caminho))
+    escritor.atualizar("p1", {"urgencia_manual": "ALTA PRIORIDADE"})
+    escritor.atualizar("p1", {"status": "ATENDIDO"})
+    assert not escritor.aguardar(timeout_s=0.3) and escritor.pendentes == 2
+
+    de_volta = WarehouseLento(latencia_s=0)
+    cadastrar(de_volta, "p1")
+    reiniciado = EscritorTriagem(de_volta, DiarioEscritas(caminho))  # outro processo, mesmo arquivo
+    assert reiniciado.aguardar(timeout_s=10)
+    assert de_volta.updates == [("p1", {"urgencia_manual": "ALTA PRIORIDADE", "status": "ATENDIDO"})]
+    assert de_volta.contar(status="ATENDIDO") == 1
+print("   ✅ Diário reaplicado depois do reinício, com as alterações combinadas")
+
+print("\n" + "="*70)
+print("✅ Escritor da triagem OK!")
+print("="*70)
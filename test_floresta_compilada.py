@@ -0,0 +1,70 @@
+"""Teste da floresta compilada (inferência sem sklearn) contra o RandomForest original"""
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+import joblib
+from train_model import map_to_pcacr, prepare_features, export_compiled_forest
+from ml_predictor import CompiledForest, PCACRPredictor
+
+print("="*70)
+print("🧪 TESTE DA FLORESTA COMPILADA")
+print("="*70)
+
+# Dataset sintético com as mesmas colunas do dataset de treinamento
+rng = np.random.default_rng(0)
+n = 3000
+df = pd.DataFrame({
+    'HR': rng.integers(35, 160, n), 'O2Sat': rng.integers(80, 101, n),
+    'Temp': np.round(rng.uniform(34.5, 40.5, n), 1), 'SBP': rng.integers(70, 230, n),
+    'DBP': rng.integers(40, 120, n), 'Resp': rng.integers(6, 35, n),
+    'Age': rng.integers(18, 95, n), 'Gender': rng.integers(0, 2, n),
+    'SepsisLabel': (rng.random(n) < 0.1).astype(int),
+})
+df['MAP'] = (df['SBP'] + 2 * df['DBP']) / 3
+y = df.apply(map_to_pcacr, axis=1)
+X, feature_cols = prepare_features(df)
+
+scaler = StandardScaler()
+model = RandomForestClassifier(n_estimators=30, max_depth=10, min_samples_leaf=10,
+                               class_weight='balanced', random_state=42)
+model.fit(scaler.fit_transform(X), y)
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'pcacr_forest.pkl')
+    export_compiled_forest(model, scaler, feature_cols, path)
+    forest = CompiledForest(joblib.load(path))
+
+# Pacientes novos (valores inteiros, como no formulário)
+teste = X.sample(500, random_state=1).to_numpy(dtype=float) + rng.integers(-3, 4, (500, len(feature_cols)))
+esperado = model.predict_proba(scaler.transform(teste))
+obtido = forest.predict_proba(teste)
+assert np.allclose(esperado, obtido, rtol=0, atol=1e-12), np.abs(esperado - obtido).max()
+assert list(forest.classes_) == list(model.classes_)
+assert np.allclose(forest.feature_importances_, model.feature_importances_)
+print("\n   ✅ Probabilidades idênticas ao RandomForest + StandardScaler")
+
+# Preditor usando a floresta compilada (scaler = None)
+preditor = PCACRPredictor()
+preditor.model, preditor.scaler, preditor.features, preditor.model_loaded = forest, None, forest.features, True
+paciente = {'freq_cardiaca': 125, 'spo2': 91, 'temperatura': 38.8, 'pa_sistolica': 88,
+            'pa_diastolica': 55, 'freq_respiratoria': 28, 'idade': 68, 'genero': 'Masculino'}
+resultado = preditor.predict_pcacr(paciente)
+print(f"   🤖 Paciente séptico: {resultado['prediction']} ({resultado['confidence']*100:.1f}%)")
+
+vetor = preditor._build_feature_matrix(pd.DataFrame([paciente]))
+inicio = time.perf_counter()
+for _ in range(1000):
+    forest.predict_proba(vetor)
+print(f"\n⏱️  Latência compilada (1 paciente): {(time.perf_counter() - inicio) * 1000:.1f} µs")
+inicio = time.perf_counter()
+for _ in range(50):
+    model.predict_proba(scaler.transform(vetor))
+print(f"⏱️  Latência sklearn (1 paciente):   {(time.perf_counter() - inicio) / 50 * 1e6:.1f} µs")
+
+print("\n" + "="*70)
+print("✅ Floresta compilada equivalente ao modelo sklearn!")
+print("="*70)
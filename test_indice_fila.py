@@ -0,0 +1,82 @@
+"""Teste do índice ordenado da fila de espera"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from indice_fila import IndiceFila
+
+print("="*70)
+print("🧪 TESTE DO ÍNDICE DA FILA")
+print("="*70)
+
+BASE = datetime(2024, 5, 1, 10, 0)
+
+print("\n🔍 Ordem por prioridade e chegada...")
+indice = IndiceFila()
+indice.inserir("baixa", "BAIXA PRIORIDADE", BASE)
+indice.inserir("max-tarde", "PRIORIDADE MÁXIMA", BASE + timedelta(minutes=5))
+indice.inserir("max-cedo", "PRIORIDADE MÁXIMA", BASE)
+indice.inserir("sem", None, BASE - timedelta(hours=1))
+assert indice.primeiros() == ["max-cedo", "max-tarde", "baixa", "sem"]
+assert indice.primeiros(2) == ["max-cedo", "max-tarde"] and indice.posicao("baixa") == 2
+indice.reclassificar("baixa", "PRIORIDADE MÁXIMA")
+indice.remover("max-tarde")
+assert indice.primeiros() == ["baixa", "max-cedo", "sem"] and len(indice) == 3  # mesma chegada: id desempata
+print("   ✅ Inserir, reclassificar e remover mantêm a ordem")
+
+print("\n🔍 Datas ingênuas, com fuso e nulas na mesma fila...")
+indice = IndiceFila()
+indice.inserir("ingenua", "ALTA PRIORIDADE", BASE)                                  # 10:00
+indice.inserir("utc", "ALTA PRIORIDADE", pd.Timestamp("2024-05-01 09:30", tz="UTC"))  # 09:30
+indice.inserir("brasilia", "ALTA PRIORIDADE", pd.Timestamp("2024-05-01 08:00", tz="America/Sao_Paulo"))  # 11:00 UTC
+indice.inserir("numpy", "ALTA PRIORIDADE", pd.Timestamp("2024-05-01 10:30"))          # 10:30
+indice.inserir("nat", "ALTA PRIORIDADE", pd.NaT)
+indice.inserir("nula", "ALTA PRIORIDADE", None)
+assert indice.primeiros()[:4] == ["utc", "ingenua", "numpy", "brasilia"], indice.primeiros()
+assert set(indice.primeiros()[4:]) == {"nat", "nula"}
+print("   ✅ Com fuso vira UTC ingênuo; sem data vai para o fim, sem TypeError no bisect")
+
+print("\n🔍 Sincronização com a leitura do banco...")
+indice = IndiceFila()
+lida = pd.DataFrame({
+    "id": ["a", "b", "c"],
+    "urgencia_manual": ["MÉDIA PRIORIDADE", "ALTA PRIORIDADE", "MÉDIA PRIORIDADE"],
+    "data_cadastro": pd.to_datetime([BASE, BASE + timedelta(minutes=1), BASE + timedelta(minutes=2)]),
+})
+indice.sincronizar(lida)
+assert indice.primeiros() == ["b", "a", "c"]
+indice.reclassificar("c", "PRIORIDADE MÁXIMA")  # escrita local ainda não lida
+indice.sincronizar(lida)
+assert indice.primeiros()[0] == "c", "leitura antiga não desfaz a escrita local"
+indice.sincronizar(lida.assign(urgencia_manual=["MÉDIA PRIORIDADE", "ALTA PRIORIDADE", "PRIORIDADE MÁXIMA"]))
+indice.sincronizar(lida.iloc[1:])  # 'a' saiu da fila no banco
+assert indice.primeiros() == ["b", "c"]
+print("   ✅ Linhas alteradas reposicionadas; escrita local vale até ser lida")
+
+print("\n🔍 Página lida do índice sem ordenar a fila inteira...")
+n = 1000
+indice = IndiceFila()
+df = pd.DataFrame({
+    "id": [f"p{i:04d}" for i in range(n)],
+    "urgencia_manual": ["PRIORIDADE MÁXIMA" if i % 10 == 0 else "BAIXA PRIORIDADE" for i in range(n)],
+    "data_cadastro": pd.to_datetime([BASE + timedelta(seconds=i) for i in range(n)]),
+})
+indice.sincronizar(df)
+indice.inserir("cadastro-ainda-nao-lido", "PRIORIDADE MÁXIMA", BASE - timedelta(hours=1))
+lidas = []
+chamadas = []
+primeiros = indice.primeiros
+indice.primeiros = lambda k=None: chamadas.append(k) or primeiros(k)
+ids = pd.Index(df["id"])
+pagina = df.iloc[indice.fatia(ids, 20, 30)]
+lidos = max(chamadas)
+assert lidos <= 60, chamadas  # só até o fim da página (com folga para ids ausentes)
+esperado = sorted(range(n), key=lambda i: (i % 10 != 0, i))
+assert pagina["id"].tolist() == [f"p{i:04d}" for i in esperado[20:30]]
+desconhecida = pd.Index(list(df["id"]) + ["fora-do-indice"])
+assert desconhecida[indice.fatia(desconhecida, n - 1, n + 1)].tolist() == [f"p{esperado[-1]:04d}", "fora-do-indice"]
+print(f"   ✅ Página 3 com primeiros({lidos}); linha fora do índice vai para o fim")
+
+print("\n" + "="*70)
+print("✅ Índice da fila OK!")
+print("="*70)
@@ -0,0 +1,61 @@
+"""Teste de fumaça da interface (AppTest): abre cada aba dos dois perfis no SQLite local"""
+import os
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+print("="*70)
+print("🧪 TESTE DA INTERFACE")
+print("="*70)
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_triagem.py")
+
+# Banco e diário criados numa pasta temporária, sem tocar nos arquivos do projeto
+diretorio_original = os.getcwd()
+storage_original = os.environ.get("AVICENA_STORAGE")
+pasta = tempfile.TemporaryDirectory()
+os.chdir(pasta.name)
+os.environ["AVICENA_STORAGE"] = "sqlite"
+try:
+    for perfil, chave in (("medico", "abas_medico"), ("enfermeiro", "abas_enfermeiro")):
+        print(f"\n🔍 Abas do perfil {perfil}...")
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.session_state["tipo_acesso"] = perfil
+        at.run()
+        assert not at.exception, [e.message for e in at.exception]
+        rotulos = [aba.label for aba in at.tabs]
+        assert rotulos, "nenhuma aba desenhada"
+        for rotulo in rotulos:
+            at.session_state[chave] = rotulo
+            at.run()
+            assert not at.exception, (rotulo, [e.message for e in at.exception])
+            print(f"   ✅ {rotulo}")
+
+    print("\n🔍 Alta e retorno à fila...")
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.session_state["tipo_acesso"] = "medico"
+    at.run()
+    botao = next(b for b in at.button if b.key and b.key.startswith("btn_atendido_"))
+    paciente_id = botao.key[len("btn_atendido_"):]
+    botao.click().run()
+    assert not at.exception and not any(b.key == botao.key for b in at.button)
+    at.session_state["abas_medico"] = "📋 Histórico"
+    at.run()
+    at.session_state["abas_medico"] = "📋 Histórico"  # o clique não reenvia o estado das abas
+    at.button(key=f"retornar_{paciente_id}").click().run()
+    assert not at.exception, [e.message for e in at.exception]
+    at.session_state["abas_medico"] = "🧾 Fila de Atendimento"
+    at.run()
+    assert any(b.key == botao.key for b in at.button)
+    print("   ✅ Paciente sai da fila e volta pelo histórico")
+finally:
+    os.chdir(diretorio_original)
+    if storage_original is None:
+        os.environ.pop("AVICENA_STORAGE", None)
+    else:
+        os.environ["AVICENA_STORAGE"] = storage_original
+    pasta.cleanup()
+
+print("\n" + "="*70)
+print("✅ Interface OK!")
+print("="*70)
@@ -0,0 +1,133 @@
+"""Teste da leitura Arrow (fetchall_arrow) e do fallback para fetchall(), com cursores falsos"""
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from databricks.sql.exc import RequestError
+
+import consultas_triagem
+from conexao_databricks import PoolConexoes
+from consultas_triagem import executar_consulta
+
+print("="*70)
+print("🧪 TESTE DA LEITURA ARROW")
+print("="*70)
+
+COLUNAS = ["id", "Nome", "FC", "SpO2", "Temp", "urgencia_manual", "data_cadastro"]
+LINHAS = [
+    (f"id-{i}", f"Paciente {i}", 60 + i % 90, None if i % 7 == 0 else 90 + i % 10, 36.0 + (i % 50) / 10,
+     consultas_triagem.PRIORIDADES[i % 5], pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=i))
+    for i in range(5000)
+]
+
+
+class CursorFalso:
+    """Entrega LINHAS por fetchall() e, se arrow=True, por fetchall_arrow()"""
+
+    def __init__(self, arrow=True, falha_arrow=None, falha_conexao=0):
+        self.arrow = arrow
+        self.falha_arrow = falha_arrow
+        self.falha_conexao = falha_conexao
+        self.execucoes = 0
+        self.description = [(c,) for c in COLUNAS]
+
+    def execute(self, query, params=None):
+        self.execucoes += 1
+
+    def fetchall(self):
+        return list(LINHAS)
+
+    def fetchall_arrow(self):
+        if self.falha_conexao:
+            self.falha_conexao -= 1
+            raise RequestError("conexão perdida")
+        if self.falha_arrow:
+            raise self.falha_arrow
+        if not self.arrow:
+            return {"colunas": COLUNAS}  # tabela colunar do conector sem pyarrow
+        return pa.table({c: [linha[i] for linha in LINHAS] for i, c in enumerate(COLUNAS)})
+
+    def close(self):
+        pass
+
+
+print("\n🔍 Arrow e fetchall() dão o mesmo DataFrame tipado...")
+cursor = CursorFalso()
+via_arrow = executar_consulta(cursor, "SELECT ...")
+assert cursor.execucoes == 1
+consultas_triagem.USAR_ARROW = False
+via_tuplas = executar_consulta(CursorFalso(), "SELECT ...")
+consultas_triagem.USAR_ARROW = True
+pd.testing.assert_frame_equal(via_arrow, via_tuplas)
+assert via_arrow["FC"].dtype == np.int16 and via_arrow["SpO2"].dtype == np.float32
+assert isinstance(via_arrow["urgencia_manual"].dtype, pd.CategoricalDtype)
+assert via_arrow["Temp"].dtype == np.float64
+print(f"   ✅ {len(via_arrow)} linhas, {dict(via_arrow.dtypes.astype(str))}")
+
+print("\n🔍 Fallback quando o Arrow não está disponível...")
+
+
+# A decisão Arrow/fetchall() é guardada por tipo de cursor: um tipo por cenário
+class CursorSemPyarrow(CursorFalso):
+    def __init__(self):
+        super().__init__(arrow=False)
+
+
+class CursorSemArrow(CursorFalso):
+    def __init__(self):
+        super().__init__(falha_arrow=NotImplementedError("sem arrow"))
+
+
+for tipo in (CursorSemPyarrow, CursorSemArrow):
+    saida = io.StringIO()
+    with redirect_stdout(saida):
+        primeiro, segundo = tipo(), tipo()
+        df = executar_consulta(primeiro, "SELECT ...")
+        executar_consulta(segundo, "SELECT ...")
+    assert primeiro.execucoes == 2, "a consulta deve ser refeita para o fetchall()"
+    assert segundo.execucoes == 1, "o tipo já sabe que não tem Arrow: vai direto ao fetchall()"
+    assert saida.getvalue().count("Leitura Arrow indisponível") == 1, saida.getvalue()
+    pd.testing.assert_frame_equal(df, via_tuplas)
+print("   ✅ Consulta refeita pelo caminho DB-API na primeira vez; depois, direto e sem novo aviso")
+
+print("\n🔍 Erro de programação não vira fallback silencioso...")
+
+
+class CursorComDefeito(CursorFalso):
+    def __init__(self):
+        super().__init__(falha_arrow=TypeError("argumento inválido"))
+
+
+try:
+    executar_consulta(CursorComDefeito(), "SELECT ...")
+    raise AssertionError("TypeError engolido pelo fallback")
+except TypeError:
+    pass
+assert consultas_triagem._ARROW_POR_CURSOR[CursorComDefeito] is True
+print("   ✅ TypeError sobe para quem chamou")
+
+print("\n🔍 Conexão perdida no meio da leitura Arrow...")
+cursores = [CursorFalso(falha_conexao=1), CursorFalso()]
+
+
+class ConexaoFalsa:
+    def __init__(self):
+        self.open = True
+
+    def cursor(self):
+        return cursores.pop(0)
+
+    def close(self):
+        self.open = False
+
+
+pool = PoolConexoes(ConexaoFalsa, tamanho=2, espera_base_s=0.01)
+df = pool.executar(executar_consulta, "SELECT ...")
+assert len(df) == len(LINHAS) and not cursores
+print("   ✅ Erro de conexão não cai no fallback: o pool repete em outra conexão")
+
+print("\n" + "="*70)
+print("✅ Leitura Arrow OK!")
+print("="*70)
@@ -0,0 +1,81 @@
+"""Teste do pool de conexões com conexões falsas (sem Databricks)"""
+import threading
+import time
+from databricks.sql.exc import RequestError
+from conexao_databricks import PoolConexoes
+
+print("="*70)
+print("🧪 TESTE DO POOL DE CONEXÕES")
+print("="*70)
+
+
+class CursorFalso:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def execute(self, query, params=None):
+        if self.conexao.quebrada:
+            raise RequestError("conexão perdida")
+        time.sleep(0.05)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ConexaoFalsa:
+    abertas = 0
+
+    def __init__(self):
+        ConexaoFalsa.abertas += 1
+        self.quebrada = False
+        self.open = True
+
+    def cursor(self):
+        return CursorFalso(self)
+
+    def close(self):
+        self.open = False
+
+
+pool = PoolConexoes(ConexaoFalsa, tamanho=3, espera_base_s=0.01)
+
+# Concorrência: 6 consultas de 50ms em 3 conexões levam ~100ms, não 300ms
+print("\n🔍 Consultas concorrentes...")
+inicio = time.perf_counter()
+threads = [threading.Thread(target=pool.executar, args=(lambda c: c.execute("SELECT 1"),)) for _ in range(6)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+decorrido = time.perf_counter() - inicio
+assert ConexaoFalsa.abertas == 3, ConexaoFalsa.abertas
+assert decorrido < 0.25, decorrido
+print(f"   ✅ 6 consultas em {decorrido:.3f}s com {ConexaoFalsa.abertas} conexões")
+
+# Reconexão: todas as conexões ociosas caem; a próxima execução descarta e reconecta
+print("\n🔍 Reconexão após queda...")
+for conexao, _ in list(pool._livres.queue):
+    conexao.quebrada = True
+pool.executar(lambda c: c.execute("SELECT 1"))
+assert ConexaoFalsa.abertas > 3
+print(f"   ✅ Consulta concluída após reconectar ({ConexaoFalsa.abertas} conexões abertas no total)")
+
+# Conexão fechada é detectada no checkout, sem consulta extra
+with pool.cursor() as cursor:
+    cursor.conexao.open = False
+with pool.cursor() as cursor:
+    assert cursor.conexao.open
+print("   ✅ Conexão fechada descartada no checkout")
+
+print("\n" + "="*70)
+print("✅ Pool de conexões funcionando!")
+print("="*70)
@@ -0,0 +1,259 @@
+"""Teste dos repositórios de triagem no SQLite em memória"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import agregacoes_triagem as agregacoes
+from consultas_triagem import COLUNAS_FILA, TABELA_TRIAGEM, TODAS_COLUNAS, FilaIncremental, montar_merge_lote
+from diario_escritas import DiarioEscritas
+from repositorio_triagem import (
+    ErroImportacaoLote, RepositorioDatabricks, RepositorioSincronizado, RepositorioSQLite, RepositorioTriagem,
+)
+
+print("="*70)
+print("🧪 TESTE DO REPOSITÓRIO")
+print("="*70)
+
+BASE = datetime(2024, 5, 1, 8, 0)
+
+
+def paciente(i, **valores):
+    return {
+        "id": f"p{i:04d}",
+        "Nome": f"Paciente {i}",
+        "PA": "120/80",
+        "FC": 80,
+        "FR": 16,
+        "Temp": 36.5,
+        "urgencia_manual": "MÉDIA PRIORIDADE",
+        "status": "AGUARDANDO",
+        "data_cadastro": BASE + timedelta(minutes=i),
+        **valores,
+    }
+
+
+print("\n🔍 Paginação por keyset com data de atendimento nula...")
+repositorio = RepositorioSQLite(":memory:")
+repositorio.inserir_lote([
+    paciente(i, status="ATENDIDO", data_atendimento=None if i % 4 == 0 else BASE + timedelta(hours=1, minutes=i % 7))
+    for i in range(103)
+])
+vistos = []
+apos = None
+while True:
+    pagina, apos = repositorio.pagina(10, apos=apos, status="ATENDIDO", ordem="data_atendimento")
+    vistos += pagina["id"].tolist()
+    if apos is None:
+        break
+assert len(vistos) == len(set(vistos)) == 103, len(vistos)
+assert vistos == repositorio.listar(status="ATENDIDO", ordem="data_atendimento")["id"].tolist()
+assert repositorio.contar(status="ATENDIDO") == 103
+print(f"   ✅ {len(vistos)} linhas em páginas de 10, sem perder as de data nula")
+
+print("\n🔍 Fila incremental com escrita confirmada durante a leitura...")
+repositorio = RepositorioSQLite(":memory:")
+repositorio.inserir_lote([paciente(i) for i in range(20)])
+fila = FilaIncremental(COLUNAS_FILA)
+assert len(repositorio.agregar(fila.atualizar)) == 20
+# Commit que termina depois da leitura, com last_modified anterior à marca d'água
+repositorio.inserir(paciente(20))
+repositorio.agregar(lambda cursor: cursor.execute(
+    f"UPDATE {TABELA_TRIAGEM} SET last_modified = %(antes)s WHERE id = 'p0020'",
+    {"antes": fila.marca - timedelta(seconds=5)},
+))
+repositorio.atualizar("p0003", {"status": "ATENDIDO"})
+atual = repositorio.agregar(fila.atualizar)
+assert "p0020" in set(atual["id"]) and "p0003" not in set(atual["id"])
+assert len(atual) == 20 and atual["id"].is_unique
+print("   ✅ Linha atrasada entrou pela sobreposição da marca, sem duplicar")
+
+print("\n🔍 Backend incompleto falha na criação...")
+
+
+class SoLeitura(RepositorioTriagem):
+    def listar(self, colunas=None, **filtros):
+        return None
+
+
+try:
+    SoLeitura()
+    raise AssertionError("instanciou um repositório sem os métodos abstratos")
+except TypeError as e:
+    print(f"   ✅ {e}")
+
+print("\n🔍 Esquema e migração do SQLite...")
+repositorio = RepositorioSQLite(":memory:")
+colunas = repositorio.agregar(lambda cursor: [linha[1] for linha in cursor._cursor.execute(
+    "PRAGMA avicena_care.table_info(triagem)").fetchall()])
+assert set(colunas) == set(TODAS_COLUNAS), set(TODAS_COLUNAS) ^ set(colunas)
+repositorio.preparar()  # idempotente
+with tempfile.TemporaryDirectory() as pasta:
+    caminho = os.path.join(pasta, "antigo.db")
+    with sqlite3.connect(caminho) as antigo:
+        antigo.execute("CREATE TABLE triagem (id TEXT PRIMARY KEY, Nome TEXT, Idade INTEGER, PA TEXT, FC INTEGER,"
+                       " FR INTEGER, Temp REAL, SpO2 INTEGER, nivel_consciencia TEXT, genero TEXT,"
+                       " intensidade_dor INTEGER, Comorbidade TEXT, Alergia TEXT, Queixa_Principal TEXT,"
+                       " urgencia_automatica TEXT, urgencia_manual TEXT, status TEXT, data_cadastro TIMESTAMP,"
+                       " data_atendimento TIMESTAMP, medicacoes TEXT, last_modified TIMESTAMP)")
+        antigo.executemany("INSERT INTO triagem (id, Nome, PA, status) VALUES (?, 'Antigo', ?, 'AGUARDANDO')", [
+            ("a", "135 / 85"), ("b", "120/"), ("c", "abc"), ("d", "12a/80"), ("e", "120/80/60"), ("f", None),
+        ])
+    migrado = RepositorioSQLite(caminho).listar(ordem="data_cadastro").set_index("id").sort_index()
+    assert (migrado.loc["a", "PA_Sistolica"], migrado.loc["a", "PA_Diastolica"]) == (135, 85)
+    # PA malformada fica NULL (e não 0/0, que os indicadores leriam como choque)
+    assert migrado.loc["b":, ["PA_Sistolica", "PA_Diastolica"]].isna().all().all()
+print("   ✅ Colunas de TODAS_COLUNAS; arquivo antigo ganha a PA numérica só onde ela é válida")
+
+print("\n🔍 Escritas no SQLite...")
+repositorio.inserir(paciente(1, PA="90/60"))
+repositorio.inserir(paciente(1, Nome="Repetido"))  # mesmo id: ignorado
+repositorio.atualizar_urgencia("p0001", "ALTA PRIORIDADE")
+linha = repositorio.listar().iloc[0]
+assert (linha["Nome"], linha["urgencia_manual"], linha["PA_Sistolica"]) == ("Paciente 1", "ALTA PRIORIDADE", 90)
+repositorio.marcar_atendido("p0001")
+assert repositorio.contar(status="ATENDIDO") == 1 and not repositorio.listar()["data_atendimento"].isna().any()
+repositorio.retornar_fila("p0001")
+assert len(repositorio.fila()) == 1 and repositorio.listar()["data_atendimento"].isna().all()
+print("   ✅ Inserir (idempotente por id), reclassificar, dar alta e retornar à fila")
+
+print("\n🔍 Importação em lotes com falha no meio...")
+repositorio = RepositorioSQLite(":memory:")
+registros = [paciente(i) for i in range(1203)]
+registros[700] = paciente(700, Nome=object())  # tipo que o driver não sabe gravar
+try:
+    repositorio.inserir_lote(registros, tamanho_lote=500)
+    raise AssertionError("importação parcial reportada como sucesso")
+except ErroImportacaoLote as e:
+    assert [(f["inicio"], f["fim"]) for f in e.resultado["falhas"]] == [(500, 1000)], e.resultado["falhas"]
+    assert e.resultado["inseridos"] == 703
+    print(f"   ✅ {e}")
+assert repositorio.contar() == 703  # o lote com erro foi desfeito inteiro
+registros[700] = paciente(700)
+resultado = repositorio.inserir_lote(registros, tamanho_lote=500)
+assert not resultado["falhas"] and repositorio.contar() == 1203
+assert repositorio.listar(colunas=["id"])["id"].is_unique
+ultimo = repositorio.inserir_lote(registros[-3:], tamanho_lote=2)  # lote final menor que o tamanho
+assert ultimo["inseridos"] == 3 and repositorio.contar() == 1203
+print("   ✅ Reimportar as mesmas linhas completa a carga sem duplicar ids")
+
+print("\n🔍 Leituras do RepositorioDatabricks (pool sobre o SQLite)...")
+
+
+class PoolSQLite:
+    """Entrega cursores do SQLite no lugar do PoolConexoes: as consultas são as mesmas"""
+
+    def __init__(self, banco):
+        self.banco = banco
+
+    def executar(self, funcao, *args, **kwargs):
+        return self.banco._executar(funcao, *args, **kwargs)
+
+
+banco = RepositorioSQLite(":memory:")
+banco.inserir_lote([paciente(i, urgencia_manual="PRIORIDADE MÁXIMA" if i % 5 == 0 else "BAIXA PRIORIDADE")
+                    for i in range(30)])
+databricks = RepositorioDatabricks(PoolSQLite(banco))
+assert len(databricks.fila()) == 30 and databricks.contar(status="AGUARDANDO") == 30
+banco.marcar_atendido("p0007")
+assert "p0007" not in set(databricks.fila()["id"])  # delta da fila incremental
+pagina, proximo = databricks.pagina(12, status="AGUARDANDO")
+assert len(pagina) == 12 and proximo is not None
+assert databricks.agregar(agregacoes.estatisticas, status="AGUARDANDO").criticos == 6
+print("   ✅ listar, fila incremental, pagina, contar e agregar")
+
+print("\n🔍 RepositorioDatabricks sobre uma tabela antiga, sem DDL...")
+with tempfile.TemporaryDirectory() as pasta:
+    caminho = os.path.join(pasta, "legado.db")
+    with sqlite3.connect(caminho) as antigo:
+        antigo.execute("CREATE TABLE triagem (id TEXT PRIMARY KEY, Nome TEXT, Idade INTEGER, PA TEXT, FC INTEGER,"
+                       " FR INTEGER, Temp REAL, SpO2 INTEGER, nivel_consciencia TEXT, genero TEXT,"
+                       " intensidade_dor INTEGER, Comorbidade TEXT, Alergia TEXT, Queixa_Principal TEXT,"
+                       " urgencia_automatica TEXT, urgencia_manual TEXT, status TEXT, data_cadastro TIMESTAMP,"
+                       " data_atendimento TIMESTAMP)")
+        antigo.executemany("INSERT INTO triagem (id, Nome, PA, status, data_cadastro) VALUES (?, ?, '100/70', 'AGUARDANDO', ?)",
+                           [(f"p{i:04d}", f"Paciente {i}", BASE + timedelta(minutes=i)) for i in range(4)])
+    legado = RepositorioDatabricks(PoolSQLite(RepositorioSQLite(caminho)))  # o SQLite só migra a PA
+    try:
+        legado.preparar()  # o DDL do Databricks não roda aqui: faz o papel de "sem permissão"
+        raise AssertionError("preparar deveria propagar a falha")
+    except sqlite3.Error:
+        pass
+    assert legado.ausentes == ("medicacoes", "last_modified")
+    fila = legado.fila()
+    assert len(fila) == 4 and fila["PA_Sistolica"].eq(100).all()
+    assert legado.listar(colunas=["id", "medicacoes", "last_modified"])["last_modified"].notna().all()
+    legado.atualizar("p0001", {"status": "ATENDIDO"})  # UPDATE sem last_modified
+    assert len(legado.fila()) == 3 and legado.contar(status="ATENDIDO") == 1
+query, _ = montar_merge_lote([paciente(1)], omitir=legado.ausentes)
+assert "last_modified" not in query and "medicacoes" not in query
+print("   ✅ Leituras com as colunas ausentes derivadas; escritas sem elas")
+
+print("\n🔍 RepositorioSincronizado (write-behind)...")
+
+
+class RemotoInstavel(RepositorioSQLite):
+    """SQLite que pode ser 'desligado' para simular o warehouse fora do ar"""
+
+    fora = False
+    erros_transitorios = (ConnectionError,)
+
+    def _verificar(self):
+        if self.fora:
+            raise ConnectionError("remoto fora do ar")
+
+    def _executar(self, funcao, *args, **kwargs):
+        self._verificar()
+        return super()._executar(funcao, *args, **kwargs)
+
+    def preparar(self):
+        self._verificar()
+        super().preparar()
+
+    def _inserir_lote(self, lote):
+        self._verificar()
+        super()._inserir_lote(lote)
+
+
+def esperar(condicao, timeout_s=10.0):
+    limite = time.monotonic() + timeout_s
+    while not condicao():
+        assert time.monotonic() < limite, "tempo esgotado"
+        time.sleep(0.02)
+
+
+remoto = RemotoInstavel(":memory:")
+remoto.inserir_lote([paciente(i) for i in range(5)])
+sincronizado = RepositorioSincronizado(RepositorioSQLite(":memory:"), remoto, DiarioEscritas(":memory:"))
+sincronizado.preparar()
+assert len(sincronizado.fila()) == 5
+
+sincronizado.inserir(paciente(5))
+assert len(sincronizado.fila()) == 6  # local na hora
+esperar(lambda: remoto.contar() == 6 and sincronizado.pendentes == 0)
+
+remoto.fora = True
+sincronizado.marcar_atendido("p0002")
+assert len(sincronizado.fila()) == 5 and sincronizado.pendentes == 1
+time.sleep(0.3)
+remoto.fora = False
+esperar(lambda: sincronizado.pendentes == 0)
+assert remoto.contar(status="ATENDIDO") == 1
+print("   ✅ Escrita local imediata; remoto recebe depois, inclusive após queda")
+
+print("\n🔍 Preparar com o remoto fora do ar...")
+remoto.fora = True
+local = RepositorioSQLite(":memory:")
+local.inserir(paciente(99))
+reiniciado = RepositorioSincronizado(local, remoto, DiarioEscritas(":memory:"))
+reiniciado.preparar()  # não levanta: segue com a cópia local
+assert reiniciado.fila()["id"].tolist() == ["p0099"]
+reiniciado.atualizar_urgencia("p0099", "ALTA PRIORIDADE")
+assert reiniciado.fila().loc[0, "urgencia_manual"] == "ALTA PRIORIDADE" and reiniciado.pendentes == 1
+remoto.fora = False
+print("   ✅ Leituras e escritas seguem no local; a escrita fica no diário")
+
+print("\n" + "="*70)
+print("✅ Repositório OK!")
+print("="*70)
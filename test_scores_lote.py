@@ -0,0 +1,52 @@
+"""Teste dos scores clínicos em lote contra calcular_todos_scores"""
+import time
+import numpy as np
+from scores_clinicos import calcular_todos_scores, calcular_todos_scores_lote, expandir_scores_linha
+
+print("="*70)
+print("🧪 TESTE DOS SCORES CLÍNICOS EM LOTE (COLUNAR)")
+print("="*70)
+
+rng = np.random.default_rng(7)
+n = 20000
+freq_cardiaca = rng.integers(30, 180, n)
+freq_respiratoria = rng.integers(5, 40, n)
+temperatura = np.round(rng.uniform(33.0, 41.0, n), 1)
+pa_sistolica = rng.integers(50, 240, n)
+spo2 = rng.integers(75, 101, n)
+nivel_consciencia = rng.choice(["Alerta", "Confuso", "Sonolento", "Inconsciente"], n)
+
+lote = calcular_todos_scores_lote(freq_cardiaca, freq_respiratoria, temperatura,
+                                  pa_sistolica, spo2, nivel_consciencia)
+
+print(f"\n🔍 Comparando {n} pacientes com calcular_todos_scores...")
+campos = {
+    'qsofa': ('score', 'risco', 'alerta', 'cor'),
+    'news2': ('score', 'risco', 'alerta', 'cor'),
+    'sirs': ('score', 'risco', 'alerta', 'cor', 'observacao'),
+    'mews': ('score', 'risco', 'alerta', 'cor'),
+    'gcs': ('score', 'categoria', 'alerta', 'cor', 'risco', 'descricao', 'intubacao'),
+}
+for i in range(n):
+    esperado = calcular_todos_scores(
+        freq_cardiaca=int(freq_cardiaca[i]),
+        freq_respiratoria=int(freq_respiratoria[i]),
+        temperatura=float(temperatura[i]),
+        pa_sistolica=int(pa_sistolica[i]),
+        spo2=int(spo2[i]),
+        nivel_consciencia=str(nivel_consciencia[i])
+    )
+    obtido = expandir_scores_linha(lote[i])
+    for escala, chaves in campos.items():
+        for chave in chaves:
+            assert obtido[escala][chave] == esperado[escala][chave], (i, escala, chave)
+print("   ✅ Scores e interpretações idênticos em todas as linhas")
+
+inicio = time.perf_counter()
+calcular_todos_scores_lote(*(np.tile(a, 5) for a in (freq_cardiaca, freq_respiratoria, temperatura,
+                                                     pa_sistolica, spo2, nivel_consciencia)))
+print(f"\n⏱️  {5 * n} pacientes pontuados em {time.perf_counter() - inicio:.3f}s")
+
+print("\n" + "="*70)
+print("✅ Scores em lote equivalentes aos escalares!")
+print("="*70)
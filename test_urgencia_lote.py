@@ -0,0 +1,56 @@
+"""Teste da classificação de urgência em lote contra a versão escalar"""
+import time
+import numpy as np
+from app_triagem import calcular_urgencia, calcular_urgencia_lote, decodificar_alertas
+
+print("="*70)
+print("🧪 TESTE DA URGÊNCIA EM LOTE (VETORIZADA)")
+print("="*70)
+
+# Amostra aleatória cobrindo todas as faixas, incluindo limites e
+# temperaturas com casas decimais (ex.: 35.05, 36.05, que caem nos "vãos")
+rng = np.random.default_rng(42)
+n = 20000
+temperatura = np.round(rng.uniform(33.0, 41.0, n), 2)
+pa_sistolica = rng.integers(60, 240, n)
+pa_diastolica = rng.integers(30, 130, n)
+freq_respiratoria = rng.integers(5, 40, n)
+freq_cardiaca = rng.integers(30, 180, n)
+idade = rng.integers(0, 100, n)
+spo2 = rng.integers(75, 101, n).astype(float)
+spo2[rng.random(n) < 0.1] = np.nan  # SpO₂ não aferida
+nivel_consciencia = rng.choice(["Alerta", "Confuso", "Sonolento", "Inconsciente"], n, p=[0.85, 0.05, 0.05, 0.05])
+
+resultado = calcular_urgencia_lote(
+    temperatura, pa_sistolica, pa_diastolica, freq_respiratoria,
+    freq_cardiaca, idade, spo2, nivel_consciencia
+)
+
+print(f"\n🔍 Comparando {n} pacientes com calcular_urgencia...")
+for i in range(n):
+    esperado = calcular_urgencia(
+        float(temperatura[i]), int(pa_sistolica[i]), int(pa_diastolica[i]),
+        int(freq_respiratoria[i]), int(freq_cardiaca[i]), int(idade[i]),
+        None if np.isnan(spo2[i]) else int(spo2[i]), str(nivel_consciencia[i])
+    )
+    linha = resultado.iloc[i]
+    assert linha['nivel'] == esperado[0], (i, linha['nivel'], esperado[0])
+    assert linha['pontuacao'] == esperado[4], (i, linha['pontuacao'], esperado[4])
+    assert decodificar_alertas(linha['alertas']) == esperado[5], (i, esperado[5])
+print("   ✅ Nível, pontuação e alertas idênticos em todas as linhas")
+
+# Escalares com broadcast e SpO₂ ausente
+unico = calcular_urgencia_lote(36.5, 120, 80, 16, 75, 30)
+assert unico['nivel'].iloc[0] == calcular_urgencia(36.5, 120, 80, 16, 75, 30)[0]
+
+# Desempenho: reclassificação de histórico
+reps = 100_000 // n
+args = [np.tile(a, reps) for a in (temperatura, pa_sistolica, pa_diastolica,
+                                    freq_respiratoria, freq_cardiaca, idade, spo2, nivel_consciencia)]
+inicio = time.perf_counter()
+calcular_urgencia_lote(*args)
+print(f"\n⏱️  {len(args[0])} pacientes reclassificados em {time.perf_counter() - inicio:.3f}s")
+
+print("\n" + "="*70)
+print("✅ Urgência em lote equivalente à versão escalar!")
+print("="*70)
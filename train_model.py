@@ -123,6 +123,58 @@ def prepare_features(df):
     
     return X, feature_cols
 
+def export_compiled_forest(model, scaler, feature_cols, path='models/pcacr_forest.pkl'):
+    """
+    Exporta o Random Forest como arrays NumPy contíguos para inferência sem sklearn.
+    
+    Todas as árvores são concatenadas em um único vetor de nós (feature,
+    threshold, filhos esquerdo/direito, probabilidades da folha). O
+    StandardScaler vai junto (média e escala por feature): o sklearn compara a
+    feature normalizada em float32 e alguns limiares caem a 1 ulp de valores
+    de treino, então dobrar a normalização nos limiares mudaria empates. O
+    avaliador repete a mesma conta e chega exatamente às mesmas folhas.
+    As folhas apontam para si mesmas, de modo que o avaliador pode dar sempre
+    'depth' passos sem testar se chegou ao fim.
+    """
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    total = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        idx = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        
+        feat = np.where(is_leaf, 0, tree.feature)
+        feature.append(feat)
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(np.where(is_leaf, idx, tree.children_left) + total)
+        right.append(np.where(is_leaf, idx, tree.children_right) + total)
+        
+        # Mesma normalização de DecisionTreeClassifier.predict_proba
+        counts = tree.value[:, 0, :]
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+        
+        roots.append(total)
+        total += tree.node_count
+    
+    arrays = {
+        'feature': np.ascontiguousarray(np.concatenate(feature), dtype=np.int32),
+        'threshold': np.ascontiguousarray(np.concatenate(threshold), dtype=np.float64),
+        'left': np.ascontiguousarray(np.concatenate(left), dtype=np.int32),
+        'right': np.ascontiguousarray(np.concatenate(right), dtype=np.int32),
+        'value': np.ascontiguousarray(np.concatenate(value), dtype=np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'depth': np.int32(max(e.tree_.max_depth for e in model.estimators_)),
+        'classes': np.asarray(model.classes_).astype(str),
+        'features': np.asarray(feature_cols).astype(str),
+        'importances': np.asarray(model.feature_importances_, dtype=np.float64),
+    }
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump(arrays, path)
+    return arrays
+
 def train_pcacr_model(df):
     """Treina o modelo de classificação PCACR a partir de um DataFrame."""
 
@@ -190,11 +242,16 @@ def train_pcacr_model(df):
     joblib.dump(scaler, 'models/pcacr_scaler.pkl')
     joblib.dump(feature_cols, 'models/pcacr_features.pkl')
     
+    # Versão compilada para produção (sem sklearn no servidor)
+    print("📦 Exportando floresta compilada...")
+    export_compiled_forest(model, scaler, feature_cols, 'models/pcacr_forest.pkl')
+    
     print("\n✨ Treinamento concluído com sucesso!")
     print("   Arquivos salvos em: models/")
     print("   - pcacr_model.pkl")
     print("   - pcacr_scaler.pkl")
     print("   - pcacr_features.pkl")
+    print("   - pcacr_forest.pkl (inferência compilada)")
     
     return model, scaler, feature_cols, feature_importance
 